@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Benchmark du magasin d'événements: débit d'ajout, relecture en flux et mémoire comparée aux journaux en mémoire
+"""
+
+import sys
+import os
+import gc
+import time
+import shutil
+import argparse
+import tempfile
+import tracemalloc
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from modules.timing_verifier import TimingVerifier
+from modules.event_store import EventStore, read_events, EVENT_TIMING_ANOMALY
+
+def drifting_anomalies(timing, events, sensors=64):
+    """Chaque message arrive 10 ms trop tard: une anomalie par message"""
+    for i in range(sensors):
+        timing.register_sensor(f"S{i}", 100, 5)
+    t = 1000.0
+    for n in range(events // sensors + 1):
+        for i in range(sensors):
+            timing.check_timing_anomaly(f"S{i}", t)
+        t += 115.0
+    return timing
+
+def retained(build):
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = build()
+        return result, tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+def run_benchmark(events=1_000_000, segment_records=1 << 20, batch_records=1024):
+    print("🗄️  BENCHMARK MAGASIN D'ÉVÉNEMENTS")
+    print("=" * 60)
+    directory = tempfile.mkdtemp()
+    try:
+        with EventStore(os.path.join(directory, 'brut'), segment_records, batch_records) as store:
+            slot = store.slot('S1')
+            append = store.append
+            start = time.perf_counter()
+            for i in range(events):
+                append(EVENT_TIMING_ANOMALY, slot, 1000.0, 1010.0)
+            store.flush()
+            append_s = time.perf_counter() - start
+            segments = len(store.segments())
+        print(f"   Ajout (côté appelant, écrivain d'arrière-plan): {events / append_s:.0f} événements/s ({events} événements, {segments} segments)")
+
+        start = time.perf_counter()
+        total = sum(1 for _ in read_events(os.path.join(directory, 'brut')))
+        read_s = time.perf_counter() - start
+        print(f"   Relecture en flux: {total / read_s:.0f} événements/s")
+
+        anomalies = min(events, 200_000)
+        in_memory, list_bytes = retained(lambda: drifting_anomalies(TimingVerifier(), anomalies))
+        store = EventStore(os.path.join(directory, 'timing'), segment_records, batch_records)
+        stored, store_bytes = retained(lambda: drifting_anomalies(TimingVerifier(event_store=store), anomalies))
+        store.close()
+        print(f"   Anomalies: {len(in_memory.anomaly_log)} en mémoire, {len(store)} dans le magasin")
+        print(f"   Mémoire pour {anomalies} anomalies: journal en mémoire {list_bytes / 2**20:.1f} Mio, "
+              f"magasin {store_bytes / 2**20:.2f} Mio (32 octets/événement sur disque)")
+        return {'append_per_s': events / append_s, 'read_per_s': total / read_s,
+                'list_bytes': list_bytes, 'store_bytes': store_bytes}
+    finally:
+        shutil.rmtree(directory)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=1_000_000)
+    parser.add_argument("--segment-records", type=int, default=1 << 20)
+    parser.add_argument("--batch-records", type=int, default=1024)
+    args = parser.parse_args()
+    run_benchmark(args.events, args.segment_records, args.batch_records)
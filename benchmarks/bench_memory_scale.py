@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Benchmark mémoire: octets retenus par capteur sur la passerelle pour 1k/10k/100k capteurs
+"""
+
+import sys
+import os
+import io
+import gc
+import json
+import argparse
+import contextlib
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from modules.micro_mac import MicroMAC
+from modules.pipeline import TAPPipeline
+from modules.memory_report import memory_report, trace_allocations
+
+def build_fleet(sensor_count, group_size=4, frames_per_sensor=1, batch_size=256, **options):
+    """Enregistre sensor_count capteurs (groupes de vote de group_size) et amorce leur état
+
+    Les autres arguments nommés sont transmis à TAPPipeline (stage_order...).
+    """
+    mac = MicroMAC()
+    pipeline = TAPPipeline(**options)
+    for i in range(sensor_count):
+        pipeline.register_sensor(f"S{i}", 0x100 + i, 100, 5, f"G{i // group_size}")
+    # Une trame légitime par capteur et par cycle: historiques timing, fenêtre anti-rejeu, lectures
+    with contextlib.redirect_stdout(io.StringIO()):
+        for cycle in range(frames_per_sensor):
+            t = 1000.0 + cycle * 100
+            frames = [(0x100 + i, mac.create_can_frame(40 + (i // group_size) % 3, cycle + 1), t)
+                      for i in range(sensor_count)]
+            for start in range(0, sensor_count, batch_size):
+                pipeline.process_batch(frames[start:start + batch_size])
+    return pipeline
+
+def measure(sensor_count, group_size=4, frames_per_sensor=1):
+    """Octets par capteur: mesure tracemalloc et estimation sys.getsizeof"""
+    gc.collect()
+    pipeline, retained, traced = trace_allocations(
+        lambda: build_fleet(sensor_count, group_size, frames_per_sensor))
+    estimate = memory_report(pipeline, per_sensor=True, top=1)
+    entry = {
+        'sensors': sensor_count,
+        'groups': estimate['groups'],
+        'retained_bytes': retained,
+        'retained_per_sensor': retained / sensor_count,
+        'traced_per_sensor': traced['bytes_per_sensor'],
+        'estimated_per_sensor': estimate['bytes_per_sensor'],
+        'largest_sensor_bytes': next(iter(estimate['per_sensor'].values())),
+        'modules': traced['modules']
+    }
+    del pipeline
+    return entry
+
+def run_benchmark(sizes=(1_000, 10_000, 100_000), group_size=4, frames_per_sensor=1):
+    print("💾 BENCHMARK MÉMOIRE PAR CAPTEUR")
+    print("=" * 60)
+    results = []
+    for sensor_count in sizes:
+        entry = measure(sensor_count, group_size, frames_per_sensor)
+        results.append(entry)
+        top = ', '.join(f"{name} {size / sensor_count:.0f}"
+                        for name, size in sorted(entry['modules'].items(), key=lambda item: -item[1])[:4])
+        print(f"   {sensor_count:>7} capteurs: {entry['retained_per_sensor']:7.0f} o/capteur retenus "
+              f"(estimation {entry['estimated_per_sensor']:.0f}), "
+              f"{entry['retained_bytes'] / 2**20:7.1f} Mio")
+        print(f"   {'':>7}           par module (o/capteur): {top}")
+    if len(results) > 1:
+        first, last = results[0], results[-1]
+        print(f"   Croissance: x{last['retained_per_sensor'] / first['retained_per_sensor']:.2f} "
+              f"par capteur entre {first['sensors']} et {last['sensors']} capteurs")
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs='+', default=[1_000, 10_000, 100_000])
+    parser.add_argument("--group-size", type=int, default=4)
+    parser.add_argument("--frames-per-sensor", type=int, default=1)
+    parser.add_argument("-o", "--output", help="Fichier JSON des résultats")
+    args = parser.parse_args()
+    results = run_benchmark(args.sizes, args.group_size, args.frames_per_sensor)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Benchmark du pipeline TAP: trame par trame vs micro-lots de tailles variées
+"""
+
+import sys
+import os
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from modules.micro_mac import MicroMAC
+from modules.pipeline import TAPPipeline
+
+def build_workload(sensor_count=32, cycles=300, group_size=4):
+    """Construit un pipeline et un trafic légitime de sensor_count capteurs"""
+    mac = MicroMAC()
+    pipeline = TAPPipeline()
+    for i in range(sensor_count):
+        pipeline.register_sensor(f"S{i}", 0x100 + i, 100, 5, f"G{i // group_size}")
+    frames = []
+    for cycle in range(cycles):
+        t = 1000 + cycle * 105
+        for i in range(sensor_count):
+            frames.append((0x100 + i, mac.create_can_frame(40 + i % 5, cycle & 0xFFFF), t))
+    return pipeline, frames
+
+def run_once(batch_size, sensor_count, cycles):
+    """Exécute un passage complet et retourne (trames, secondes)"""
+    pipeline, frames = build_workload(sensor_count, cycles)
+    start = time.perf_counter()
+    for _ in pipeline.process_stream(frames, batch_size=batch_size):
+        pass
+    elapsed = time.perf_counter() - start
+    return len(frames), elapsed
+
+def run_benchmark(batch_sizes=(None, 8, 32, 128, 512), sensor_count=32, cycles=300, repeats=3):
+    """Mesure le débit pour chaque taille de lot (meilleur de repeats passages)"""
+    print("⚡ BENCHMARK PIPELINE TAP - MICRO-LOTS")
+    print("=" * 60)
+    print(f"   Capteurs: {sensor_count}, trames par passage: {sensor_count * cycles}")
+    results = {}
+    for batch_size in batch_sizes:
+        best = None
+        for _ in range(repeats):
+            frames, elapsed = run_once(batch_size, sensor_count, cycles)
+            best = elapsed if best is None else min(best, elapsed)
+        label = "trame/trame" if not batch_size else f"lot {batch_size}"
+        throughput = frames / best
+        results[label] = throughput
+        print(f"   {label:>12}: {throughput:10.0f} trames/s  ({best * 1e6 / frames:6.2f} µs/trame)")
+    return results
+
+if __name__ == "__main__":
+    run_benchmark()
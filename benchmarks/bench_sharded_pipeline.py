@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Benchmark du moteur TAP réparti: débit en fonction du nombre de shards
+
+Le gain de débit n'a pas été mesuré sur un hôte multi-cœurs: sur un seul
+cœur, les shards se partagent le processeur et seule la justesse des
+verdicts est vérifiée (tests/test_pipeline.py, TEST 6).
+"""
+
+import sys
+import os
+import time
+import multiprocessing
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from modules.micro_mac import MicroMAC
+from modules.pipeline import TAPPipeline
+from modules.sharded_pipeline import ShardedTAPEngine
+
+def build_frames(sensor_count, cycles):
+    """Trafic légitime de sensor_count capteurs sur cycles périodes"""
+    mac = MicroMAC()
+    frames = []
+    for cycle in range(cycles):
+        t = 1000 + cycle * 105
+        for i in range(sensor_count):
+            frames.append((0x100 + i, mac.create_can_frame(40 + i % 5, cycle & 0xFFFF), t))
+    return frames
+
+def register(engine, sensor_count, group_size=4):
+    for i in range(sensor_count):
+        engine.register_sensor(f"S{i}", 0x100 + i, 100, 5, f"G{i // group_size}")
+
+def run_single(frames, sensor_count, batch_size):
+    pipeline = TAPPipeline()
+    register(pipeline, sensor_count)
+    start = time.perf_counter()
+    for _ in pipeline.process_stream(frames, batch_size=batch_size):
+        pass
+    return time.perf_counter() - start
+
+def run_sharded(frames, sensor_count, workers, batch_size):
+    engine = ShardedTAPEngine(workers=workers, batch_size=batch_size)
+    register(engine, sensor_count)
+    with engine:
+        start = time.perf_counter()
+        for _ in engine.process_stream(frames):
+            pass
+        return time.perf_counter() - start
+
+def run_benchmark(sensor_count=256, cycles=200, batch_size=256, max_workers=None):
+    """Compare le pipeline mono-processus au moteur réparti (1..max_workers shards)"""
+    cores = multiprocessing.cpu_count()
+    max_workers = max_workers or max(cores, 2)
+    frames = build_frames(sensor_count, cycles)
+
+    print("⚡ BENCHMARK MOTEUR TAP RÉPARTI")
+    print("=" * 60)
+    print(f"   Cœurs: {cores}, capteurs: {sensor_count}, trames: {len(frames)}")
+
+    results = {}
+    elapsed = run_single(frames, sensor_count, batch_size)
+    results['mono-processus'] = len(frames) / elapsed
+    print(f"   {'mono-processus':>16}: {results['mono-processus']:10.0f} trames/s")
+
+    workers = 1
+    while workers <= max_workers:
+        elapsed = run_sharded(frames, sensor_count, workers, batch_size)
+        label = f"{workers} shard(s)"
+        results[label] = len(frames) / elapsed
+        print(f"   {label:>16}: {results[label]:10.0f} trames/s")
+        workers *= 2
+    if cores == 1:
+        print("   ⚠️  Un seul cœur disponible: aucun gain de parallélisme attendu")
+    return results
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+"""
+Suite de benchmarks TAP: modules unitaires et pipeline complet
+
+Chaque cas est préchauffé, répété, et rapporte débit et latences par
+percentile (µs). Les résultats sont exportés en JSON et comparés à une
+référence enregistrée (benchmarks/baseline.json): une régression au-delà
+du seuil fait échouer l'exécution.
+"""
+
+import sys
+import os
+import gc
+import json
+import time
+import platform
+import argparse
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from modules.micro_mac import MicroMAC
+from modules.timing_verifier import TimingVerifier
+from modules.security_escalation import SecurityEscalation
+from modules.sensor_voting import SensorVoting
+from modules.pipeline import TAPPipeline
+from modules.traffic_generator import SensorProfile, TrafficGenerator
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'baseline.json')
+DEFAULT_THRESHOLD = 0.25  # Régression tolérée (25 %)
+MIN_LATENCY_DELTA_US = 0.25  # Sous cet écart absolu, la latence relève du bruit de l'horloge
+
+# Affirmations du README (débit en msg/s, latence en ms)
+README_THROUGHPUT_MSG_S = (775, 1800)
+README_LATENCY_MS = (0.6, 1.3)
+
+PIPELINE_SENSOR_COUNTS = (8, 64, 512)
+PIPELINE_GROUP_SIZES = (3, 5)
+VOTING_GROUP_SIZES = (3, 5, 9)
+
+
+def percentile(ordered, fraction):
+    """Percentile par rang le plus proche d'une liste triée"""
+    if not ordered:
+        return None
+    index = min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))
+    return ordered[index]
+
+
+def calibrate(rounds=7, size=5000):
+    """
+    Durée (ns, meilleur de rounds) d'une boucle Python de référence
+
+    Mesurée avant chaque passage: la comparaison à la référence divise par ce
+    facteur, ce qui neutralise les écarts de vitesse de la machine (autre
+    processeur, changement de fréquence, voisins bruyants).
+    """
+    clock = time.perf_counter_ns
+    best = None
+    for _ in range(rounds):
+        start = clock()
+        table = {}
+        for i in range(size):
+            table[i & 0xFF] = table.get(i & 0xFF, 0) + (i ^ 0x5A) % 7
+        elapsed = clock() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def measure(setup, iterations, repeats=5, warmup=1, frames_per_call=1):
+    """
+    Mesure une opération
+
+    Args:
+        setup: fabrique appelée avant chaque passage, retourne op(i)
+        iterations: appels par passage
+        repeats: passages mesurés (après warmup passages ignorés)
+        frames_per_call: messages traités par appel (débit en messages/s)
+
+    Returns:
+        dict: débit du meilleur passage (rapporté à sa calibration) et
+            latences par appel en µs
+    """
+    clock = time.perf_counter_ns
+    latencies = []
+    best = None  # (durée / calibration, durée, calibration, p50) du meilleur passage
+    for run in range(warmup + repeats):
+        op = setup()
+        samples = [0] * iterations
+        calibration = calibrate()
+        gc_enabled = gc.isenabled()
+        gc.disable()  # Comme timeit: pas de pause du ramasse-miettes dans la mesure
+        try:
+            start = clock()
+            for i in range(iterations):
+                before = clock()
+                op(i)
+                samples[i] = clock() - before
+            elapsed = clock() - start
+        finally:
+            if gc_enabled:
+                gc.enable()
+        if run < warmup:
+            continue
+        latencies.extend(samples)
+        if best is None or elapsed / calibration < best[0]:
+            best = (elapsed / calibration, elapsed, calibration, percentile(sorted(samples), 0.50))
+
+    latencies.sort()
+    to_us = 1e-3
+    return {
+        'calibration_ns': best[2],
+        'iterations': iterations,
+        'repeats': repeats,
+        'warmup': warmup,
+        'frames_per_call': frames_per_call,
+        'throughput_per_s': iterations * frames_per_call / (best[1] * 1e-9),
+        'best_run_p50_us': best[3] * to_us,
+        'latency_us': {
+            'mean': sum(latencies) / len(latencies) * to_us,
+            'p50': percentile(latencies, 0.50) * to_us,
+            'p95': percentile(latencies, 0.95) * to_us,
+            'p99': percentile(latencies, 0.99) * to_us,
+            'max': latencies[-1] * to_us
+        }
+    }
+
+
+# --- Cas unitaires ---
+
+def micro_mac_case():
+    mac = MicroMAC()
+    return lambda i: mac.calculate_micro_mac(i & 0xFFFF, (i * 7) & 0xFFFF)
+
+
+def timing_case():
+    verifier = TimingVerifier()
+    verifier.register_sensor('S0', 100, 5)
+    return lambda i: verifier.check_timing_anomaly('S0', 1000 + i * 105)
+
+
+def escalation_case():
+    escalation = SecurityEscalation()
+    return lambda i: escalation.process_message('S0', True, True)
+
+
+def voting_case(group_size):
+    """Une nouvelle lecture puis un vote (le cache ne peut pas servir)"""
+    def setup():
+        voting = SensorVoting()
+        sensors = [f"S{i}" for i in range(group_size)]
+        voting.register_voting_group('G', sensors)
+        for sensor in sensors:
+            voting.submit_reading('G', sensor, 45)
+
+        def op(i):
+            voting.submit_reading('G', sensors[i % group_size], 44 + (i // group_size) % 3)
+            return voting.verify_voting('G')
+        return op
+    return setup
+
+
+# --- Pipeline complet ---
+
+def pipeline_workload(sensor_count, group_size, frames):
+    """Générateur et trafic légitime (trames, horodatages croissants)"""
+    sensors = [SensorProfile(f"S{i}", 0x100 + i, 100, 2 + i % 7, voting_group=f"G{i // group_size}")
+               for i in range(sensor_count)]
+    generator = TrafficGenerator(sensors, seed=sensor_count * 31 + group_size)
+    duration_ms = (frames + sensor_count) * 109.0 / sensor_count
+    traffic = generator.generate(duration_ms)
+    return generator, list(traffic.frames())[:frames]
+
+
+def pipeline_case(generator, frames, batch_size=None):
+    def setup():
+        pipeline = TAPPipeline()
+        generator.register(pipeline)
+        if batch_size is None:
+            process = pipeline.process_frame
+            return lambda i: process(*frames[i])
+        batches = [frames[i:i + batch_size] for i in range(0, len(frames), batch_size)]
+        return lambda i: pipeline.process_batch(batches[i])
+    return setup
+
+
+def run_suite(quick=False, log=print):
+    """
+    Exécute tous les cas
+
+    Args:
+        quick: moins d'itérations (contrôle rapide, résultats plus bruités)
+
+    Returns:
+        dict: {'meta': ..., 'results': {nom: mesure}, 'claims': ...}
+    """
+    scale = 0.1 if quick else 1.0
+    repeats = 3 if quick else 5
+    unit = max(200, int(20000 * scale))
+    results = {}
+
+    def record(name, setup, iterations, frames_per_call=1):
+        results[name] = measure(setup, iterations, repeats=repeats, frames_per_call=frames_per_call)
+        entry = results[name]
+        log(f"   {name:<40} {entry['throughput_per_s']:12.0f} msg/s   "
+            f"p50 {entry['latency_us']['p50']:8.2f} µs   p99 {entry['latency_us']['p99']:8.2f} µs")
+
+    log("⚡ SUITE DE BENCHMARKS TAP")
+    log("=" * 70)
+    record('micro_mac.calculate_micro_mac', micro_mac_case, unit)
+    record('timing.check_timing_anomaly', timing_case, unit)
+    record('escalation.process_message', escalation_case, unit)
+    for group_size in VOTING_GROUP_SIZES:
+        record(f'voting.verify_voting[group={group_size}]', voting_case(group_size), unit)
+
+    frames_count = max(512, int(10000 * scale))
+    batch_size = 256
+    for sensor_count in PIPELINE_SENSOR_COUNTS:
+        for group_size in PIPELINE_GROUP_SIZES:
+            generator, frames = pipeline_workload(sensor_count, group_size, frames_count)
+            suffix = f"[sensors={sensor_count},group={group_size}]"
+            record(f'pipeline.process_frame{suffix}', pipeline_case(generator, frames), len(frames))
+            batches = len(frames) // batch_size
+            record(f'pipeline.process_batch{suffix}', pipeline_case(generator, frames, batch_size),
+                   batches, frames_per_call=batch_size)
+
+    return {'meta': machine_info(quick), 'results': results, 'claims': check_readme_claims(results)}
+
+
+def machine_info(quick):
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'machine': platform.machine(),
+        'system': platform.system(),
+        'cpu_count': os.cpu_count(),
+        'quick': quick
+    }
+
+
+def check_readme_claims(results):
+    """Confronte le pipeline trame par trame aux chiffres du README"""
+    per_frame = {name: entry for name, entry in results.items()
+                 if name.startswith('pipeline.process_frame')}
+    if not per_frame:
+        return {}
+    worst_throughput = min(entry['throughput_per_s'] for entry in per_frame.values())
+    worst_p99_ms = max(entry['latency_us']['p99'] for entry in per_frame.values()) / 1000.0
+    return {
+        'throughput_msg_s': {'claimed': list(README_THROUGHPUT_MSG_S), 'measured_min': worst_throughput,
+                             'met': worst_throughput >= README_THROUGHPUT_MSG_S[0]},
+        'latency_ms': {'claimed': list(README_LATENCY_MS), 'measured_p99_max': worst_p99_ms,
+                       'met': worst_p99_ms <= README_LATENCY_MS[1]}
+    }
+
+
+def median_suite(suites):
+    """
+    Combine plusieurs exécutions: par cas, l'exécution de débit normalisé médian
+
+    Utilisé pour enregistrer une référence qui ne dépend pas d'un passage
+    exceptionnellement rapide ou lent.
+    """
+    merged = dict(suites[0], results={})
+    for name in suites[0]['results']:
+        entries = sorted((suite['results'][name] for suite in suites),
+                         key=lambda entry: entry['throughput_per_s'] * entry['calibration_ns'])
+        merged['results'][name] = entries[len(entries) // 2]
+    merged['meta'] = dict(merged['meta'], runs=len(suites))
+    merged['claims'] = check_readme_claims(merged['results'])
+    return merged
+
+
+def compare_with_baseline(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Compare des résultats à une référence
+
+    Un cas régresse si le débit ou la latence médiane de son meilleur
+    passage se dégrade de plus de threshold (fraction); la médiane est
+    retenue car p95/p99 varient trop d'un passage à l'autre sur une
+    machine partagée. Les deux côtés sont ramenés à la vitesse de la
+    référence par la calibration de ce passage. Les cas absents d'un
+    côté sont ignorés.
+
+    Returns:
+        list: une entrée par régression (cas, métrique, référence, mesure, écart)
+    """
+    regressions = []
+    reference = baseline.get('results', baseline)
+    for name, entry in results.get('results', results).items():
+        base = reference.get(name)
+        if base is None:
+            continue
+        # > 1 si la machine est plus lente maintenant que lors de la référence
+        slowdown = entry.get('calibration_ns', 1) / base.get('calibration_ns', entry.get('calibration_ns', 1))
+        throughput, base_throughput = entry['throughput_per_s'] * slowdown, base['throughput_per_s']
+        if throughput < base_throughput * (1 - threshold):
+            regressions.append({'case': name, 'metric': 'throughput_per_s', 'baseline': base_throughput,
+                                'measured': throughput, 'change': throughput / base_throughput - 1})
+        p50, base_p50 = entry['best_run_p50_us'] / slowdown, base['best_run_p50_us']
+        if p50 > base_p50 * (1 + threshold) and p50 - base_p50 > MIN_LATENCY_DELTA_US:
+            regressions.append({'case': name, 'metric': 'latency_us.p50', 'baseline': base_p50,
+                                'measured': p50, 'change': p50 / base_p50 - 1})
+    return regressions
+
+
+def report(suite, baseline_path=None, threshold=DEFAULT_THRESHOLD, output=None, log=print):
+    """
+    Affiche le bilan, écrit le JSON et compare à la référence
+
+    Returns:
+        bool: True si aucune régression (ou pas de référence)
+    """
+    claims = suite['claims']
+    if claims:
+        log("\n📋 AFFIRMATIONS DU README (pipeline trame par trame)")
+        throughput, latency = claims['throughput_msg_s'], claims['latency_ms']
+        log(f"   Débit: {throughput['measured_min']:.0f} msg/s au pire "
+            f"(annoncé {throughput['claimed'][0]}–{throughput['claimed'][1]}) "
+            f"{'✅' if throughput['met'] else '❌'}")
+        log(f"   Latence p99: {latency['measured_p99_max']:.3f} ms au pire "
+            f"(annoncé {latency['claimed'][0]}–{latency['claimed'][1]} ms) "
+            f"{'✅' if latency['met'] else '❌'}")
+
+    if output:
+        with open(output, 'w') as handle:
+            json.dump(suite, handle, indent=2)
+        log(f"\n💾 Résultats JSON: {output}")
+
+    if not baseline_path or not os.path.exists(baseline_path):
+        log("\nℹ️  Pas de référence: comparaison ignorée")
+        return True
+    with open(baseline_path) as handle:
+        baseline = json.load(handle)
+    regressions = compare_with_baseline(suite, baseline, threshold)
+    log(f"\n📊 COMPARAISON À LA RÉFÉRENCE ({baseline_path}, seuil {threshold * 100:.0f} %)")
+    if not regressions:
+        log("   ✅ Aucune régression")
+        return True
+    for regression in regressions:
+        log(f"   ❌ {regression['case']} {regression['metric']}: {regression['baseline']:.2f} → "
+            f"{regression['measured']:.2f} ({regression['change'] * 100:+.1f} %)")
+    return False
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Suite de benchmarks TAP")
+    parser.add_argument("--quick", action="store_true", help="Moins d'itérations")
+    parser.add_argument("--output", "-o", help="Fichier JSON des résultats")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Référence JSON à comparer")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Régression tolérée (fraction, 0.25 = 25 %%)")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="Enregistre les résultats comme nouvelle référence")
+    parser.add_argument("--runs", type=int, default=3,
+                        help="Exécutions combinées (médiane) pour --save-baseline")
+    args = parser.parse_args(argv)
+
+    if args.save_baseline:
+        suite = median_suite([run_suite(quick=args.quick) for _ in range(max(1, args.runs))])
+        with open(args.baseline, 'w') as handle:
+            json.dump(suite, handle, indent=2)
+        print(f"\n💾 Référence enregistrée: {args.baseline}")
+        return 0
+    suite = run_suite(quick=args.quick)
+    return 0 if report(suite, args.baseline, args.threshold, args.output) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
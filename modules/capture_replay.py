@@ -0,0 +1,216 @@
+import os
+import re
+import struct
+import time
+
+# Format binaire compact: en-tête puis enregistrements de taille fixe
+CAPTURE_MAGIC = b'TAPCAP1\x00'
+CAPTURE_RECORD = struct.Struct('<dIB8s')  # horodatage_ms, can_id, dlc, données
+CACHE_SUFFIX = '.tapcap'
+READ_RECORDS = 4096  # Enregistrements lus par bloc (mémoire constante)
+CAN_MAX_DLEN = 8  # CAN classique: les trames CAN FD (jusqu'à 64 octets) sont ignorées
+
+# candump -L: (1436509052.249713) vcan0 123#1122334455667788 (CAN FD: 123##<drapeaux><données>)
+_CANDUMP_LOG = re.compile(r'^\s*\((\d+\.\d+)\)\s+\S+\s+([0-9A-Fa-f]+)(##?)(R?)([0-9A-Fa-f]*)(?:\s|$)')
+# candump -t a: (1436509052.249713)  vcan0  123   [8]  11 22 33 44 55 66 77 88
+_CANDUMP_TEXT = re.compile(r'^\s*(?:\((\d+\.\d+)\)\s+)?\S+\s+([0-9A-Fa-f]+)\s+\[(\d+)\]\s*(.*)$')
+
+
+def parse_candump(lines):
+    """
+    Analyse en flux une capture candump (-L ou texte horodaté)
+
+    Les trames CAN FD (« ## » ou plus de 8 octets) sont ignorées: le
+    format Micro-MAC et le cache binaire sont limités au CAN classique.
+
+    Yields:
+        tuple: (horodatage_ms, can_id, données) pour chaque trame de données
+    """
+    for line in lines:
+        match = _CANDUMP_LOG.match(line)
+        if match:
+            payload = match.group(5)
+            if match.group(3) == '##' or match.group(4) or len(payload) > 2 * CAN_MAX_DLEN:
+                continue  # Trame CAN FD, ou distante (RTR) sans données
+            yield (float(match.group(1)) * 1000.0, int(match.group(2), 16), bytes.fromhex(payload))
+            continue
+        match = _CANDUMP_TEXT.match(line)
+        if match and match.group(1):
+            dlc = int(match.group(3))
+            if dlc > CAN_MAX_DLEN or 'remote' in line.lower():
+                continue
+            payload = match.group(4).split()
+            yield (float(match.group(1)) * 1000.0, int(match.group(2), 16),
+                   bytes(int(byte, 16) for byte in payload[:dlc]))
+
+
+def parse_asc(lines):
+    """
+    Analyse en flux un journal Vector ASC
+
+    Seules les trames de données CAN classiques (« d », 8 octets au plus)
+    sont retenues; les trames distantes, d'erreur, CAN FD et les
+    événements sont ignorés. L'en-tête
+    « base hex|dec » fixe la base des identifiants; un « x » final
+    marque un identifiant étendu.
+
+    Yields:
+        tuple: (horodatage_ms, can_id, données)
+    """
+    base = 16
+    for line in lines:
+        fields = line.split()
+        if not fields:
+            continue
+        if fields[0] == 'base' and len(fields) > 1:
+            base = 10 if fields[1] == 'dec' else 16
+            continue
+        # <temps> <canal> <id> Rx|Tx d <dlc> <octets...>
+        if len(fields) < 6 or fields[4] != 'd' or fields[3] not in ('Rx', 'Tx'):
+            continue
+        try:
+            timestamp_s = float(fields[0])
+            can_id = int(fields[2].rstrip('xX'), base)
+            dlc = int(fields[5], 16)
+            if dlc > CAN_MAX_DLEN:
+                continue
+            data = bytes(int(byte, 16) for byte in fields[6:6 + dlc])
+        except ValueError:
+            continue  # Ligne d'événement (ErrorFrame, Statistic...)
+        yield timestamp_s * 1000.0, can_id, data
+
+
+def _pack_record(timestamp_ms, can_id, data):
+    if len(data) > CAN_MAX_DLEN:
+        raise ValueError(f"Trame de {len(data)} octets (CAN FD?) pour 0x{can_id:X}: "
+                         f"le format binaire est limité à {CAN_MAX_DLEN} octets")
+    return CAPTURE_RECORD.pack(timestamp_ms, can_id, len(data), data)
+
+
+def write_capture(records, path):
+    """Écrit des (horodatage_ms, can_id, données) au format binaire (flux)
+
+    Raises:
+        ValueError: données de plus de 8 octets (trame CAN FD)
+    """
+    count = 0
+    with open(path, 'wb') as handle:
+        handle.write(CAPTURE_MAGIC)
+        for timestamp_ms, can_id, data in records:
+            handle.write(_pack_record(timestamp_ms, can_id, data))
+            count += 1
+    return count
+
+
+def read_capture(path):
+    """
+    Lit en flux un fichier binaire produit par write_capture
+
+    Yields:
+        tuple: (horodatage_ms, can_id, données)
+    """
+    size = CAPTURE_RECORD.size
+    with open(path, 'rb') as handle:
+        if handle.read(len(CAPTURE_MAGIC)) != CAPTURE_MAGIC:
+            raise ValueError(f"Fichier de capture binaire invalide: {path}")
+        while True:
+            block = handle.read(size * READ_RECORDS)
+            if not block:
+                break
+            block = block[:len(block) - len(block) % size]  # Enregistrement tronqué ignoré
+            for timestamp_ms, can_id, dlc, data in CAPTURE_RECORD.iter_unpack(block):
+                yield timestamp_ms, can_id, data[:dlc]
+
+
+def _caching(records, cache_path):
+    """Relaie les enregistrements tout en écrivant le cache binaire"""
+    temporary = cache_path + '.tmp'
+    handle = open(temporary, 'wb')  # Échec d'ouverture propagé tel quel: rien à supprimer
+    try:
+        with handle:
+            handle.write(CAPTURE_MAGIC)
+            for record in records:
+                timestamp_ms, can_id, data = record
+                handle.write(_pack_record(timestamp_ms, can_id, data))
+                yield record
+    except BaseException:
+        # Lecture interrompue: pas de cache partiel
+        os.remove(temporary)
+        raise
+    # Cache publié seulement si la capture a été lue jusqu'au bout
+    os.replace(temporary, cache_path)
+
+
+def open_capture(path, capture_format=None, cache=True):
+    """
+    Ouvre une capture (candump, ASC ou binaire) en flux
+
+    Au premier passage d'un fichier texte, un cache binaire (path + .tapcap)
+    est écrit au fil de la lecture; les passages suivants le relisent tant
+    qu'il est plus récent que la source.
+
+    Args:
+        capture_format: 'candump', 'asc' ou 'binary' (déduit de l'extension sinon)
+
+    Yields:
+        tuple: (horodatage_ms, can_id, données)
+    """
+    if capture_format is None:
+        extension = os.path.splitext(path)[1].lower()
+        capture_format = {'.asc': 'asc', CACHE_SUFFIX: 'binary'}.get(extension, 'candump')
+    if capture_format == 'binary':
+        return read_capture(path)
+
+    cache_path = path + CACHE_SUFFIX
+    if cache and os.path.exists(cache_path) and os.path.getmtime(cache_path) >= os.path.getmtime(path):
+        return read_capture(cache_path)
+
+    parser = parse_asc if capture_format == 'asc' else parse_candump
+    records = _parse_file(path, parser)
+    return _caching(records, cache_path) if cache else records
+
+
+def _parse_file(path, parser):
+    with open(path, 'r', encoding='utf-8', errors='replace') as handle:
+        yield from parser(handle)
+
+
+def to_frames(records):
+    """Convertit des enregistrements de capture en (can_id, trame, horodatage_ms)"""
+    for timestamp_ms, can_id, data in records:
+        yield can_id, data, timestamp_ms
+
+
+def paced(frames, speed=1.0, clock=time.monotonic, sleep=time.sleep):
+    """Cadence un flux de trames sur ses horodatages d'origine (speed = facteur d'accélération)"""
+    start_clock = None
+    first_ms = None
+    for frame in frames:
+        timestamp_ms = frame[2]
+        if start_clock is None:
+            start_clock = clock()
+            first_ms = timestamp_ms
+        else:
+            delay = (timestamp_ms - first_ms) / 1000.0 / speed - (clock() - start_clock)
+            if delay > 0:
+                sleep(delay)
+        yield frame
+
+
+def replay(pipeline, records, speed=None, batch_size=None):
+    """
+    Rejoue une capture dans un pipeline TAP
+
+    Args:
+        speed: None = aussi vite que possible, sinon cadencé sur les
+            horodatages d'origine (1.0 = temps réel)
+        batch_size: taille des micro-lots (mode rapide uniquement)
+
+    Yields:
+        Verdict: Un verdict par trame
+    """
+    frames = to_frames(records)
+    if speed is not None:
+        yield from pipeline.process_stream(paced(frames, speed))
+    else:
+        yield from pipeline.process_stream(frames, batch_size=batch_size)
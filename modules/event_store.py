@@ -0,0 +1,419 @@
+import mmap
+import os
+import queue
+import struct
+import threading
+import time
+from collections import namedtuple
+
+# Enregistrement fixe de 32 octets: code, niveau, auxiliaire, slot du
+# capteur (ou du groupe), horodatage ns, deux valeurs de charge utile
+# (événements de sécurité: valeur, puis slot du texte de détails)
+RECORD = struct.Struct('<HBBIqdd')
+RECORD_SIZE = RECORD.size
+# En-tête de segment (aligné sur un enregistrement): magique, taille
+# d'enregistrement, version, nombre d'enregistrements validés
+HEADER = struct.Struct('<8sHHIQ')
+HEADER_SIZE = RECORD_SIZE
+MAGIC = b'TAPEVT01'
+VERSION = 1
+
+SEGMENT_PREFIX = 'events-'
+SEGMENT_SUFFIX = '.seg'
+NAMES_FILE = 'names.txt'
+DETAILS_FILE = 'details.txt'
+READ_CHUNK_RECORDS = 4096
+
+# Codes d'événements (0 = emplacement vide, jamais écrit)
+EVENT_TIMING_ANOMALY = 1
+EVENT_VOTE = 2
+EVENT_SECURITY_OTHER = 15
+SECURITY_EVENT_BASE = 16
+SECURITY_EVENT_TYPES = ('BLOCKED', 'MAC_INVALID', 'TIMING_INVALID', 'ANOMALY_DETECTED',
+                        'BLOCK_SENSOR', 'ESCALATE', 'DEESCALATE', 'CHALLENGE_SENT',
+                        'CHALLENGE_ERROR', 'CHALLENGE_PASS', 'CHALLENGE_FAIL',
+                        'SENSOR_BLOCKED', 'SENSOR_UNBLOCKED', 'TEST_ANOMALY', 'REPLAY')
+SECURITY_EVENT_CODES = {name: SECURITY_EVENT_BASE + i for i, name in enumerate(SECURITY_EVENT_TYPES)}
+EVENT_NAMES = {EVENT_TIMING_ANOMALY: 'TIMING_ANOMALY', EVENT_VOTE: 'VOTE',
+               EVENT_SECURITY_OTHER: 'SECURITY_OTHER'}
+EVENT_NAMES.update((code, name) for name, code in SECURITY_EVENT_CODES.items())
+
+NO_SLOT = 0  # Slot réservé: pas de capteur (ou pas de détails)
+
+Event = namedtuple('Event', 'sequence code name sensor timestamp_ns level aux a b details')
+
+
+def _segment_path(directory, base):
+    return os.path.join(directory, f"{SEGMENT_PREFIX}{base:020d}{SEGMENT_SUFFIX}")
+
+
+def list_segments(directory):
+    """Segments d'un répertoire: [(numéro du premier enregistrement, chemin)] triés"""
+    segments = []
+    for filename in os.listdir(directory):
+        if filename.startswith(SEGMENT_PREFIX) and filename.endswith(SEGMENT_SUFFIX):
+            base = int(filename[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)])
+            segments.append((base, os.path.join(directory, filename)))
+    return sorted(segments)
+
+
+def load_names(directory, filename=NAMES_FILE):
+    """Table slot -> nom (slot 0 réservé), ou slot -> détails avec DETAILS_FILE"""
+    names = [None]
+    path = os.path.join(directory, filename)
+    if os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            names.extend(line.rstrip('\n') for line in f)
+    return names
+
+
+def is_security_event(code):
+    return code == EVENT_SECURITY_OTHER or code >= SECURITY_EVENT_BASE
+
+
+def _read_count(buffer):
+    """
+    Nombre d'enregistrements d'un segment
+
+    Au-delà du compteur de l'en-tête, les enregistrements de code non nul
+    (copiés avant un arrêt brutal, en-tête non mis à jour) sont repris.
+    """
+    magic, record_size, version, _, count = HEADER.unpack_from(buffer, 0)
+    if magic != MAGIC or record_size != RECORD_SIZE:
+        raise ValueError("Segment d'événements invalide")
+    capacity = (len(buffer) - HEADER_SIZE) // RECORD_SIZE
+    while count < capacity and buffer[HEADER_SIZE + count * RECORD_SIZE:
+                                      HEADER_SIZE + count * RECORD_SIZE + 2] != b'\0\0':
+        count += 1
+    return count
+
+
+def read_events(directory, start=0, codes=None, sensors=None, start_ns=None, end_ns=None, names=None,
+                details=None):
+    """
+    Relit les événements d'un magasin (en cours d'écriture ou fermé), en flux
+
+    Chaque segment est projeté en lecture seule et décodé par blocs: la
+    mémoire utilisée ne dépend pas du nombre d'événements.
+
+    Args:
+        start: numéro de séquence du premier événement (les segments
+            supprimés par rotation sont ignorés)
+        codes: codes d'événements retenus (tous par défaut)
+        sensors: noms de capteurs ou de groupes retenus
+        start_ns / end_ns: bornes d'horodatage (incluses), filtrées
+            enregistrement par enregistrement: l'horloge murale pouvant
+            reculer, l'ordre des horodatages n'est pas supposé
+
+    Yields:
+        Event: (sequence, code, name, sensor, timestamp_ns, level, aux, a, b,
+            details), details étant le texte d'un événement de sécurité
+            (None sinon)
+    """
+    names = load_names(directory) if names is None else names
+    details = load_names(directory, DETAILS_FILE) if details is None else details
+    codes = set(codes) if codes is not None else None
+    if sensors is not None:
+        wanted = set(sensors)
+        slots = {slot for slot, name in enumerate(names) if name in wanted}
+    else:
+        slots = None
+    event_names = EVENT_NAMES
+
+    for base, path in list_segments(directory):
+        with open(path, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                count = _read_count(mm)
+                if base + count <= start or count == 0:
+                    continue
+                index = max(0, start - base)
+                while index < count:
+                    stop = min(count, index + READ_CHUNK_RECORDS)
+                    chunk = mm[HEADER_SIZE + index * RECORD_SIZE:HEADER_SIZE + stop * RECORD_SIZE]
+                    sequence = base + index
+                    for code, level, aux, slot, timestamp_ns, a, b in RECORD.iter_unpack(chunk):
+                        sequence += 1
+                        if codes is not None and code not in codes:
+                            continue
+                        if slots is not None and slot not in slots:
+                            continue
+                        if start_ns is not None and timestamp_ns < start_ns:
+                            continue
+                        if end_ns is not None and timestamp_ns > end_ns:
+                            continue
+                        text = None
+                        if is_security_event(code) and 0 < b < len(details):
+                            text = details[int(b)]
+                        yield Event(sequence - 1, code, event_names.get(code, str(code)),
+                                    names[slot] if slot < len(names) else slot,
+                                    timestamp_ns, level, aux, a, b, text)
+                    index = stop
+
+
+def to_log_entry(event):
+    """Entrée au format des anciens journaux en mémoire (anomalie, sécurité ou vote)"""
+    if event.code == EVENT_TIMING_ANOMALY:
+        return {'sensor_id': event.sensor, 'expected': event.a, 'actual': event.b,
+                'diff': event.b - event.a, 'tolerance': event.aux}
+    if event.code == EVENT_VOTE:
+        return {'group_name': event.sensor, 'success': bool(event.level),
+                'value': None if event.a != event.a else event.a, 'median': event.b,
+                'consistent_readings': event.aux,
+                'timestamp': time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(event.timestamp_ns / 1e9))}
+    return {'timestamp': time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(event.timestamp_ns / 1e9)),
+            'sensor_id': event.sensor, 'event_type': event.name, 'details': event.details, 'value': event.a,
+            'security_level': ('NORMAL', 'MEDIUM', 'HIGH')[event.level] if event.level < 3 else event.level}
+
+
+class EventStore:
+    """Journal d'événements binaire en ajout seul (anomalies, sécurité, votes)
+
+    Les événements sont des enregistrements fixes de 32 octets (code,
+    slot du capteur, horodatage ns, petite charge utile) écrits dans des
+    segments projetés en mémoire (mmap) de segment_records
+    enregistrements; un segment plein est fermé et le suivant créé
+    (rotation), max_segments limitant le nombre de segments conservés.
+    Les noms de capteurs et de groupes sont remplacés par un slot entier,
+    la table des noms étant ajoutée à names.txt à chaque nouveau nom; de
+    même le texte de détails d'un événement de sécurité (log(details=...))
+    est remplacé par un slot de details.txt, rangé dans la charge utile b.
+
+    append() ne fait qu'encoder l'enregistrement dans un tampon de
+    batch_records enregistrements; le tampon plein est copié d'un bloc
+    dans le segment et le compteur de l'en-tête mis à jour (flush); sync()
+    force l'écriture sur disque. Un écrivain unique par répertoire.
+
+    Par défaut (background=True), le tampon plein est transmis à un
+    thread écrivain (au plus pending_batches lots en attente, au-delà
+    append() attend) qui fait la copie et la rotation (fermeture du
+    segment, création et troncature du suivant, suppression des anciens);
+    les lectures, sync() et close() attendent que les lots transmis soient
+    écrits, et une erreur de l'écrivain est relevée par l'appel suivant.
+    Avec background=False, copie et rotation s'exécutent dans l'append()
+    qui remplit le tampon: ce message subit une pause proportionnelle à
+    batch_records, plus longue lors d'une rotation.
+
+    À la réouverture, l'écriture reprend à la fin du dernier segment; les
+    enregistrements copiés mais non comptés dans l'en-tête (arrêt brutal)
+    sont récupérés (code non nul).
+    """
+
+    def __init__(self, directory, segment_records=1 << 20, batch_records=1024, max_segments=None,
+                 background=True, pending_batches=2):
+        if segment_records < 1 or batch_records < 1 or pending_batches < 1:
+            raise ValueError("segment_records, batch_records et pending_batches doivent être positifs")
+        self.directory = directory
+        self.segment_records = segment_records
+        self.batch_records = batch_records
+        self.max_segments = max_segments
+        self.clock = time.time_ns
+        os.makedirs(directory, exist_ok=True)
+
+        self._names = load_names(directory)
+        self._slots = {name: slot for slot, name in enumerate(self._names) if slot != NO_SLOT}
+        self._names_file = open(os.path.join(directory, NAMES_FILE), 'a', encoding='utf-8')
+        self._details = load_names(directory, DETAILS_FILE)
+        self._detail_slots = {text: slot for slot, text in enumerate(self._details) if slot != NO_SLOT}
+        self._details_file = open(os.path.join(directory, DETAILS_FILE), 'a', encoding='utf-8')
+
+        self._staging = bytearray(batch_records * RECORD_SIZE)
+        self._staged = 0
+        self._file = self._mmap = None
+        segments = list_segments(directory)
+        self._open_segment(segments[-1][0] if segments else 0, create=not segments)
+        self._sequence = self._base + self._count
+        self.rotations = 0
+
+        self._writer = None
+        self._writer_error = None
+        if background:
+            self._pending = queue.Queue(maxsize=pending_batches)
+            self._writer = threading.Thread(target=self._write_loop, name='event-store-writer',
+                                            daemon=True)
+            self._writer.start()
+
+    # --- Segments ---
+
+    def _open_segment(self, base, create):
+        path = _segment_path(self.directory, base)
+        if create:
+            with open(path, 'wb') as f:
+                f.truncate(HEADER_SIZE + self.segment_records * RECORD_SIZE)
+                f.write(HEADER.pack(MAGIC, RECORD_SIZE, VERSION, 0, 0))
+        self._file = open(path, 'r+b')
+        self._mmap = mmap.mmap(self._file.fileno(), 0)
+        self._base = base
+        self._capacity = (len(self._mmap) - HEADER_SIZE) // RECORD_SIZE
+        self._count = _read_count(self._mmap)
+        self._write_count()  # Enregistrements récupérés validés
+
+    def _write_count(self):
+        HEADER.pack_into(self._mmap, 0, MAGIC, RECORD_SIZE, VERSION, 0, self._count)
+
+    def _close_segment(self):
+        self._write_count()
+        self._mmap.flush()
+        self._mmap.close()
+        self._file.close()
+        self._file = self._mmap = None
+
+    def _rotate(self):
+        self._close_segment()
+        self._open_segment(self._base + self._capacity, create=True)
+        self.rotations += 1
+        if self.max_segments is not None:
+            for _, path in list_segments(self.directory)[:-self.max_segments]:
+                os.remove(path)
+
+    # --- Écriture ---
+
+    def slot(self, name):
+        """Slot entier d'un capteur ou d'un groupe (créé et persisté au premier usage)"""
+        if name is None:
+            return NO_SLOT
+        slot = self._slots.get(name)
+        if slot is None:
+            name = str(name)
+            if '\n' in name:
+                raise ValueError(f"Nom invalide: {name!r}")
+            slot = self._slots.get(name)
+            if slot is None:
+                slot = self._intern(self._names, self._names_file, name)
+            self._slots[name] = slot
+        return slot
+
+    def detail_slot(self, text):
+        """Slot du texte de détails d'un événement (retours à la ligne remplacés)"""
+        if not text:
+            return NO_SLOT
+        slot = self._detail_slots.get(text)
+        if slot is None:
+            slot = self._intern(self._details, self._details_file, text.replace('\n', ' '))
+            self._detail_slots[text] = slot
+        return slot
+
+    @staticmethod
+    def _intern(table, table_file, text):
+        table.append(text)
+        table_file.write(text + '\n')
+        table_file.flush()
+        return len(table) - 1
+
+    def name(self, slot):
+        return self._names[slot] if slot < len(self._names) else None
+
+    def append(self, code, slot, a=0.0, b=0.0, level=0, aux=0, timestamp_ns=None):
+        """Ajoute un événement au tampon (copié dans le segment par lot)"""
+        if timestamp_ns is None:
+            timestamp_ns = self.clock()
+        RECORD.pack_into(self._staging, self._staged * RECORD_SIZE, code, level, aux, slot,
+                         timestamp_ns, a, b)
+        self._staged += 1
+        self._sequence += 1
+        if self._staged == self.batch_records:
+            self.flush()
+
+    def log(self, code, name, a=0.0, b=0.0, level=0, aux=0, timestamp_ns=None, details=None):
+        """append() avec le nom du capteur ou du groupe (details: texte rangé dans b)"""
+        if details is not None:
+            b = float(self.detail_slot(details))
+        slot = self._slots.get(name)
+        self.append(code, self.slot(name) if slot is None else slot, a, b, level, aux, timestamp_ns)
+
+    def _write_records(self, data, total):
+        """Copie total enregistrements dans le(s) segment(s) (rotation comprise)"""
+        written = 0
+        while written < total:
+            if self._count == self._capacity:
+                self._rotate()
+            take = min(total - written, self._capacity - self._count)
+            offset = HEADER_SIZE + self._count * RECORD_SIZE
+            self._mmap[offset:offset + take * RECORD_SIZE] = data[written * RECORD_SIZE:(written + take) * RECORD_SIZE]
+            self._count += take
+            written += take
+            self._write_count()
+
+    def _write_loop(self):
+        """Thread écrivain: copie les lots transmis par flush() (None: arrêt)"""
+        while True:
+            batch = self._pending.get()
+            try:
+                if batch is None:
+                    return
+                if self._writer_error is None:
+                    self._write_records(batch, len(batch) // RECORD_SIZE)
+            except Exception as exc:
+                self._writer_error = exc
+            finally:
+                self._pending.task_done()
+
+    def _check_writer(self):
+        if self._writer_error is not None:
+            error, self._writer_error = self._writer_error, None
+            raise RuntimeError("Échec de l'écrivain du magasin d'événements") from error
+
+    def _drain(self):
+        """Attend l'écriture des lots transmis au thread écrivain"""
+        if self._writer is not None:
+            self._pending.join()
+            self._check_writer()
+
+    def flush(self):
+        """Copie le tampon dans le(s) segment(s) et valide le compteur d'en-tête
+
+        Avec l'écrivain d'arrière-plan, le tampon est seulement transmis
+        (copie en bytes) et la copie dans le segment est asynchrone.
+        """
+        if self._writer is not None:
+            self._check_writer()
+            if self._staged:
+                self._pending.put(bytes(self._staging[:self._staged * RECORD_SIZE]))
+                self._staged = 0
+            return
+        if not self._staged:
+            return
+        with memoryview(self._staging) as data:
+            self._write_records(data, self._staged)
+        self._staged = 0
+
+    def sync(self):
+        """flush() puis écriture sur disque du segment courant"""
+        self.flush()
+        self._drain()
+        self._mmap.flush()
+
+    def close(self):
+        if self._mmap is None:
+            return
+        self.flush()
+        if self._writer is not None:
+            self._pending.put(None)
+            self._writer.join()
+            self._writer = None
+        self._close_segment()
+        self._names_file.close()
+        self._details_file.close()
+        self._check_writer()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def __len__(self):
+        """Numéro de séquence du prochain événement (événements écrits depuis la création)"""
+        return self._sequence
+
+    # --- Lecture ---
+
+    def events(self, start=0, codes=None, sensors=None, start_ns=None, end_ns=None):
+        """Itère les événements écrits (tampon inclus, voir read_events)"""
+        self.flush()
+        self._drain()
+        return read_events(self.directory, start, codes, sensors, start_ns, end_ns, names=self._names,
+                           details=self._details)
+
+    def segments(self):
+        return list_segments(self.directory)
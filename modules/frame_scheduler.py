@@ -0,0 +1,146 @@
+import heapq
+from bisect import bisect_left
+
+# Classes de priorité par ID d'arbitrage CAN (ID plus faible = plus prioritaire)
+PRIORITY_CLASSES = (
+    ('critique', 0x0FF),   # Freinage, direction
+    ('controle', 0x3FF),   # Groupe motopropulseur, châssis
+    ('confort', 0x7FF),    # Habitacle, info-divertissement
+    ('etendu', 0x1FFFFFFF)  # Identifiants étendus 29 bits
+)
+
+
+class FrameScheduler:
+    """Ordonnanceur de trames en attente, par priorité CAN puis par échéance
+
+    Placé avant la vérification: les trames en attente sont servies par
+    classe de priorité (ID d'arbitrage), puis par échéance au sein d'une
+    classe (earliest deadline first). L'échéance d'une trame est son
+    horodatage d'arrivée plus l'intervalle attendu du capteur
+    (TimingVerifier): au-delà, la trame suivante du même capteur est due
+    et celle-ci est périmée. Seules les trames périmées sont abandonnées.
+
+    Insertion et retrait en O(log n): un tas principal (classe, échéance,
+    séquence) et un tas d'échéances pour l'expiration, avec suppression
+    paresseuse. Pour un même capteur, les échéances croissent avec
+    l'arrivée: l'ordre par capteur est préservé.
+    """
+
+    def __init__(self, timing_module, sensors_by_can_id, priority_classes=PRIORITY_CLASSES,
+                 default_deadline_ms=100, on_drop=None):
+        self.timing_module = timing_module
+        self.sensors_by_can_id = sensors_by_can_id
+        self.class_names = [name for name, _ in priority_classes]
+        self._class_bounds = [bound for _, bound in priority_classes]
+        self.default_deadline_ms = default_deadline_ms
+        self.on_drop = on_drop
+        self._priorities = {}  # can_id -> classe (fixe: dépend du seul ID d'arbitrage)
+        self._queue = []  # tas [classe, échéance, séquence, trame]
+        self._deadlines = []  # tas (échéance, séquence, entrée)
+        self._seq = 0
+        self._size = 0
+        n = len(priority_classes)
+        self.scheduled = [0] * n
+        self.dropped = [0] * n
+        self.latency_total = [0.0] * n
+        self.latency_max = [0.0] * n
+
+    @classmethod
+    def for_pipeline(cls, pipeline, **kwargs):
+        """Ordonnanceur partageant les capteurs et le TimingVerifier d'un TAPPipeline"""
+        return cls(pipeline.timing_module, pipeline.sensors_by_can_id, **kwargs)
+
+    def __len__(self):
+        return self._size
+
+    def _priority(self, can_id):
+        priority = self._priorities.get(can_id)
+        if priority is None:
+            priority = min(bisect_left(self._class_bounds, can_id), len(self._class_bounds) - 1)
+            self._priorities[can_id] = priority
+        return priority
+
+    def _budget(self, can_id):
+        """Budget d'échéance lu à chaque trame: suit les capteurs enregistrés ou modifiés depuis"""
+        sensor = self.timing_module.sensors.get(self.sensors_by_can_id.get(can_id))
+        return sensor['expected_interval'] if sensor else self.default_deadline_ms
+
+    def push(self, can_id, frame, timestamp_ms):
+        """Ajoute une trame reçue (O(log n))"""
+        priority = self._priority(can_id)
+        deadline = timestamp_ms + self._budget(can_id)
+        seq = self._seq
+        self._seq = seq + 1
+        entry = [priority, deadline, seq, (can_id, frame, timestamp_ms)]
+        heapq.heappush(self._queue, entry)
+        heapq.heappush(self._deadlines, (deadline, seq, entry))
+        self._size += 1
+
+    def expire(self, now_ms):
+        """Abandonne les trames dont l'échéance est dépassée"""
+        deadlines = self._deadlines
+        while deadlines and deadlines[0][0] < now_ms:
+            _, _, entry = heapq.heappop(deadlines)
+            frame = entry[3]
+            if frame is None:
+                continue  # Déjà servie
+            entry[3] = None
+            self._size -= 1
+            self.dropped[entry[0]] += 1
+            if self.on_drop is not None:
+                self.on_drop(frame)
+
+    def pop(self, now_ms):
+        """Retire la trame la plus prioritaire encore valide (None si vide)"""
+        self.expire(now_ms)
+        queue = self._queue
+        while queue:
+            entry = heapq.heappop(queue)
+            frame = entry[3]
+            if frame is None:
+                continue  # Abandonnée
+            entry[3] = None
+            self._size -= 1
+            priority = entry[0]
+            latency = now_ms - frame[2]
+            self.scheduled[priority] += 1
+            self.latency_total[priority] += latency
+            if latency > self.latency_max[priority]:
+                self.latency_max[priority] = latency
+            return frame
+        return None
+
+    def pop_batch(self, max_frames, now_ms):
+        """Retire jusqu'à max_frames trames, par ordre de priorité"""
+        batch = []
+        while len(batch) < max_frames:
+            frame = self.pop(now_ms)
+            if frame is None:
+                break
+            batch.append(frame)
+        # Purge des entrées servies ou abandonnées restées dans les tas
+        if len(self._deadlines) > 2 * self._size + 64:
+            self._deadlines = [item for item in self._deadlines if item[2][3] is not None]
+            heapq.heapify(self._deadlines)
+        if len(self._queue) > 2 * self._size + 64:
+            self._queue = [entry for entry in self._queue if entry[3] is not None]
+            heapq.heapify(self._queue)
+        return batch
+
+    def run(self, pipeline, now_ms, max_frames):
+        """Sert un lot de trames au pipeline (budget de max_frames)"""
+        batch = self.pop_batch(max_frames, now_ms)
+        return pipeline.process_batch(batch) if batch else []
+
+    def get_latency_stats(self):
+        """Latence d'ordonnancement (ms) et abandons par classe de priorité"""
+        stats = {}
+        for i, name in enumerate(self.class_names):
+            count = self.scheduled[i]
+            stats[name] = {
+                'scheduled': count,
+                'dropped': self.dropped[i],
+                'mean_latency_ms': self.latency_total[i] / count if count else 0.0,
+                'max_latency_ms': self.latency_max[i]
+            }
+        return stats
@@ -0,0 +1,341 @@
+import abc
+import asyncio
+import heapq
+import os
+import socket
+import struct
+import time
+from collections import deque
+
+# Format du bus virtuel: enregistrements concaténés dans un datagramme
+WIRE_RECORD = struct.Struct('>Id8s')  # can_id, horodatage_ms, trame
+MAX_RECORDS_PER_DATAGRAM = 64
+
+
+class FrameQueue:
+    """File bornée de trames (can_id, trame, horodatage_ms) avec politique de surcharge
+
+    Politiques:
+        block: put_many() attend de la place (contre-pression vers le transport)
+        drop_oldest: la trame la plus ancienne est évincée
+        drop_newest: la trame entrante est refusée
+        drop_lowest_priority: la trame de plus faible priorité CAN (ID le plus
+            élevé, la plus récente à ID égal) est évincée, éventuellement
+            la trame entrante elle-même
+    """
+
+    BLOCK = 'block'
+    DROP_OLDEST = 'drop_oldest'
+    DROP_NEWEST = 'drop_newest'
+    DROP_LOWEST_PRIORITY = 'drop_lowest_priority'
+    POLICIES = (BLOCK, DROP_OLDEST, DROP_NEWEST, DROP_LOWEST_PRIORITY)
+
+    def __init__(self, capacity=4096, policy=BLOCK):
+        if policy not in self.POLICIES:
+            raise ValueError(f"Politique de surcharge inconnue: {policy}")
+        self.capacity = capacity
+        self.policy = policy
+        self._entries = deque()  # [seq, trame]; trame None = évincée
+        self._priority = []  # tas (-can_id, -seq, entrée), politique drop_lowest_priority
+        self._size = 0
+        self._seq = 0
+        self._readable = asyncio.Event()
+        self._writable = asyncio.Event()
+        self._writable.set()
+        self.dropped = 0
+        self.max_depth = 0
+
+    def __len__(self):
+        return self._size
+
+    def _append(self, frame):
+        entry = [self._seq, frame]
+        self._seq += 1
+        self._entries.append(entry)
+        if self.policy == self.DROP_LOWEST_PRIORITY:
+            heapq.heappush(self._priority, (-frame[0], -entry[0], entry))
+        self._size += 1
+
+    def _evict_lowest_priority(self, frame):
+        """Évince la trame de plus faible priorité; True si la trame entrante est gardée"""
+        heap = self._priority
+        while heap and heap[0][2][1] is None:
+            heapq.heappop(heap)
+        if not heap or -heap[0][0] <= frame[0]:
+            return False  # La trame entrante est la moins prioritaire
+        heapq.heappop(heap)[2][1] = None
+        self._size -= 1
+        return True
+
+    def put_nowait(self, frame):
+        """Ajoute une trame selon la politique; False si la trame entrante est refusée"""
+        if self._size >= self.capacity:
+            self.dropped += 1
+            if self.policy == self.DROP_OLDEST:
+                self._pop_entry()
+            elif self.policy != self.DROP_LOWEST_PRIORITY or not self._evict_lowest_priority(frame):
+                return False  # drop_newest, ou block appelé sans attendre
+        self._append(frame)
+        if self._size > self.max_depth:
+            self.max_depth = self._size
+        if self._size >= self.capacity:
+            self._writable.clear()
+        self._readable.set()
+        return True
+
+    async def put_many(self, frames):
+        """Ajoute un lot de trames (attend de la place en politique block)"""
+        if self.policy != self.BLOCK:
+            for frame in frames:
+                self.put_nowait(frame)
+            return
+        for frame in frames:
+            while self._size >= self.capacity:
+                await self._writable.wait()
+            self.put_nowait(frame)
+
+    def _pop_entry(self):
+        entries = self._entries
+        while entries:
+            entry = entries.popleft()
+            frame = entry[1]
+            if frame is not None:
+                entry[1] = None
+                self._size -= 1
+                return frame
+        return None
+
+    def get_batch_nowait(self, max_frames):
+        """Retire jusqu'à max_frames trames disponibles, dans l'ordre d'arrivée"""
+        batch = []
+        while self._size and len(batch) < max_frames:
+            batch.append(self._pop_entry())
+        if not self._size:
+            self._readable.clear()
+        if self._size < self.capacity:
+            self._writable.set()
+        # Purge des entrées consommées restées dans le tas de priorité
+        if len(self._priority) > 2 * self.capacity:
+            self._priority = [item for item in self._priority if item[2][1] is not None]
+            heapq.heapify(self._priority)
+        return batch
+
+    async def get_batch(self, max_frames):
+        """Attend au moins une trame puis retire tout ce qui est disponible (max_frames)"""
+        while not self._size:
+            self._readable.clear()
+            await self._readable.wait()
+        return self.get_batch_nowait(max_frames)
+
+
+class FrameTransport(abc.ABC):
+    """Interface d'adaptateur de bus CAN
+
+    Un adaptateur d'interface réelle implémente read_batch() (abstraite) et
+    au besoin open() et close(). read_batch() retourne, à chaque réveil de la boucle
+    d'événements, toutes les trames disponibles (au plus max_frames) sous
+    forme de tuples (can_id, trame, horodatage_ms), et une liste vide
+    quand le transport est fermé.
+    """
+
+    async def open(self):
+        pass
+
+    @abc.abstractmethod
+    async def read_batch(self, max_frames):
+        """Trames disponibles (au plus max_frames), [] une fois fermé"""
+
+    def close(self):
+        pass
+
+    async def run(self, queue, max_frames=256):
+        """Pompe les trames du transport vers la file jusqu'à sa fermeture"""
+        while True:
+            frames = await self.read_batch(max_frames)
+            if not frames:
+                break
+            await queue.put_many(frames)
+
+
+class _VirtualBusProtocol(asyncio.DatagramProtocol):
+    def __init__(self, bus):
+        self.bus = bus
+
+    def datagram_received(self, data, addr):
+        self.bus._on_datagram(data)
+
+    def error_received(self, exc):
+        self.bus.errors += 1
+
+
+class VirtualBusTransport(FrameTransport):
+    """Bus CAN virtuel sur datagrammes UDP ou socket Unix (tests locaux)
+
+    address: (hôte, port) pour UDP, chemin pour une socket Unix datagramme.
+    Les datagrammes reçus sont accumulés jusqu'à max_pending trames; au-delà,
+    la lecture de la socket est suspendue et le noyau absorbe (puis perd)
+    le surplus: la mémoire reste bornée même si le consommateur est lent.
+    """
+
+    def __init__(self, address=('127.0.0.1', 0), max_pending=4096):
+        self.address = address
+        self.max_pending = max_pending
+        self._pending = deque()
+        self._data_ready = asyncio.Event()
+        self._transport = None
+        self._paused = False
+        self._closed = False
+        self.datagrams = 0
+        self.malformed = 0
+        self.errors = 0
+
+    async def open(self):
+        loop = asyncio.get_running_loop()
+        if isinstance(self.address, str):
+            if os.path.exists(self.address):
+                os.unlink(self.address)
+            self._transport, _ = await loop.create_datagram_endpoint(
+                lambda: _VirtualBusProtocol(self), local_addr=self.address,
+                family=socket.AF_UNIX)
+        else:
+            self._transport, _ = await loop.create_datagram_endpoint(
+                lambda: _VirtualBusProtocol(self), local_addr=self.address)
+            # Port effectif si le port 0 a été demandé
+            self.address = self._transport.get_extra_info('sockname')[:2]
+
+    def _on_datagram(self, data):
+        self.datagrams += 1
+        size = WIRE_RECORD.size
+        if len(data) % size:
+            self.malformed += 1
+            return
+        now_ms = time.monotonic() * 1000.0
+        pending = self._pending
+        for can_id, timestamp_ms, frame in WIRE_RECORD.iter_unpack(data):
+            # Horodatage nul: estampillé à la réception
+            pending.append((can_id, frame, timestamp_ms or now_ms))
+        self._data_ready.set()
+        if len(pending) >= self.max_pending and not self._paused:
+            self._transport.pause_reading()
+            self._paused = True
+
+    async def read_batch(self, max_frames):
+        pending = self._pending
+        while not pending:
+            if self._closed:
+                return []
+            self._data_ready.clear()
+            await self._data_ready.wait()
+        count = min(max_frames, len(pending))
+        batch = [pending.popleft() for _ in range(count)]
+        if self._paused and len(pending) < self.max_pending // 2:
+            self._transport.resume_reading()
+            self._paused = False
+        return batch
+
+    def close(self):
+        self._closed = True
+        self._data_ready.set()
+        if self._transport is not None:
+            self._transport.close()
+            self._transport = None
+        if isinstance(self.address, str) and os.path.exists(self.address):
+            os.unlink(self.address)
+
+
+class VirtualBusSender:
+    """Émetteur synchrone vers un VirtualBusTransport (simulateur de capteurs)"""
+
+    def __init__(self, address):
+        self.address = address
+        family = socket.AF_UNIX if isinstance(address, str) else socket.AF_INET
+        self.sock = socket.socket(family, socket.SOCK_DGRAM)
+
+    def send(self, frames):
+        """Envoie des (can_id, trame, horodatage_ms), regroupées par datagramme"""
+        pack = WIRE_RECORD.pack
+        for start in range(0, len(frames), MAX_RECORDS_PER_DATAGRAM):
+            chunk = frames[start:start + MAX_RECORDS_PER_DATAGRAM]
+            payload = b''.join(pack(can_id, timestamp_ms, frame)
+                               for can_id, frame, timestamp_ms in chunk)
+            self.sock.sendto(payload, self.address)
+
+    def close(self):
+        self.sock.close()
+
+
+class CANIngestionService:
+    """Service asyncio d'ingestion: transport -> file bornée -> pipeline TAP
+
+    Le transport remplit la file; le consommateur retire à chaque réveil
+    toutes les trames disponibles (au plus batch_size) et les traite en
+    micro-lot. Une rafale est absorbée par la file bornée; au-delà de sa
+    capacité, la politique de surcharge s'applique.
+    """
+
+    def __init__(self, pipeline, transport, queue_size=4096, policy=FrameQueue.BLOCK,
+                 batch_size=256, on_verdict=None):
+        self.pipeline = pipeline
+        self.transport = transport
+        self.queue = FrameQueue(queue_size, policy)
+        self.batch_size = batch_size
+        self.on_verdict = on_verdict
+        self.frames_processed = 0
+        self.batches = 0
+        self._process = getattr(pipeline, 'process_batch', None)
+        self._running = False
+        self.ready = asyncio.Event()  # Transport ouvert (adresse effective connue)
+
+    def _process_frames(self, frames):
+        if self._process is not None:
+            return self._process(frames)
+        return list(self.pipeline.process_stream(frames))
+
+    async def run(self):
+        """Démarre le transport et traite les trames jusqu'à stop()"""
+        await self.transport.open()
+        self._running = True
+        self.ready.set()
+        reader = asyncio.ensure_future(self.transport.run(self.queue, self.batch_size))
+        try:
+            while self._running or len(self.queue):
+                if not len(self.queue) and reader.done():
+                    if not reader.cancelled():
+                        reader.result()  # Propage une erreur du transport
+                    break
+                getter = asyncio.ensure_future(self.queue.get_batch(self.batch_size))
+                done, _ = await asyncio.wait({getter, reader},
+                                             return_when=asyncio.FIRST_COMPLETED)
+                if getter not in done:
+                    getter.cancel()
+                    continue
+                self._consume(getter.result())
+                await asyncio.sleep(0)  # Laisse le transport lire entre deux lots
+        finally:
+            self.transport.close()
+            reader.cancel()
+
+    def _consume(self, frames):
+        verdicts = self._process_frames(frames)
+        self.frames_processed += len(frames)
+        self.batches += 1
+        if self.on_verdict is not None:
+            for verdict in verdicts:
+                self.on_verdict(verdict)
+
+    def stop(self):
+        """Arrête la lecture; les trames déjà en file sont traitées"""
+        self._running = False
+        self.transport.close()
+
+    def get_stats(self):
+        """Retourne les compteurs d'ingestion"""
+        return {
+            'frames_processed': self.frames_processed,
+            'batches': self.batches,
+            'average_batch': self.frames_processed / self.batches if self.batches else 0,
+            'queue_depth': len(self.queue),
+            'max_queue_depth': self.queue.max_depth,
+            'frames_dropped': self.queue.dropped,
+            'overload_policy': self.queue.policy
+        }
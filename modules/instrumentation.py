@@ -0,0 +1,217 @@
+import threading
+import time
+from array import array
+from bisect import bisect_right
+
+from modules.pipeline import STAGES, Verdict
+
+# Étapes chronométrées: décodage, étapes de vérification, escalade, vote
+TIMED_STAGES = ('decode',) + STAGES + ('escalation', 'voting')
+STAGE_TOTAL = 'total'
+HISTOGRAM_STAGES = TIMED_STAGES + (STAGE_TOTAL,)
+
+# Bornes supérieures des seaux de latence (ns); un seau de débordement en plus
+DEFAULT_BUCKETS_NS = (250, 500, 1000, 2000, 5000, 10000, 20000, 50000, 100000,
+                      200000, 500000, 1000000, 2000000, 5000000, 10000000)
+
+UNKNOWN_SENSOR_SLOT = 0  # Trames d'un CAN ID non enregistré
+
+
+class PipelineInstrumentation:
+    """Instrumentation à faible coût du pipeline TAP
+
+    Une trame sur sample_every est chronométrée étape par étape avec
+    perf_counter_ns; chaque durée alimente un histogramme à seaux fixes.
+    Les verdicts sont comptés pour toutes les trames, globalement et par
+    capteur. Tous les compteurs vivent dans des tableaux préalloués
+    (array 'Q'), sans dictionnaire par trame.
+
+    snapshot(reset=True) lit et remet à zéro l'ensemble sous un verrou:
+    une trame est comptée entièrement dans un instantané ou dans le
+    suivant, jamais à cheval (lecture possible depuis un autre thread).
+
+    Désactivée (TAPPipeline(instrumentation=None), par défaut), le
+    pipeline ne paie qu'un test « is None » par étape.
+    """
+
+    def __init__(self, sample_rate=1.0, buckets_ns=DEFAULT_BUCKETS_NS, sensor_capacity=64):
+        if not 0 < sample_rate <= 1:
+            raise ValueError("sample_rate doit être dans ]0, 1]")
+        self.sample_rate = sample_rate
+        self.sample_every = max(1, round(1 / sample_rate))
+        self.buckets_ns = tuple(buckets_ns)
+        self.clock = time.perf_counter_ns
+        self._bucket_count = len(self.buckets_ns) + 1
+        self._stage_index = {stage: i for i, stage in enumerate(HISTOGRAM_STAGES)}
+        self._reasons = len(Verdict.REASON_NAMES)
+        self._sensor_slots = {None: UNKNOWN_SENSOR_SLOT}
+        self._sensor_offsets = {None: UNKNOWN_SENSOR_SLOT}  # capteur -> slot * nombre de raisons
+        self._sensor_names = [None]
+        self._capacity = max(1, sensor_capacity)
+        self._countdown = 1
+        self._lock = threading.Lock()
+        self._allocate()
+
+    def _allocate(self):
+        stages = len(HISTOGRAM_STAGES)
+        self.sampled_frames = 0
+        self.histograms = array('Q', bytes(8 * stages * self._bucket_count))
+        self.stage_time_ns = array('Q', bytes(8 * stages))
+        self.stage_samples = array('Q', bytes(8 * stages))
+        self.verdict_counts = array('Q', bytes(8 * self._reasons))
+        self.sensor_verdicts = array('Q', bytes(8 * self._capacity * self._reasons))
+
+    def register_sensor(self, sensor_id):
+        """Réserve la ligne de compteurs du capteur (agrandit le tableau si besoin)"""
+        with self._lock:
+            if sensor_id in self._sensor_slots:
+                return self._sensor_slots[sensor_id]
+            slot = len(self._sensor_names)
+            if slot >= self._capacity:
+                # Doublement hors du chemin critique (enregistrement des capteurs)
+                self.sensor_verdicts.extend(bytes(8 * self._capacity * self._reasons))
+                self._capacity *= 2
+            self._sensor_slots[sensor_id] = slot
+            self._sensor_offsets[sensor_id] = slot * self._reasons
+            self._sensor_names.append(sensor_id)
+            return slot
+
+    def start_trace(self):
+        """
+        Décide si la trame courante est chronométrée
+
+        Returns:
+            list ou None: trace [(étape, ns), ...] à compléter par le pipeline
+        """
+        self._countdown -= 1
+        if self._countdown:
+            return None
+        self._countdown = self.sample_every
+        return [('decode', self.clock())]
+
+    def sample_positions(self, n):
+        """Positions des trames chronométrées dans un lot de n trames"""
+        first = self._countdown - 1
+        positions = range(first, n, self.sample_every)
+        self._countdown = (first - n) % self.sample_every + 1
+        return positions
+
+    def record(self, sensor_id, reason, trace=None):
+        """Compte le verdict d'une trame et, si elle est tracée, ses durées par étape
+
+        La trace est close ici: la dernière étape s'arrête à l'appel.
+        """
+        # Capteur non déclaré à l'instrumentation: ligne des inconnus
+        offset = self._sensor_offsets.get(sensor_id, UNKNOWN_SENSOR_SLOT)
+        with self._lock:
+            self.verdict_counts[reason] += 1
+            self.sensor_verdicts[offset + reason] += 1
+            if trace is not None:
+                trace.append((None, self.clock()))
+                self._record_trace(trace)
+
+    def record_batch(self, sensor_ids, reasons, traces):
+        """Version micro-lot de record (un seul passage sous le verrou)
+
+        Args:
+            traces: traces des trames chronométrées, déjà closes par (None, ns)
+        """
+        offsets = self._sensor_offsets.get
+        with self._lock:
+            verdict_counts = self.verdict_counts
+            sensor_verdicts = self.sensor_verdicts
+            for sensor_id, reason in zip(sensor_ids, reasons):
+                verdict_counts[reason] += 1
+                sensor_verdicts[offsets(sensor_id, UNKNOWN_SENSOR_SLOT) + reason] += 1
+            for trace in traces:
+                self._record_trace(trace)
+
+    def _record_trace(self, trace):
+        """
+        Durée de chaque étape = écart jusqu'à la marque suivante (verrou tenu)
+
+        Une marque (None, ns) clôt l'étape précédente sans en ouvrir une
+        autre: en micro-lot, le temps passé sur les autres trames du lot
+        n'est pas compté. Le total est la somme des étapes.
+        """
+        self.sampled_frames += 1
+        index = self._stage_index
+        total = 0
+        for (stage, start), (_, stop) in zip(trace, trace[1:]):
+            if stage is not None:
+                self._observe(index[stage], stop - start)
+                total += stop - start
+        self._observe(index[STAGE_TOTAL], total)
+
+    def _observe(self, stage, duration_ns):
+        self.histograms[stage * self._bucket_count + bisect_right(self.buckets_ns, duration_ns)] += 1
+        self.stage_time_ns[stage] += duration_ns
+        self.stage_samples[stage] += 1
+
+    def reset(self):
+        with self._lock:
+            self._allocate()
+
+    def snapshot(self, reset=False):
+        """
+        Instantané cohérent des compteurs et histogrammes
+
+        Args:
+            reset: remet les compteurs à zéro dans la même section critique
+
+        Returns:
+            dict: trames, verdicts (global et par capteur), étapes (histogrammes)
+        """
+        with self._lock:
+            sampled = self.sampled_frames
+            histograms = self.histograms
+            stage_time, stage_samples = self.stage_time_ns, self.stage_samples
+            verdicts, sensor_verdicts = self.verdict_counts, self.sensor_verdicts
+            names = list(self._sensor_names)
+            if reset:
+                self._allocate()  # Les anciens tableaux ne sont plus écrits
+            else:
+                histograms, stage_time, stage_samples = histograms[:], stage_time[:], stage_samples[:]
+                verdicts, sensor_verdicts = verdicts[:], sensor_verdicts[:]
+
+        reason_names = Verdict.REASON_NAMES
+        buckets = self._bucket_count
+        stages = {}
+        for i, stage in enumerate(HISTOGRAM_STAGES):
+            counts = list(histograms[i * buckets:(i + 1) * buckets])
+            samples = stage_samples[i]
+            stages[stage] = {
+                'samples': samples,
+                'total_ns': stage_time[i],
+                'mean_ns': stage_time[i] / samples if samples else None,
+                'p50_ns': self._bucket_quantile(counts, 0.50),
+                'p99_ns': self._bucket_quantile(counts, 0.99),
+                'buckets': counts
+            }
+        sensors = {}
+        for slot, sensor_id in enumerate(names):
+            row = sensor_verdicts[slot * self._reasons:(slot + 1) * self._reasons]
+            if any(row):
+                sensors[sensor_id] = {reason_names[r]: row[r] for r in range(self._reasons) if row[r]}
+        return {
+            'frames': sum(verdicts),
+            'sampled_frames': sampled,
+            'sample_every': self.sample_every,
+            'bucket_bounds_ns': list(self.buckets_ns),
+            'verdicts': dict(zip(reason_names, verdicts)),
+            'sensors': sensors,
+            'stages': stages
+        }
+
+    def _bucket_quantile(self, counts, fraction):
+        """Borne supérieure du seau contenant le quantile (None si débordement ou vide)"""
+        total = sum(counts)
+        if not total:
+            return None
+        target = fraction * total
+        seen = 0
+        for i, count in enumerate(counts):
+            seen += count
+            if seen >= target:
+                return self.buckets_ns[i] if i < len(self.buckets_ns) else None
+        return None
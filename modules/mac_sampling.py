@@ -0,0 +1,181 @@
+import hashlib
+import math
+import os
+from array import array
+
+TABLE_SIZE = 0x10000  # Une entrée par numéro de séquence 16 bits
+RATE_STEPS = 256      # Quantification du taux (mise en cache des écarts)
+CAN_FRAME_BITS = 111  # Trame standard de 8 octets, hors bits de bourrage
+
+
+class MacSamplingPolicy:
+    """Échantillonnage adaptatif de la vérification Micro-MAC au niveau NORMAL
+
+    Au niveau NORMAL, sur un bus sain, seule une fraction des trames de
+    chaque capteur est vérifiée. La fraction dépend de la charge
+    (set_load): max_rate à faible charge, min_rate à pleine charge. Le
+    pipeline appelle observe() à chaque trame reçue: la charge est mesurée
+    sur des fenêtres de load_window_ms (bits reçus / débit du bus). Avec
+    bitrate=None, la charge n'est fixée que par set_load.
+
+    La sélection est déterministe mais imprévisible sans la clé: une
+    table de 65536 valeurs pseudo-aléatoires est dérivée de la clé
+    (BLAKE2b) et la trame de séquence s du capteur c est vérifiée si
+    table[(s + décalage(c)) mod 2^16] < taux * 2^16. Le décalage propre à
+    chaque capteur est lui aussi dérivé de la clé.
+
+    Toute anomalie (promote), ou un niveau d'escalade différent de
+    NORMAL, rétablit immédiatement la vérification complète pendant
+    hold_ms.
+    """
+
+    def __init__(self, key=None, min_rate=0.25, max_rate=1.0, load_low=0.5, load_high=0.9,
+                 hold_ms=5000, bitrate=500000, frame_bits=CAN_FRAME_BITS, load_window_ms=100):
+        if not 0 < min_rate <= max_rate <= 1:
+            raise ValueError("Taux d'échantillonnage invalide (0 < min_rate <= max_rate <= 1)")
+        self.key = key if key is not None else os.urandom(16)
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.load_low = load_low
+        self.load_high = load_high
+        self.hold_ms = hold_ms
+        self.bitrate = bitrate
+        self.frame_bits = frame_bits
+        self.load_window_ms = load_window_ms
+        self._window_start_ms = None
+        self._window_frames = 0
+        self.table = self._build_table(self.key)
+        self._offsets = {}
+        self._gap_cache = {}
+        self.promoted_until_ms = None
+        self.verified = 0
+        self.skipped = 0
+        self.promotions = 0
+        self.set_load(0.0)
+
+    @staticmethod
+    def _build_table(key):
+        """Table pseudo-aléatoire de 65536 valeurs 16 bits dérivée de la clé"""
+        table = array('H')
+        for block in range(TABLE_SIZE // 32):
+            digest = hashlib.blake2b(block.to_bytes(4, 'big'), key=key, digest_size=64).digest()
+            table.frombytes(digest)
+        return table
+
+    def set_load(self, load):
+        """Ajuste le taux selon la charge (0 = bus calme, 1 = saturé)"""
+        self.load = load
+        if load <= self.load_low:
+            rate = self.max_rate
+        elif load >= self.load_high:
+            rate = self.min_rate
+        else:
+            span = (load - self.load_low) / (self.load_high - self.load_low)
+            rate = self.max_rate - (self.max_rate - self.min_rate) * span
+        step = max(1, round(rate * RATE_STEPS))
+        self.rate = step / RATE_STEPS
+        self._threshold = step * (TABLE_SIZE // RATE_STEPS)
+
+    def observe(self, now_ms):
+        """Compte une trame reçue; chaque fenêtre écoulée met à jour la charge mesurée"""
+        if self.bitrate is None:
+            return
+        start = self._window_start_ms
+        if start is None:
+            self._window_start_ms = now_ms
+        elif now_ms - start >= self.load_window_ms:
+            bits = self._window_frames * self.frame_bits
+            self.set_load(bits * 1000 / (self.bitrate * (now_ms - start)))
+            self._window_start_ms = now_ms
+            self._window_frames = 0
+        self._window_frames += 1
+
+    def _offset(self, sensor_id):
+        offset = self._offsets.get(sensor_id)
+        if offset is None:
+            digest = hashlib.blake2b(str(sensor_id).encode(), key=self.key, digest_size=2).digest()
+            offset = self._offsets[sensor_id] = int.from_bytes(digest, 'big')
+        return offset
+
+    def promote(self, now_ms):
+        """Vérification complète immédiate (anomalie détectée)"""
+        if not self.is_promoted(now_ms):
+            self.promotions += 1
+        self.promoted_until_ms = now_ms + self.hold_ms
+
+    def is_promoted(self, now_ms):
+        return self.promoted_until_ms is not None and now_ms < self.promoted_until_ms
+
+    def should_verify(self, sensor_id, sequence, now_ms, normal_level=True):
+        """
+        Indique si la trame doit être vérifiée
+
+        Args:
+            normal_level: False si l'escalade a quitté NORMAL (promotion immédiate)
+        """
+        if not normal_level:
+            self.promote(now_ms)
+        if (self._threshold >= TABLE_SIZE or self.is_promoted(now_ms)
+                or self.table[(sequence + self._offset(sensor_id)) & 0xFFFF] < self._threshold):
+            self.verified += 1
+            return True
+        self.skipped += 1
+        return False
+
+    def max_unverified_run(self):
+        """Plus longue suite de séquences consécutives non vérifiées au taux courant"""
+        threshold = self._threshold
+        gap = self._gap_cache.get(threshold)
+        if gap is None:
+            table = self.table
+            # Parcours circulaire: on commence juste après une séquence vérifiée
+            start = next((i for i in range(TABLE_SIZE) if table[i] < threshold), None)
+            if start is None:
+                gap = TABLE_SIZE
+            else:
+                gap = run = 0
+                for i in range(1, TABLE_SIZE + 1):
+                    if table[(start + i) & 0xFFFF] < threshold:
+                        run = 0
+                    else:
+                        run += 1
+                        if run > gap:
+                            gap = run
+            self._gap_cache[threshold] = gap
+        return gap
+
+    def detection_delay_frames(self, confidence=0.999):
+        """Trames forgées nécessaires pour être détecté avec la confiance donnée
+
+        Sans la clé, chaque trame forgée est vérifiée avec la probabilité
+        du taux courant, indépendamment de la séquence choisie.
+        """
+        if self.rate >= 1:
+            return 1
+        return math.ceil(math.log(1 - confidence) / math.log(1 - self.rate))
+
+    def get_stats(self, interval_ms=None, confidence=0.999):
+        """Taux effectif et délai de détection au pire cas impliqué
+
+        Args:
+            interval_ms: période du capteur, pour exprimer les délais en ms
+        """
+        total = self.verified + self.skipped
+        frames = self.detection_delay_frames(confidence)
+        worst_run = self.max_unverified_run()
+        stats = {
+            'load': self.load,
+            'target_rate': self.rate,
+            'effective_rate': self.verified / total if total else 1.0,
+            'frames_verified': self.verified,
+            'frames_skipped': self.skipped,
+            'promotions': self.promotions,
+            'detection_delay_frames': frames,
+            'detection_confidence': confidence,
+            # Pire cas pour une suite de séquences consécutives (séquenceur légitime)
+            'max_unverified_run': worst_run
+        }
+        if interval_ms is not None:
+            stats['detection_delay_ms'] = frames * interval_ms
+            stats['max_unverified_run_ms'] = (worst_run + 1) * interval_ms
+        return stats
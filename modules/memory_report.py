@@ -0,0 +1,248 @@
+import os
+import sys
+import tracemalloc
+import types
+from array import array
+from collections import deque
+
+# Objets jamais parcourus: code partagé, pas de l'état retenu par le pipeline
+_OPAQUE = (type, types.ModuleType, types.FunctionType, types.MethodType,
+           types.BuiltinFunctionType, types.BuiltinMethodType, types.CodeType)
+
+_SMALL_INT_MIN, _SMALL_INT_MAX = -5, 256  # Cache des petits entiers de CPython
+
+MODULES_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Attribut du pipeline -> nom du module dans le rapport
+PIPELINE_MODULES = (
+    ('mac_module', 'mac'),
+    ('timing_module', 'timing'),
+    ('escalation_module', 'escalation'),
+    ('voting_module', 'voting'),
+    ('replay_window', 'replay_window'),
+    ('mac_sampling', 'mac_sampling'),
+    ('instrumentation', 'instrumentation')
+)
+
+# Journaux sans borne, rapportés à part (ils croissent avec le trafic, pas avec les capteurs)
+LOGS = (
+    ('timing_module', 'anomaly_log'),
+    ('escalation_module', 'security_log'),
+    ('voting_module', 'voting_history')
+)
+
+
+def deep_sizeof(obj, seen=None):
+    """
+    Taille retenue d'un objet et de tout ce qu'il référence (sys.getsizeof)
+
+    Args:
+        seen: ensemble d'id déjà comptés (partagé entre appels pour ne
+            compter qu'une fois les objets communs)
+    """
+    if seen is None:
+        seen = set()
+    total = 0
+    stack = [obj]
+    while stack:
+        current = stack.pop()
+        if id(current) in seen or isinstance(current, _OPAQUE) or _is_singleton(current):
+            continue
+        seen.add(id(current))
+        total += sys.getsizeof(current)
+        if isinstance(current, dict):
+            stack.extend(current.keys())
+            stack.extend(current.values())
+        elif isinstance(current, (list, tuple, set, frozenset, deque)):
+            stack.extend(current)
+        elif isinstance(current, (str, bytes, bytearray, array, int, float)):
+            continue
+        else:
+            attributes = getattr(current, '__dict__', None)
+            if attributes is not None:
+                stack.append(attributes)
+            for cls in type(current).__mro__:
+                for name in getattr(cls, '__slots__', ()):
+                    value = getattr(current, name, None)
+                    if value is not None:
+                        stack.append(value)
+    return total
+
+
+def _is_singleton(obj):
+    """None, booléens et petits entiers: partagés par l'interpréteur, jamais retenus"""
+    return obj is None or obj is True or obj is False or (
+        type(obj) is int and _SMALL_INT_MIN <= obj <= _SMALL_INT_MAX)
+
+
+def _share_field_names(record, seen):
+    """Les noms de champs d'un enregistrement (clés str) sont communs à tous les enregistrements"""
+    if isinstance(record, dict):
+        seen.update(id(field) for field in record if isinstance(field, str))
+
+
+def _entry(mapping, key, seen):
+    """Part d'une entrée de dictionnaire: table amortie + valeur (hors clé partagée)"""
+    if key not in mapping:
+        return 0
+    value = mapping[key]
+    _share_field_names(value, seen)
+    return sys.getsizeof(mapping) // max(len(mapping), 1) + deep_sizeof(value, seen)
+
+
+def sensor_footprint(pipeline, sensor_id):
+    """
+    Octets retenus par un capteur, par module (mode estimation)
+
+    Chaque entrée de dictionnaire compte pour sa part de la table
+    (taille du dictionnaire / nombre d'entrées) plus sa valeur.
+
+    Returns:
+        dict: {module: octets, 'total': octets}
+    """
+    seen = {id(sensor_id)}
+    footprint = {'sensor_id': sys.getsizeof(sensor_id)}
+
+    can_ids = pipeline.can_ids_by_sensor.get(sensor_id, ())
+    footprint['pipeline'] = (_entry(pipeline.can_ids_by_sensor, sensor_id, seen)
+                             + sum(_entry(pipeline.sensors_by_can_id, can_id, seen)
+                                   + deep_sizeof(can_id, seen) for can_id in can_ids))
+
+    footprint['timing'] = _entry(pipeline.timing_module.sensors, sensor_id, seen)
+
+    window = pipeline.replay_window
+    footprint['replay_window'] = (_entry(window.highest, sensor_id, seen)
+                                  + _entry(window.seen, sensor_id, seen)) if window is not None else 0
+
+    voting = pipeline.voting_module
+    size = _entry(voting.sensor_groups, sensor_id, seen) + _entry(voting.sensor_slots, sensor_id, seen)
+    if sensor_id in voting.sensor_slots:
+        size += voting.trust.itemsize
+    for group_name in voting.sensor_groups.get(sensor_id, ()):
+        group = voting.voting_groups[group_name]
+        size += _entry(group['sensors'], sensor_id, seen) + _entry(group['order'].by_sensor, sensor_id, seen)
+    footprint['voting'] = size
+
+    sampling = pipeline.mac_sampling
+    footprint['mac_sampling'] = _entry(sampling._offsets, sensor_id, seen) if sampling is not None else 0
+
+    instrumentation = pipeline.instrumentation
+    if instrumentation is not None and sensor_id in instrumentation._sensor_slots:
+        footprint['instrumentation'] = (_entry(instrumentation._sensor_slots, sensor_id, seen)
+                                        + _entry(instrumentation._sensor_offsets, sensor_id, seen)
+                                        + instrumentation._reasons * instrumentation.sensor_verdicts.itemsize)
+    else:
+        footprint['instrumentation'] = 0
+
+    footprint['total'] = sum(footprint.values())
+    return footprint
+
+
+def group_footprint(pipeline, group_name):
+    """Octets retenus par un groupe de vote (lectures triées, historique, cache)"""
+    group = pipeline.voting_module.voting_groups.get(group_name)
+    if group is None:
+        return None
+    # Tables sensors/readings réparties entre les empreintes des capteurs
+    seen = {id(group['sensors']), id(group['readings']), id(group['order'].by_sensor)}
+    _share_field_names(group, seen)
+    return deep_sizeof(group, seen)
+
+
+def memory_report(pipeline, mode='estimate', per_sensor=False, per_group=False, top=10):
+    """
+    Rapport mémoire d'un pipeline TAP
+
+    Args:
+        mode: 'estimate' (parcours sys.getsizeof, sans surcoût préalable)
+            ou 'tracemalloc' (allocations vivantes réellement retenues,
+            groupées par fichier source; tracemalloc doit être actif
+            depuis la construction du pipeline, voir trace_allocations)
+        per_sensor / per_group: ajoute les top plus gros capteurs / groupes
+
+    Returns:
+        dict: octets par module, journaux, total et octets par capteur
+    """
+    if mode not in ('estimate', 'tracemalloc'):
+        raise ValueError(f"Mode inconnu: {mode}")
+    sensors = len(pipeline.can_ids_by_sensor)
+    groups = len(pipeline.voting_module.voting_groups)
+
+    seen = set()
+    logs = {}
+    for module_attribute, log_attribute in LOGS:
+        log = getattr(getattr(pipeline, module_attribute), log_attribute)
+        logs[f"{module_attribute.replace('_module', '')}.{log_attribute}"] = {
+            'entries': len(log), 'bytes': deep_sizeof(log, seen)}
+
+    if mode == 'estimate':
+        modules = {}
+        for attribute, name in PIPELINE_MODULES:
+            component = getattr(pipeline, attribute, None)
+            if component is not None:
+                modules[name] = deep_sizeof(component, seen)
+        modules['pipeline'] = deep_sizeof(pipeline, seen)  # État propre (tables CAN ID, bitmap)
+    else:
+        modules = _traced_by_module()
+
+    log_bytes = sum(entry['bytes'] for entry in logs.values())
+    # En mode tracemalloc, les journaux sont déjà comptés dans leur fichier source
+    total = sum(modules.values()) + (log_bytes if mode == 'estimate' else 0)
+    report = {
+        'mode': mode,
+        'sensors': sensors,
+        'groups': groups,
+        'modules': modules,
+        'logs': logs,
+        'total_bytes': total,
+        # Hors journaux: ce qui croît avec la population de capteurs
+        'bytes_per_sensor': (total - log_bytes) / sensors if sensors else None
+    }
+    if per_sensor:
+        sizes = {sensor_id: sensor_footprint(pipeline, sensor_id)['total']
+                 for sensor_id in pipeline.can_ids_by_sensor}
+        report['per_sensor'] = dict(sorted(sizes.items(), key=lambda item: -item[1])[:top])
+    if per_group:
+        sizes = {name: group_footprint(pipeline, name) for name in pipeline.voting_module.voting_groups}
+        report['per_group'] = dict(sorted(sizes.items(), key=lambda item: -item[1])[:top])
+    return report
+
+
+def _traced_by_module():
+    """Octets vivants alloués par chaque fichier de modules/ (tracemalloc actif)"""
+    if not tracemalloc.is_tracing():
+        raise RuntimeError("tracemalloc doit être actif depuis la construction du pipeline "
+                           "(voir trace_allocations)")
+    modules = {}
+    # Chemins normalisés: modules/ peut être importé via un chemin relatif (ex: benchmarks/..)
+    for stat in tracemalloc.take_snapshot().statistics('filename'):
+        filename = os.path.abspath(stat.traceback[0].filename)
+        if os.path.dirname(filename) == MODULES_DIR:
+            name = os.path.splitext(os.path.basename(filename))[0]
+            modules[name] = modules.get(name, 0) + stat.size
+    return modules
+
+
+def trace_allocations(build):
+    """
+    Construit un objet sous tracemalloc et mesure ce qu'il retient
+
+    Args:
+        build: fonction sans argument (ex: construction et amorçage d'un pipeline)
+
+    Returns:
+        tuple: (résultat de build, octets retenus, rapport tracemalloc par
+            fichier de modules/ si le résultat est un pipeline)
+    """
+    already = tracemalloc.is_tracing()
+    if not already:
+        tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = build()
+        retained = tracemalloc.get_traced_memory()[0] - before
+        report = memory_report(result, mode='tracemalloc') if hasattr(result, 'can_ids_by_sensor') else None
+    finally:
+        if not already:
+            tracemalloc.stop()
+    return result, retained, report
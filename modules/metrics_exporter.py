@@ -0,0 +1,257 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from modules.event_store import EVENT_TIMING_ANOMALY
+from modules.pipeline import Verdict
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+PUBLISH_CHECK_EVERY = 256  # Verdicts entre deux lectures de l'horloge (watch)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels) + '}'
+
+
+def _format_value(value):
+    if value is None:
+        return 'NaN'
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class MetricsExporter:
+    """Exposition des statistiques TAP au format texte Prometheus
+
+    Le serveur HTTP tourne sur un thread d'arrière-plan et ne lit jamais
+    l'état du pipeline: publish(), appelé depuis le thread de traitement
+    (directement, via maybe_publish ou en enveloppant le flux de verdicts
+    avec watch), construit un instantané immuable des métriques puis le
+    publie par simple affectation de référence. Une requête /metrics se
+    contente de mettre en forme le dernier instantané: elle ne prend
+    aucun verrou partagé avec le traitement des trames et ne peut donc
+    pas le ralentir.
+    """
+
+    def __init__(self, pipeline, host='127.0.0.1', port=9109, namespace='tap',
+                 publish_interval_s=1.0, per_sensor=False):
+        self.pipeline = pipeline
+        self.host = host
+        self.port = port
+        self.namespace = namespace
+        self.publish_interval_s = publish_interval_s
+        self.per_sensor = per_sensor  # Séries par capteur (cardinalité élevée)
+        self.clock = time.monotonic
+        self._snapshot = ()
+        self._last_publish = None  # (instant, trames traitées)
+        self._throughput = 0.0
+        self._anomaly_cursor = 0
+        self._anomalies_by_sensor = {}
+        self._server = None
+        self._thread = None
+        self.scrapes = 0
+
+    # --- Côté traitement ---
+
+    def publish(self, now=None):
+        """Construit et publie un instantané (thread de traitement uniquement)"""
+        now = self.clock() if now is None else now
+        frames = self.pipeline.frames_processed
+        if self._last_publish is not None:
+            elapsed = now - self._last_publish[0]
+            if elapsed > 0:
+                self._throughput = (frames - self._last_publish[1]) / elapsed
+        self._last_publish = (now, frames)
+        self._snapshot = tuple(self._collect())  # Affectation atomique de la référence
+
+    def maybe_publish(self, now=None):
+        """Publie si publish_interval_s s'est écoulé depuis la dernière publication"""
+        now = self.clock() if now is None else now
+        if self._last_publish is None or now - self._last_publish[0] >= self.publish_interval_s:
+            self.publish(now)
+
+    def watch(self, verdicts):
+        """Relaie un flux de verdicts en publiant périodiquement les métriques"""
+        countdown = PUBLISH_CHECK_EVERY
+        for verdict in verdicts:
+            yield verdict
+            countdown -= 1
+            if not countdown:
+                countdown = PUBLISH_CHECK_EVERY
+                self.maybe_publish()
+        self.publish()
+
+    def _metric(self, name, kind, help_text, samples):
+        return (f'{self.namespace}_{name}', kind, help_text, tuple(samples))
+
+    def _collect(self):
+        """Familles de métriques: (nom, type, aide, ((suffixe, étiquettes, valeur), ...))"""
+        pipeline = self.pipeline
+        escalation = pipeline.escalation_module
+        voting = pipeline.voting_module
+        timing = pipeline.timing_module
+
+        yield self._metric('frames_processed_total', 'counter', 'Trames traitées',
+                           [('', (), pipeline.frames_processed)])
+        yield self._metric('frames_total', 'counter', 'Trames par verdict',
+                           [('', (('reason', name),), count)
+                            for name, count in zip(Verdict.REASON_NAMES, pipeline.reason_counts)])
+        yield self._metric('throughput_frames_per_second', 'gauge',
+                           'Débit entre les deux dernières publications',
+                           [('', (), self._throughput)])
+        yield self._metric('stage_rejections_total', 'counter', 'Trames rejetées par étape',
+                           [('', (('stage', stage),), count)
+                            for stage, count in pipeline.stage_rejections.items()])
+
+        instrumentation = getattr(pipeline, 'instrumentation', None)
+        if instrumentation is not None:
+            yield self._latency_histogram(instrumentation.snapshot())
+
+        yield self._metric('security_level', 'gauge', "Niveau d'escalade (0=NORMAL, 1=MEDIUM, 2=HIGH)",
+                           [('', (), escalation.sec_level)])
+        yield self._metric('blocked_sensors', 'gauge', 'Capteurs bloqués',
+                           [('', (), len(escalation.blocked_sensors))])
+        yield self._metric('pending_challenges', 'gauge', 'Challenges en attente de réponse',
+                           [('', (), len(escalation.challenges))])
+
+        votes, successes, ratios = [], [], []
+        for group_name in list(voting.voting_groups):
+            stats = voting.get_group_stats(group_name)
+            if stats is None:
+                continue
+            labels = (('group', group_name),)
+            votes.append(('', labels, stats['total_votes']))
+            successes.append(('', labels, stats['successful_votes']))
+            ratios.append(('', labels, stats['successful_votes'] / stats['total_votes']
+                           if stats['total_votes'] else None))
+        yield self._metric('votes_total', 'counter', 'Votes par groupe', votes)
+        yield self._metric('votes_successful_total', 'counter', 'Votes avec consensus par groupe',
+                           successes)
+        yield self._metric('vote_success_ratio', 'gauge', 'Taux de consensus par groupe', ratios)
+
+        yield from self._timing_metrics(timing)
+
+    def _latency_histogram(self, snapshot):
+        """Histogramme Prometheus (seaux cumulés, secondes) à partir de l'instrumentation"""
+        bounds = snapshot['bucket_bounds_ns']
+        samples = []
+        for stage, entry in snapshot['stages'].items():
+            labels = (('stage', stage),)
+            cumulative = 0
+            for bound, count in zip(bounds + [None], entry['buckets']):
+                cumulative += count
+                le = '+Inf' if bound is None else repr(bound / 1e9)
+                samples.append(('_bucket', labels + (('le', le),), cumulative))
+            samples.append(('_sum', labels, entry['total_ns'] / 1e9))
+            samples.append(('_count', labels, entry['samples']))
+        return self._metric('stage_latency_seconds', 'histogram',
+                            'Latence par étape (trames échantillonnées)', samples)
+
+    def _timing_metrics(self, timing):
+        # Journal d'anomalies en ajout seul: seules les nouvelles entrées sont parcourues
+        counts = self._anomalies_by_sensor
+        store = getattr(timing, 'event_store', None)
+        if store is not None:
+            for event in store.events(start=self._anomaly_cursor, codes=(EVENT_TIMING_ANOMALY,)):
+                counts[event.sensor] = counts.get(event.sensor, 0) + 1
+            self._anomaly_cursor = len(store)
+        else:
+            log = timing.anomaly_log
+            for entry in log[self._anomaly_cursor:]:
+                counts[entry['sensor_id']] = counts.get(entry['sensor_id'], 0) + 1
+            self._anomaly_cursor = len(log)
+
+        checked = {sensor_id: stats['message_count'] for sensor_id, stats in list(timing.sensors.items())}
+        total_checked = sum(checked.values())
+        total_anomalies = sum(counts.values())
+        yield self._metric('timing_checks_total', 'counter', 'Trames soumises à la vérification timing',
+                           [('', (), total_checked)])
+        yield self._metric('timing_anomalies_total', 'counter', 'Anomalies timing détectées',
+                           [('', (), total_anomalies)])
+        yield self._metric('timing_anomaly_ratio', 'gauge', 'Anomalies timing / trames vérifiées',
+                           [('', (), total_anomalies / total_checked if total_checked else None)])
+        if self.per_sensor:
+            yield self._metric('sensor_timing_anomalies_total', 'counter', 'Anomalies timing par capteur',
+                               [('', (('sensor', sensor_id),), counts.get(sensor_id, 0))
+                                for sensor_id in checked])
+            yield self._metric('sensor_timing_anomaly_ratio', 'gauge',
+                               'Anomalies timing / trames vérifiées par capteur',
+                               [('', (('sensor', sensor_id),),
+                                 counts.get(sensor_id, 0) / count if count else None)
+                                for sensor_id, count in checked.items()])
+
+    # --- Côté serveur ---
+
+    def render(self):
+        """Met en forme le dernier instantané publié (aucun accès au pipeline)"""
+        lines = []
+        for name, kind, help_text, samples in self._snapshot:
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            for suffix, labels, value in samples:
+                lines.append(f'{name}{suffix}{_format_labels(labels)} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+    def start(self):
+        """Démarre le serveur HTTP sur un thread démon; retourne (hôte, port)"""
+        if self._server is not None:
+            return self.address
+        if not self._snapshot:
+            self.publish()
+        exporter = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = exporter.render().encode('utf-8')
+                exporter.scrapes += 1
+                self.send_response(200)
+                self.send_header('Content-Type', CONTENT_TYPE)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # Pas de journal par requête sur la sortie standard
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever,
+                                        name='tap-metrics', daemon=True)
+        self._thread.start()
+        return self.address
+
+    @property
+    def address(self):
+        return self._server.server_address[:2] if self._server is not None else None
+
+    @property
+    def url(self):
+        host, port = self.address
+        return f'http://{host}:{port}/metrics'
+
+    def stop(self):
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+        self._server = self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
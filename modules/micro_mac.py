@@ -1,6 +1,9 @@
 import hashlib
 import struct
 
+# Structure: [Data(2)] [Seq(2)] [MAC(3) + Reserved(1)] (big-endian)
+FRAME_STRUCT = struct.Struct('>HHI')
+
 class MicroMAC:
     """Module d'authentification Micro-MAC pour le système TAP"""
     
@@ -47,6 +50,22 @@ class MicroMAC:
         
         return bytes(frame)
     
+    def decode_can_frame(self, frame):
+        """
+        Décode une trame CAN en une seule lecture (sans vérification)
+        
+        Returns:
+            tuple: (data, sequence, mac_recu) ou None si la trame est malformée
+        """
+        if len(frame) != 8:
+            return None
+        data, sequence, tail = FRAME_STRUCT.unpack(frame)
+        return data, sequence, tail >> 8  # MAC sur 3 octets, dernier octet réservé
+    
+    def verify_mac(self, data, sequence, received_mac):
+        """Vérifie le Micro-MAC de champs déjà décodés"""
+        return received_mac == self.calculate_micro_mac(data, sequence)
+    
     def verify_can_frame(self, frame):
         """
         Verifie l'authenticite d'une trame CAN
@@ -54,12 +73,9 @@ class MicroMAC:
         Returns:
             tuple: (valide, data, sequence)
         """
-        if len(frame) != 8:
+        decoded = self.decode_can_frame(frame)
+        if decoded is None:
             return False, None, None
         
-        data = struct.unpack('>H', frame[0:2])[0]
-        sequence = struct.unpack('>H', frame[2:4])[0]
-        received_mac = int.from_bytes(frame[4:7], 'big')
-        expected_mac = self.calculate_micro_mac(data, sequence)
-        
-        return (received_mac == expected_mac, data, sequence)
\ No newline at end of file
+        data, sequence, received_mac = decoded
+        return (self.verify_mac(data, sequence, received_mac), data, sequence)
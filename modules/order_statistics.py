@@ -0,0 +1,128 @@
+from bisect import bisect_left, bisect_right
+
+class ReadingsSnapshot:
+    """Instantané des lectures triées, copié seulement à la modification suivante
+
+    Tant que les lectures n'ont pas changé, ids et values désignent les
+    tableaux vivants de SortedReadings; la première modification fige
+    l'instantané (copie à l'écriture). Tous les votes d'un même état des
+    lectures partagent le même instantané.
+    """
+
+    __slots__ = ('ids', 'values')
+
+    def __init__(self, ids, values):
+        self.ids = ids
+        self.values = values
+
+    def freeze(self):
+        self.ids = tuple(self.ids)
+        self.values = tuple(self.values)
+
+
+class SortedReadings:
+    """Lectures d'un groupe maintenues triées (statistiques d'ordre incrémentales)
+
+    Deux tableaux parallèles (valeurs triées, identifiants) et un index
+    capteur -> valeur. La mise à jour d'une lecture coûte une recherche
+    O(log n) (plus un décalage mémoire en C), la médiane est lue en O(1)
+    et la partition cohérents/aberrants se déduit de deux bisections.
+    """
+
+    __slots__ = ('values', 'ids', 'by_sensor', '_snapshot')
+
+    def __init__(self):
+        self.values = []
+        self.ids = []
+        self.by_sensor = {}
+        self._snapshot = None
+
+    def __len__(self):
+        return len(self.values)
+
+    def _index_of(self, sensor_id, value):
+        """Position de (sensor_id, value) dans les tableaux triés"""
+        index = bisect_left(self.values, value)
+        while self.ids[index] != sensor_id:
+            index += 1
+        return index
+
+    def snapshot(self):
+        """Instantané de l'état courant (O(1), partagé jusqu'à la prochaine modification)"""
+        if self._snapshot is None:
+            self._snapshot = ReadingsSnapshot(self.ids, self.values)
+        return self._snapshot
+
+    def _release_snapshot(self):
+        """Fige l'instantané courant avant une modification"""
+        self._snapshot.freeze()
+        self._snapshot = None
+
+    def update(self, sensor_id, value):
+        """Insère ou remplace la lecture d'un capteur"""
+        previous = self.by_sensor.get(sensor_id)
+        if previous is not None and previous == value:
+            return False
+        if self._snapshot is not None:
+            self._release_snapshot()
+        if previous is not None:
+            index = self._index_of(sensor_id, previous)
+            del self.values[index]
+            del self.ids[index]
+        index = bisect_right(self.values, value)
+        self.values.insert(index, value)
+        self.ids.insert(index, sensor_id)
+        self.by_sensor[sensor_id] = value
+        return True
+
+    def remove(self, sensor_id):
+        """Retire la lecture d'un capteur"""
+        if sensor_id not in self.by_sensor:
+            return False
+        if self._snapshot is not None:
+            self._release_snapshot()
+        previous = self.by_sensor.pop(sensor_id)
+        index = self._index_of(sensor_id, previous)
+        del self.values[index]
+        del self.ids[index]
+        return True
+
+    def clear(self):
+        """Vide la structure sans réallouer ses tableaux
+
+        Un instantané encore référencé (résultat de vote) reçoit sa copie,
+        faite une seule fois; les tableaux sont vidés sur place et recyclés.
+        """
+        if self._snapshot is not None:
+            self._release_snapshot()
+        self.values.clear()
+        self.ids.clear()
+        self.by_sensor.clear()
+
+    def median(self):
+        """Médiane en O(1) (moyenne des deux valeurs centrales si n est pair)"""
+        values = self.values
+        n = len(values)
+        if n == 0:
+            return None
+        if n % 2 == 1:
+            return values[n // 2]
+        return (values[n // 2 - 1] + values[n // 2]) / 2
+
+    def window(self, low, high):
+        """
+        Bornes [lo, hi) des lectures comprises dans [low, high]
+
+        Returns:
+            tuple: (lo, hi) indices dans les tableaux triés
+        """
+        return bisect_left(self.values, low), bisect_right(self.values, high)
+
+    def partition(self, center, tolerance):
+        """
+        Partition cohérents/aberrants autour de center
+
+        Returns:
+            tuple: (lo, hi) - les lectures cohérentes sont values[lo:hi]
+        """
+        return self.window(center - tolerance, center + tolerance)
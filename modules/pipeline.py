@@ -0,0 +1,466 @@
+from contextlib import nullcontext
+from time import perf_counter_ns
+
+from modules.micro_mac import MicroMAC
+from modules.timing_verifier import TimingVerifier
+from modules.security_escalation import SecurityEscalation
+from modules.sensor_voting import SensorVoting
+from modules.replay_window import ReplayWindow
+
+# Étapes de vérification, ordonnables (de la moins chère à la plus chère par défaut)
+STAGE_BLOCKED = 'blocked'        # Bitmap des CAN ID bloqués
+STAGE_UNKNOWN_ID = 'unknown_id'  # CAN ID non enregistré ou trame malformée
+STAGE_REPLAY = 'replay'          # Fenêtre anti-rejeu sur le numéro de séquence
+STAGE_TIMING = 'timing'          # Rythme du capteur
+STAGE_MAC = 'mac'                # Micro-MAC (hachage, étape la plus coûteuse)
+
+STAGES = (STAGE_BLOCKED, STAGE_UNKNOWN_ID, STAGE_REPLAY, STAGE_TIMING, STAGE_MAC)
+DEFAULT_STAGE_ORDER = (STAGE_BLOCKED, STAGE_UNKNOWN_ID, STAGE_TIMING, STAGE_MAC)
+REPLAY_STAGE_ORDER = STAGES  # Anti-rejeu sur option: refuse les séquences déjà vues
+
+class Verdict:
+    """Verdict compact d'une trame traitée par le pipeline TAP"""
+
+    __slots__ = ('can_id', 'sensor_id', 'data', 'sequence', 'timestamp',
+                 'accepted', 'action', 'reason')
+
+    # Codes de raison (un compteur par code dans TAPPipeline.reason_counts)
+    OK = 0
+    MALFORMED = 1
+    UNKNOWN_ID = 2
+    BLOCKED = 3
+    MAC_INVALID = 4
+    TIMING_INVALID = 5
+    ESCALATION = 6  # Message valide mais refusé par l'escalade (challenge, blocage)
+    REPLAY = 7
+
+    REASON_NAMES = ('OK', 'MALFORMED', 'UNKNOWN_ID', 'BLOCKED', 'MAC_INVALID',
+                    'TIMING_INVALID', 'ESCALATION', 'REPLAY')
+
+    def __init__(self, can_id, sensor_id, data, sequence, timestamp, accepted, action, reason):
+        self.can_id = can_id
+        self.sensor_id = sensor_id
+        self.data = data
+        self.sequence = sequence
+        self.timestamp = timestamp
+        self.accepted = accepted
+        self.action = action
+        self.reason = reason
+
+    @property
+    def reason_name(self):
+        return self.REASON_NAMES[self.reason]
+
+    def __repr__(self):
+        return (f"Verdict(can_id=0x{self.can_id:03X}, sensor={self.sensor_id!r}, "
+                f"accepted={self.accepted}, reason={self.reason_name})")
+
+
+class TAPPipeline:
+    """Moteur de traitement en flux des trames CAN reçues
+
+    Chaque trame brute (CAN ID, 8 octets, horodatage) est décodée une
+    seule fois; les champs décodés sont partagés par les étapes de
+    vérification, l'escalade et le vote. process_stream() produit un
+    Verdict par trame sans construire de dictionnaire intermédiaire.
+
+    Les étapes de vérification s'exécutent dans l'ordre stage_order (par
+    défaut de la moins chère à la plus chère: bitmap des capteurs bloqués,
+    CAN ID inconnu, timing, Micro-MAC) et la première étape en échec
+    court-circuite les suivantes: une trame d'un capteur bloqué ou d'un ID
+    inconnu ne coûte aucun hachage. Les compteurs stage_checks /
+    stage_rejections mesurent le travail évité. La fenêtre anti-rejeu est
+    une option (stage_order=REPLAY_STAGE_ORDER); omettre 'timing' ou 'mac'
+    exige allow_missing_checks=True.
+
+    En mode micro-lot (process_batch, ou process_stream avec batch_size),
+    la recherche des capteurs, le décodage et, sans échantillonnage, le
+    Micro-MAC sont calculés en colonnes sur tout le lot (les trames
+    bloquées en début de lot ne sont pas hachées), puis les étapes à état
+    (bloqués, anti-rejeu, timing, escalade) parcourent le lot dans l'ordre
+    d'arrivée, ce qui préserve l'ordre par capteur et les transitions
+    d'escalade en cours de lot: les verdicts sont identiques à ceux du
+    traitement trame par trame. Le hachage en colonne porte aussi sur les
+    trames que le timing rejettera: mac_computations compte les hachages
+    réellement effectués.
+
+    Une PipelineInstrumentation optionnelle (instrumentation=...) compte
+    les verdicts par capteur et chronomètre les étapes d'une trame sur N.
+    Avec profiler=PipelineProfiler(...), chaque phase de process_batch
+    (decode, mac, verify, voting) s'exécute dans sa portée de profilage;
+    le traitement trame par trame n'est pas découpé en portées.
+    Avec event_store=EventStore(...), anomalies timing, événements de
+    sécurité et votes sont archivés en binaire sur disque au lieu des
+    journaux en mémoire.
+    """
+
+    def __init__(self, key=0xABC123, voting_threshold=2, voting_tolerance=5,
+                 timing_tolerance_ms=2, mac_module=None, timing_module=None,
+                 escalation_module=None, voting_module=None, stage_order=DEFAULT_STAGE_ORDER,
+                 replay_window=64, mac_sampling=None, instrumentation=None, event_store=None,
+                 allow_missing_checks=False, profiler=None):
+        self.mac_module = mac_module or MicroMAC(key=key)
+        self.timing_module = timing_module or TimingVerifier()
+        self.escalation_module = escalation_module or SecurityEscalation()
+        self.voting_module = voting_module or SensorVoting(threshold=voting_threshold,
+                                                           tolerance=voting_tolerance)
+        self.timing_tolerance_ms = timing_tolerance_ms
+        # Échantillonnage optionnel du Micro-MAC au niveau NORMAL (MacSamplingPolicy)
+        self.mac_sampling = mac_sampling
+        # Compteurs et histogrammes de latence par étape (PipelineInstrumentation)
+        self.instrumentation = instrumentation
+        # Portées de profilage des phases de process_batch (PipelineProfiler)
+        self.profiler = profiler
+        # Journaux d'anomalies, de sécurité et de votes dans un EventStore commun
+        self.event_store = event_store
+        if event_store is not None:
+            for module in (self.timing_module, self.escalation_module, self.voting_module):
+                module.event_store = event_store
+        self.sensors_by_can_id = {}
+        self.can_ids_by_sensor = {}
+        self.reason_counts = [0] * len(Verdict.REASON_NAMES)
+        self.frames_processed = 0
+        self.mac_computations = 0
+
+        self.stage_order = self._validate_stage_order(stage_order, allow_missing_checks)
+        self.replay_window = ReplayWindow(replay_window) if STAGE_REPLAY in self.stage_order else None
+        self._stages = tuple(enumerate(self.stage_order))
+        # Micro-MAC en colonne seulement si les étapes qui le précèdent sont
+        # sans état (reproduites par la colonne): sinon les trames rejetées
+        # par le timing ou l'anti-rejeu seraient hachées en micro-lot
+        self._mac_in_column = (STAGE_MAC in self.stage_order and all(
+            stage in (STAGE_BLOCKED, STAGE_UNKNOWN_ID)
+            for stage in self.stage_order[:self.stage_order.index(STAGE_MAC)]))
+        # Une seule incrémentation par trame: position de l'étape de sortie
+        # (len(stage_order) = toutes les étapes franchies)
+        self._exit_counts = [0] * (len(self.stage_order) + 1)
+
+        # Bitmap des CAN ID standard (11 bits) bloqués, ensemble pour les ID étendus
+        self._blocked_ids = bytearray(0x800)
+        self._blocked_extended = set()
+        self.escalation_module.add_block_listener(self._on_block_change)
+
+    @staticmethod
+    def _validate_stage_order(stage_order, allow_missing_checks=False):
+        stage_order = tuple(stage_order)
+        unknown = [stage for stage in stage_order if stage not in STAGES]
+        if unknown or len(set(stage_order)) != len(stage_order):
+            raise ValueError(f"Ordre d'étapes invalide: {stage_order}")
+        if STAGE_UNKNOWN_ID not in stage_order:
+            raise ValueError("L'étape 'unknown_id' est obligatoire")
+        missing = [stage for stage in (STAGE_TIMING, STAGE_MAC) if stage not in stage_order]
+        if missing and not allow_missing_checks:
+            raise ValueError(f"Étapes de vérification absentes: {missing} "
+                             f"(allow_missing_checks=True pour les désactiver)")
+        position = stage_order.index(STAGE_UNKNOWN_ID)
+        for stage in (STAGE_REPLAY, STAGE_TIMING, STAGE_MAC):
+            if stage in stage_order and stage_order.index(stage) < position:
+                raise ValueError(f"L'étape '{stage}' doit suivre 'unknown_id'")
+        return stage_order
+
+    @property
+    def stage_checks(self):
+        """Nombre de trames ayant atteint chaque étape"""
+        counts = self._exit_counts
+        return {stage: sum(counts[i:]) for i, stage in self._stages}
+
+    @property
+    def stage_rejections(self):
+        """Nombre de trames rejetées par chaque étape"""
+        return {stage: self._exit_counts[i] for i, stage in self._stages}
+
+    def register_sensor(self, sensor_id, can_id, base_interval_ms, unique_delay_ms,
+                        voting_group=None):
+        """Associe un CAN ID à un capteur et l'enregistre dans les modules"""
+        self.sensors_by_can_id[can_id] = sensor_id
+        self.can_ids_by_sensor.setdefault(sensor_id, []).append(can_id)
+        self.timing_module.register_sensor(sensor_id, base_interval_ms, unique_delay_ms)
+        if self.instrumentation is not None:
+            self.instrumentation.register_sensor(sensor_id)
+        if self.event_store is not None:
+            # Slots réservés à l'enregistrement, hors du chemin critique
+            self.event_store.slot(sensor_id)
+            if voting_group:
+                self.event_store.slot(voting_group)
+        if sensor_id in self.escalation_module.blocked_sensors:
+            self._set_blocked(can_id, True)
+        if voting_group:
+            voting = self.voting_module
+            if voting_group not in voting.voting_groups:
+                voting.register_voting_group(voting_group, [])
+            voting.add_sensor_to_group(voting_group, sensor_id)
+
+    def _on_block_change(self, sensor_id, blocked):
+        for can_id in self.can_ids_by_sensor.get(sensor_id, ()):
+            self._set_blocked(can_id, blocked)
+
+    def _set_blocked(self, can_id, blocked):
+        if can_id < 0x800:
+            self._blocked_ids[can_id] = 1 if blocked else 0
+        elif blocked:
+            self._blocked_extended.add(can_id)
+        else:
+            self._blocked_extended.discard(can_id)
+
+    def _verify(self, can_id, sensor_id, decoded, timestamp_ms, trace=None, mac_ok=None):
+        """
+        Exécute les étapes dans l'ordre configuré, puis l'escalade
+
+        Args:
+            trace: liste de marques (étape, ns) complétée au début de chaque
+                étape si la trame est chronométrée, None sinon
+            mac_ok: Micro-MAC déjà vérifié en colonne (process_batch),
+                None pour le calculer à l'étape 'mac'
+
+        Returns:
+            tuple: (code de raison, action, authentifiée); une trame acceptée
+                sans vérification du Micro-MAC (non échantillonnée) ne fait
+                pas avancer la fenêtre anti-rejeu et n'alimente pas le vote
+        """
+        is_mac_valid = is_timing_valid = True
+        is_replay = False
+        authenticated = True
+        if self.mac_sampling is not None:
+            self.mac_sampling.observe(timestamp_ms)  # Charge mesurée du bus
+        exit_position = len(self._stages)
+        for position, stage in self._stages:
+            if trace is not None:
+                trace.append((stage, perf_counter_ns()))
+            if stage == STAGE_BLOCKED:
+                if (self._blocked_ids[can_id] if can_id < 0x800
+                        else can_id in self._blocked_extended):
+                    self._exit_counts[position] += 1
+                    return Verdict.BLOCKED, "BLOCKED", False
+            elif stage == STAGE_UNKNOWN_ID:
+                if sensor_id is None or decoded is None:
+                    self._exit_counts[position] += 1
+                    reason = Verdict.UNKNOWN_ID if sensor_id is None else Verdict.MALFORMED
+                    return reason, "REJECT", False
+            elif stage == STAGE_REPLAY:
+                if not self.replay_window.check(sensor_id, decoded[1]):
+                    exit_position, reason, is_replay = position, Verdict.REPLAY, True
+                    break
+            elif stage == STAGE_TIMING:
+                if self.timing_module.check_timing_anomaly(sensor_id, timestamp_ms,
+                                                           self.timing_tolerance_ms):
+                    exit_position, reason, is_timing_valid = position, Verdict.TIMING_INVALID, False
+                    break
+            else:
+                if mac_ok is None:
+                    if self.mac_sampling is not None and not self.mac_sampling.should_verify(
+                            sensor_id, decoded[1], timestamp_ms,
+                            self.escalation_module.sec_level == SecurityEscalation.SEC_NORMAL):
+                        authenticated = False  # Non échantillonnée (niveau NORMAL)
+                        continue
+                    self.mac_computations += 1
+                    mac_ok = self.mac_module.verify_mac(*decoded)
+                if not mac_ok:
+                    exit_position, reason, is_mac_valid = position, Verdict.MAC_INVALID, False
+                    break
+        self._exit_counts[exit_position] += 1
+        if exit_position < len(self._stages) and self.mac_sampling is not None:
+            self.mac_sampling.promote(timestamp_ms)  # Vérification complète immédiate
+
+        # Escalade (horodatage en secondes pour le mode taux d'anomalies)
+        if trace is not None:
+            trace.append(('escalation', perf_counter_ns()))
+        action = self.escalation_module.process_message(
+            sensor_id, is_mac_valid, is_timing_valid, timestamp_ms / 1000.0, is_replay)
+        if action == "ACCEPT":
+            if authenticated and self.replay_window is not None:
+                self.replay_window.update(sensor_id, decoded[1])
+            return Verdict.OK, action, authenticated
+        if action == "BLOCKED":
+            return Verdict.BLOCKED, action, False
+        return (reason if exit_position < len(self._stages) else Verdict.ESCALATION), action, False
+
+    def process_frame(self, can_id, frame, timestamp_ms):
+        """
+        Traite une trame reçue à travers toutes les étapes TAP
+
+        Returns:
+            Verdict: Décision pour la trame
+        """
+        self.frames_processed += 1
+        instrumentation = self.instrumentation
+        trace = instrumentation.start_trace() if instrumentation is not None else None
+        sensor_id = self.sensors_by_can_id.get(can_id)
+        decoded = self.mac_module.decode_can_frame(frame) if sensor_id is not None else None
+        reason, action, authenticated = self._verify(can_id, sensor_id, decoded, timestamp_ms,
+                                                     trace)
+        self.reason_counts[reason] += 1
+        if decoded is None:
+            if instrumentation is not None:
+                instrumentation.record(sensor_id, reason, trace)
+            return Verdict(can_id, sensor_id, None, None, timestamp_ms, False, action, reason)
+        data = decoded[0]
+        if authenticated:
+            # Vote: la donnée authentifiée alimente tous les groupes du capteur
+            if trace is not None:
+                trace.append(('voting', perf_counter_ns()))
+            self.voting_module.submit(sensor_id, data)
+        if instrumentation is not None:
+            instrumentation.record(sensor_id, reason, trace)
+        return Verdict(can_id, sensor_id, data, decoded[1], timestamp_ms, reason == Verdict.OK,
+                       action, reason)
+
+    def process_batch(self, frames):
+        """
+        Traite un micro-lot de trames étape par étape (structure de colonnes)
+
+        Args:
+            frames: séquence de (can_id, trame, horodatage_ms)
+
+        Returns:
+            list: Un Verdict par trame, dans l'ordre d'arrivée
+        """
+        n = len(frames)
+        if n == 0:
+            return []
+        self.frames_processed += n
+        instrumentation = self.instrumentation
+        scope = self.profiler.scope if self.profiler is not None else nullcontext
+        decode_start = perf_counter_ns() if instrumentation is not None else 0
+
+        # Colonnes sans état: recherche des capteurs, décodage et Micro-MAC
+        with scope('decode'):
+            can_ids, raw_frames, timestamps = zip(*frames)
+            lookup = self.sensors_by_can_id.get
+            sensor_ids = [lookup(can_id) for can_id in can_ids]
+            decode = self.mac_module.decode_can_frame
+            decoded = [decode(frame) if sensor_id is not None else None
+                       for sensor_id, frame in zip(sensor_ids, raw_frames)]
+        with scope('mac'):
+            mac_valid = self._mac_column(can_ids, decoded)
+
+        # Étapes à état dans l'ordre d'arrivée (court-circuit par trame)
+        with scope('verify'):
+            verify = self._verify
+            if instrumentation is None:
+                traces = None
+                outcomes = [verify(can_id, sensor_id, fields, timestamp_ms, None, mac_ok)
+                            for can_id, sensor_id, fields, timestamp_ms, mac_ok
+                            in zip(can_ids, sensor_ids, decoded, timestamps, mac_valid)]
+            else:
+                decode_ns = (perf_counter_ns() - decode_start) // n  # Décodage en colonnes: amorti
+                traces = [None] * n
+                outcomes = [None] * n
+                sampled = instrumentation.sample_positions(n)
+                start = 0
+                for position in sampled:
+                    outcomes[start:position] = [
+                        verify(can_ids[i], sensor_ids[i], decoded[i], timestamps[i], None,
+                               mac_valid[i])
+                        for i in range(start, position)]
+                    trace = traces[position] = [('decode', perf_counter_ns() - decode_ns)]
+                    outcomes[position] = verify(can_ids[position], sensor_ids[position],
+                                                decoded[position], timestamps[position], trace,
+                                                mac_valid[position])
+                    trace.append((None, perf_counter_ns()))  # Fin de l'escalade
+                    start = position + 1
+                outcomes[start:] = [verify(can_ids[i], sensor_ids[i], decoded[i], timestamps[i],
+                                           None, mac_valid[i])
+                                    for i in range(start, n)]
+
+        # Vote des données acceptées, puis verdicts
+        with scope('voting'):
+            reason_counts = self.reason_counts
+            submit = self.voting_module.submit
+            verdicts = []
+            append = verdicts.append
+            for i in range(n):
+                reason, action, authenticated = outcomes[i]
+                reason_counts[reason] += 1
+                fields = decoded[i]
+                if fields is None:
+                    append(Verdict(can_ids[i], sensor_ids[i], None, None, timestamps[i], False,
+                                   action, reason))
+                    continue
+                if authenticated:
+                    trace = traces[i] if traces is not None else None
+                    if trace is not None:
+                        trace.append(('voting', perf_counter_ns()))
+                    submit(sensor_ids[i], fields[0])
+                    if trace is not None:
+                        trace.append((None, perf_counter_ns()))
+                append(Verdict(can_ids[i], sensor_ids[i], fields[0], fields[1], timestamps[i],
+                               reason == Verdict.OK, action, reason))
+        if instrumentation is not None:
+            instrumentation.record_batch(sensor_ids, [outcome[0] for outcome in outcomes],
+                                         [traces[i] for i in sampled])
+        return verdicts
+
+    def _mac_column(self, can_ids, decoded):
+        """
+        Micro-MAC de tout un lot en une passe (sans état)
+
+        Seulement si 'mac' ne suit que les étapes 'blocked' et 'unknown_id';
+        avec l'ordre par défaut (timing avant mac), le hachage reste à
+        l'étape 'mac' de chaque trame, comme en traitement trame par trame.
+
+        Returns:
+            list: True/False par trame, None si l'étape 'mac' doit décider
+                elle-même (étape à état avant 'mac', échantillonnage actif,
+                trame invalide ou bloquée en début de lot)
+        """
+        if self.mac_sampling is not None or not self._mac_in_column:
+            return [None] * len(decoded)
+        blocked_ids = self._blocked_ids
+        blocked_extended = self._blocked_extended
+        verify_mac = self.mac_module.verify_mac
+        column = [None if fields is None
+                  or (blocked_ids[can_id] if can_id < 0x800 else can_id in blocked_extended)
+                  else verify_mac(*fields)
+                  for can_id, fields in zip(can_ids, decoded)]
+        self.mac_computations += len(column) - column.count(None)
+        return column
+
+    def process_stream(self, frames, batch_size=None):
+        """
+        Traite un flux de trames (itérable de (can_id, trame, horodatage_ms))
+
+        Args:
+            batch_size: taille des micro-lots (None = trame par trame);
+                plus grand = meilleur débit, latence plus élevée
+
+        Yields:
+            Verdict: Un verdict par trame, dans l'ordre d'arrivée
+        """
+        if not batch_size or batch_size <= 1:
+            process_frame = self.process_frame
+            for can_id, frame, timestamp_ms in frames:
+                yield process_frame(can_id, frame, timestamp_ms)
+            return
+
+        process_batch = self.process_batch
+        batch = []
+        for item in frames:
+            batch.append(item)
+            if len(batch) >= batch_size:
+                yield from process_batch(batch)
+                batch = []
+        if batch:
+            yield from process_batch(batch)
+
+    def get_stats(self):
+        """Retourne les compteurs du pipeline"""
+        accepted = self.reason_counts[Verdict.OK]
+        return {
+            'frames_processed': self.frames_processed,
+            'frames_accepted': accepted,
+            'frames_rejected': self.frames_processed - accepted,
+            'rejections_by_reason': {name: count for name, count
+                                     in zip(Verdict.REASON_NAMES, self.reason_counts)
+                                     if name != 'OK'},
+            'security_level': self.escalation_module.get_level_name(),
+            'blocked_sensors': len(self.escalation_module.blocked_sensors),
+            'stage_order': list(self.stage_order),
+            'stage_checks': dict(self.stage_checks),
+            'stage_rejections': dict(self.stage_rejections),
+            # Hachages effectués, et évités (trames rejetées avant ou non échantillonnées)
+            'mac_computations': self.mac_computations,
+            'mac_computations_saved': (self.frames_processed - self.mac_computations
+                                       if STAGE_MAC in self.stage_order else None),
+            'mac_sampling': self.mac_sampling.get_stats() if self.mac_sampling else None,
+            'instrumentation': self.instrumentation.snapshot() if self.instrumentation else None
+        }
@@ -0,0 +1,352 @@
+import cProfile
+import os
+import pstats
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+MODULES_DIR = os.path.dirname(os.path.abspath(__file__))
+MODES = ('cprofile', 'sampling', 'both')
+BUILTIN_FILE = '~'  # Nom de fichier des fonctions natives dans cProfile
+
+# Un seul cProfile actif par thread: profils imbriqués suspendus puis repris
+_active = threading.local()
+
+
+def module_of(filename):
+    """Module TAP (nom du fichier sous modules/) d'un fichier source, None sinon"""
+    if not filename or filename == BUILTIN_FILE or filename.startswith('<'):
+        return None
+    path = os.path.abspath(filename)
+    if os.path.dirname(path) != MODULES_DIR:
+        return None
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def frame_label(filename, function):
+    """Libellé d'un cadre de pile: module.fonction (sans ';', séparateur du format replié)"""
+    module = module_of(filename)
+    if module is None:
+        module = os.path.splitext(os.path.basename(filename))[0] if filename else BUILTIN_FILE
+    return f"{module}.{function}".replace(';', ':')
+
+
+def _profile_stack():
+    if not hasattr(_active, 'profiles'):
+        _active.profiles = []
+    return _active.profiles
+
+
+def _own_file():
+    """Nom de fichier de ce module tel que l'interpréteur le rapporte (co_filename)"""
+    return _own_file.__code__.co_filename
+
+
+class PipelineProfiler:
+    """Profilage d'une exécution du pipeline (ou de toute section de code)
+
+    Deux sources complémentaires, utilisables ensemble (mode 'both'):
+    - cProfile: appels, temps propre et cumulé exacts par fonction;
+    - échantillonnage: un thread relève la pile du thread profilé toutes
+      les sample_interval_s (sys._current_frames) et compte les piles
+      identiques, d'où les fichiers « collapsed stacks » des flamegraphs.
+
+    Les fonctions sont regroupées par module TAP (fichier sous modules/)
+    pour relier une régression à une fonction précise (ex:
+    micro_mac.calculate_micro_mac). scope(nom) étiquette une portion du
+    code (étape, suite de tests): les piles échantillonnées sont alors
+    préfixées par « [nom] » et cProfile bascule pendant le bloc sur un
+    profil propre à la portée (function_stats(scope=nom)); sans portée,
+    les statistiques fusionnent tous les profils. Un profileur démarré
+    pendant un autre suspend le cProfile englobant jusqu'à son arrêt, de
+    même qu'une portée imbriquée suspend le profil de la portée englobante.
+
+    Usage:
+        with PipelineProfiler() as profiler:
+            with profiler.scope('lot'):
+                pipeline.process_batch(frames)
+        profiler.print_report()
+        profiler.write('profiles', 'pipeline')
+    """
+
+    def __init__(self, mode='both', sample_interval_s=0.001, max_depth=128):
+        if mode not in MODES:
+            raise ValueError(f"Mode inconnu: {mode} (attendu: {', '.join(MODES)})")
+        self.mode = mode
+        self.sample_interval_s = sample_interval_s
+        self.max_depth = max_depth
+        self._profile = cProfile.Profile() if mode in ('cprofile', 'both') else None
+        self._scope_profiles = {}  # portée -> cProfile.Profile
+        self._sampling = mode in ('sampling', 'both')
+        self._samples = {}  # (portée, ((fichier, fonction), ...)) -> nombre d'échantillons
+        self.sample_count = 0
+        self._scope = None
+        self.scope_times = {}
+        self._thread_id = None
+        self._sampler = None
+        self._stop = threading.Event()
+        self._started = None
+        self._switch_interval = None
+        self.elapsed_s = 0.0
+
+    # --- Collecte ---
+
+    def start(self):
+        if self._started is not None:
+            raise RuntimeError("Profilage déjà en cours")
+        self._thread_id = threading.get_ident()
+        self._stop.clear()
+        if self._sampling:
+            # Le thread d'échantillonnage n'obtient le GIL qu'aux bascules de l'interpréteur
+            self._switch_interval = sys.getswitchinterval()
+            sys.setswitchinterval(min(self._switch_interval, self.sample_interval_s))
+            self._sampler = threading.Thread(target=self._sample_loop, name='tap-profiler', daemon=True)
+            self._sampler.start()
+        self._started = time.perf_counter()
+        if self._profile is not None:
+            stack = _profile_stack()
+            if stack:
+                stack[-1].disable()  # Le profil englobant ne compte pas la section imbriquée
+            stack.append(self._profile)
+            self._profile.enable()
+        return self
+
+    def stop(self):
+        if self._started is None:
+            return
+        if self._profile is not None:
+            self._profile.disable()
+            stack = _profile_stack()
+            stack.remove(self._profile)
+            if stack:
+                stack[-1].enable()
+        self.elapsed_s += time.perf_counter() - self._started
+        self._started = None
+        if self._sampler is not None:
+            self._stop.set()
+            self._sampler.join()
+            self._sampler = None
+            sys.setswitchinterval(self._switch_interval)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+    @contextmanager
+    def scope(self, name):
+        """Étiquette les échantillons du bloc, le profile à part et mesure sa durée"""
+        previous = self._scope
+        self._scope = name
+        profile = None
+        if self._profile is not None and self._started is not None:
+            profile = self._scope_profiles.get(name)
+            if profile is None:
+                profile = self._scope_profiles[name] = cProfile.Profile()
+            stack = _profile_stack()
+            stack[-1].disable()
+            stack.append(profile)
+            profile.enable()
+        start = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self.scope_times[name] = self.scope_times.get(name, 0.0) + time.perf_counter() - start
+            if profile is not None:
+                profile.disable()
+                stack.remove(profile)
+                if stack:
+                    stack[-1].enable()
+            self._scope = previous
+
+    def _sample_loop(self):
+        current_frames = sys._current_frames
+        thread_id = self._thread_id
+        samples = self._samples
+        max_depth = self.max_depth
+        own_file = _own_file()
+        while not self._stop.wait(self.sample_interval_s):
+            frame = current_frames().get(thread_id)
+            stack = []
+            while frame is not None and len(stack) < max_depth:
+                code = frame.f_code
+                stack.append((code.co_filename, code.co_name))
+                frame = frame.f_back
+            # Pile vide ou prise dans le profileur lui-même (arrêt en cours)
+            if not stack or any(filename == own_file for filename, _ in stack):
+                continue
+            stack.reverse()  # Racine d'abord
+            key = (self._scope, tuple(stack))
+            samples[key] = samples.get(key, 0) + 1
+            self.sample_count += 1
+
+    # --- Analyse ---
+
+    @property
+    def scopes(self):
+        """Noms des portées rencontrées"""
+        return list(self.scope_times)
+
+    def _stats(self, scope=None):
+        """pstats.Stats d'une portée, ou de tous les profils fusionnés (None si vide)"""
+        if scope is None:
+            profiles = [self._profile, *self._scope_profiles.values()]
+        else:
+            profiles = [self._scope_profiles[scope]] if scope in self._scope_profiles else []
+        merged = None
+        for profile in profiles:
+            try:
+                stats = pstats.Stats(profile)
+            except TypeError:
+                continue  # Profil sans aucun appel enregistré
+            if merged is None:
+                merged = stats
+            else:
+                merged.add(stats)
+        return merged
+
+    def function_stats(self, scope=None):
+        """
+        Statistiques par fonction
+
+        cProfile si actif (exact), sinon dérivées des échantillons (temps
+        propre = échantillons en sommet de pile, cumulé = présence dans la pile,
+        convertis en secondes au prorata de la durée profilée: le thread
+        d'échantillonnage se réveille moins souvent que prévu quand le
+        thread profilé garde le GIL).
+
+        Args:
+            scope: nom de portée (seulement le code exécuté dans ce bloc,
+                hors portées imbriquées), None pour toute l'exécution
+
+        Returns:
+            list: dicts {module, function, label, calls, self_s, cumulative_s}
+        """
+        own_file = _own_file()
+        if self._profile is not None:
+            entries = []
+            stats = self._stats(scope)
+            for (filename, line, function), (_, calls, self_s, cumulative_s, _) in \
+                    (stats.stats.items() if stats is not None else ()):
+                if filename == own_file:
+                    continue
+                entries.append({
+                    'module': module_of(filename),
+                    'function': function,
+                    'label': frame_label(filename, function),
+                    'line': line,
+                    'calls': calls,
+                    'self_s': self_s,
+                    'cumulative_s': cumulative_s
+                })
+            return entries
+
+        self_counts, cumulative_counts = {}, {}
+        for (sample_scope, stack), count in self._samples.items():
+            if scope is not None and sample_scope != scope:
+                continue
+            self_counts[stack[-1]] = self_counts.get(stack[-1], 0) + count
+            for frame in set(stack):
+                cumulative_counts[frame] = cumulative_counts.get(frame, 0) + count
+        interval = self.elapsed_s / self.sample_count if self.sample_count else 0.0
+        return [{
+            'module': module_of(filename),
+            'function': function,
+            'label': frame_label(filename, function),
+            'line': None,
+            'calls': None,
+            'self_s': self_counts.get((filename, function), 0) * interval,
+            'cumulative_s': count * interval
+        } for (filename, function), count in cumulative_counts.items()]
+
+    def hot_functions(self, top=5, tap_only=True, scope=None):
+        """
+        Fonctions les plus coûteuses (temps propre) par module
+
+        Args:
+            tap_only: seulement les modules TAP (fichiers sous modules/)
+            scope: restreint à une portée (voir function_stats)
+
+        Returns:
+            dict: {module: [entrées triées par temps propre]}, modules triés
+                par temps propre total décroissant
+        """
+        by_module = {}
+        for entry in self.function_stats(scope):
+            module = entry['module']
+            if module is None:
+                if tap_only:
+                    continue
+                module = entry['label'].split('.', 1)[0]
+            by_module.setdefault(module, []).append(entry)
+        totals = {module: sum(entry['self_s'] for entry in entries) for module, entries in by_module.items()}
+        return {module: sorted(by_module[module], key=lambda entry: -entry['self_s'])[:top]
+                for module in sorted(by_module, key=lambda module: -totals[module])}
+
+    def module_times(self, scope=None):
+        """Temps propre total par module TAP (secondes), éventuellement pour une portée"""
+        totals = {}
+        for entry in self.function_stats(scope):
+            if entry['module'] is not None:
+                totals[entry['module']] = totals.get(entry['module'], 0.0) + entry['self_s']
+        return dict(sorted(totals.items(), key=lambda item: -item[1]))
+
+    def collapsed_stacks(self):
+        """Piles échantillonnées au format replié (« a;b;c nombre »), portée en racine"""
+        if not self._sampling:
+            raise ValueError("Piles repliées indisponibles: activer l'échantillonnage (mode 'sampling' ou 'both')")
+        folded = {}
+        for (scope, stack), count in self._samples.items():
+            frames = [frame_label(filename, function) for filename, function in stack]
+            if scope is not None:
+                frames.insert(0, f"[{scope}]".replace(';', ':'))
+            line = ';'.join(frames)
+            folded[line] = folded.get(line, 0) + count
+        return [f"{line} {count}" for line, count in sorted(folded.items())]
+
+    # --- Sorties ---
+
+    def write(self, directory, name='profile'):
+        """
+        Écrit name.collapsed (échantillonnage) et name.pstats (cProfile,
+        tous les profils fusionnés, portées comprises)
+
+        Returns:
+            dict: {'collapsed': chemin, 'pstats': chemin} selon le mode
+        """
+        os.makedirs(directory, exist_ok=True)
+        paths = {}
+        if self._sampling:
+            paths['collapsed'] = os.path.join(directory, f"{name}.collapsed")
+            with open(paths['collapsed'], 'w', encoding='utf-8') as f:
+                f.writelines(line + '\n' for line in self.collapsed_stacks())
+        if self._profile is not None:
+            paths['pstats'] = os.path.join(directory, f"{name}.pstats")
+            stats = self._stats()
+            if stats is not None:
+                stats.dump_stats(paths['pstats'])
+            else:
+                self._profile.dump_stats(paths['pstats'])
+        return paths
+
+    def print_report(self, top=5):
+        """Affiche les fonctions chaudes par module TAP"""
+        source = 'cProfile' if self._profile is not None else f"{self.sample_count} échantillons"
+        print(f"\n🔥 PROFIL ({source}, {self.elapsed_s:.2f} s)")
+        module_times = self.module_times()
+        for module, entries in self.hot_functions(top).items():
+            print(f"   {module} ({module_times.get(module, 0.0) * 1000:.1f} ms propres)")
+            for entry in entries:
+                calls = f"{entry['calls']:>9} appels" if entry['calls'] is not None else ''
+                print(f"      {entry['function']:<32} {entry['self_s'] * 1000:9.2f} ms "
+                      f"(cumulé {entry['cumulative_s'] * 1000:9.2f} ms) {calls}")
+        if self.scope_times:
+            print("   Portées: " + ', '.join(f"{name} {seconds:.2f} s" for name, seconds in self.scope_times.items()))
+            for name in self.scope_times:
+                hottest = next(iter(self.module_times(name).items()), None)
+                if hottest is not None:
+                    print(f"      [{name}] module le plus coûteux: {hottest[0]} "
+                          f"({hottest[1] * 1000:.1f} ms propres)")
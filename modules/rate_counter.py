@@ -0,0 +1,121 @@
+import math
+import time
+
+class DecayingRateCounter:
+    """Compteur de taux a decroissance exponentielle (evenements/seconde)
+
+    Mémoire fixe (deux flottants) et mise à jour O(1) : le taux est
+    atténué en fonction du temps écoulé puis incrémenté de count/tau,
+    ce qui converge vers le débit réel d'événements sur une fenêtre
+    glissante de constante de temps tau.
+    """
+
+    __slots__ = ('tau', 'rate', 'last_time')
+
+    def __init__(self, window_s=10.0):
+        self.tau = float(window_s)
+        self.rate = 0.0
+        self.last_time = None
+
+    def _decay(self, now):
+        """Atténue le taux jusqu'à l'instant now"""
+        if self.last_time is not None and now > self.last_time:
+            self.rate *= math.exp((self.last_time - now) / self.tau)
+        if self.last_time is None or now > self.last_time:
+            self.last_time = now
+
+    def add(self, now, count=1):
+        """
+        Enregistre count événements à l'instant now
+
+        Returns:
+            float: Taux courant (événements/seconde)
+        """
+        self._decay(now)
+        self.rate += count / self.tau
+        return self.rate
+
+    def value(self, now):
+        """Retourne le taux à l'instant now sans modifier l'état (lecture seule)"""
+        if self.last_time is not None and now > self.last_time:
+            return self.rate * math.exp((self.last_time - now) / self.tau)
+        return self.rate
+
+    def reset(self):
+        """Remet le compteur à zéro"""
+        self.rate = 0.0
+        self.last_time = None
+
+
+class AnomalyRateTracker:
+    """Taux d'anomalies par capteur et global avec hystérésis
+
+    Un compteur DecayingRateCounter par capteur (mémoire fixe par capteur)
+    et un compteur global. Le seuil haut du niveau L vaut
+    escalate_rate * (L + 1) ; la désescalade n'a lieu que si le taux global
+    repasse sous deescalate_rate * L et que le niveau a été maintenu au
+    moins min_dwell_s secondes.
+    """
+
+    def __init__(self, window_s=10.0, escalate_rate=0.5, deescalate_rate=0.1,
+                 sensor_escalate_rate=None, min_dwell_s=5.0):
+        if deescalate_rate >= escalate_rate:
+            raise ValueError("deescalate_rate doit être inférieur à escalate_rate")
+        self.window_s = window_s
+        self.escalate_rate = escalate_rate
+        self.deescalate_rate = deescalate_rate
+        self.sensor_escalate_rate = (sensor_escalate_rate if sensor_escalate_rate is not None
+                                     else escalate_rate)
+        self.min_dwell_s = min_dwell_s
+        self.global_counter = DecayingRateCounter(window_s)
+        self.sensor_counters = {}
+        self.last_transition = None
+
+    def _sensor_counter(self, sensor_id):
+        counter = self.sensor_counters.get(sensor_id)
+        if counter is None:
+            counter = DecayingRateCounter(self.window_s)
+            self.sensor_counters[sensor_id] = counter
+        return counter
+
+    def record_anomaly(self, sensor_id, now, level=0):
+        """
+        Enregistre une anomalie et indique si l'escalade est requise
+
+        Returns:
+            bool: True si le seuil haut du niveau courant est franchi
+        """
+        global_rate = self.global_counter.add(now)
+        sensor_rate = self._sensor_counter(sensor_id).add(now)
+        factor = level + 1
+        return (global_rate >= self.escalate_rate * factor
+                or sensor_rate >= self.sensor_escalate_rate * factor)
+
+    def should_deescalate(self, now, level):
+        """True si le taux global est sous le seuil bas depuis assez longtemps"""
+        if level <= 0 or self.global_counter.value(now) >= self.deescalate_rate * level:
+            return False
+        return self.last_transition is None or now - self.last_transition >= self.min_dwell_s
+
+    def mark_transition(self, now):
+        """Mémorise l'instant d'un changement de niveau"""
+        self.last_transition = now
+
+    def get_rate(self, sensor_id=None, now=None):
+        """Retourne le taux courant d'un capteur (ou global si sensor_id est None)"""
+        if now is None:
+            now = time.monotonic()
+        if sensor_id is None:
+            return self.global_counter.value(now)
+        counter = self.sensor_counters.get(sensor_id)
+        return counter.value(now) if counter is not None else 0.0
+
+    def get_rates(self, now=None):
+        """Retourne les taux courants (global et par capteur)"""
+        if now is None:
+            now = time.monotonic()
+        return {
+            'global': self.global_counter.value(now),
+            'sensors': {sensor_id: counter.value(now)
+                        for sensor_id, counter in self.sensor_counters.items()}
+        }
@@ -0,0 +1,56 @@
+class ReplayWindow:
+    """Fenêtre anti-rejeu glissante par capteur (compteur de séquence 16 bits)
+
+    Pour chaque capteur: le plus grand numéro de séquence authentifié et
+    un masque des `size` numéros précédents déjà vus. Une trame est
+    fraîche si son numéro est plus récent (modulo 2^16) ou s'il tombe
+    dans la fenêtre sans avoir été vu. check() ne modifie rien: la
+    fenêtre n'avance (update) qu'une fois la trame authentifiée, pour
+    qu'une trame forgée ne puisse pas la faire glisser.
+    """
+
+    SEQUENCE_MODULO = 0x10000
+
+    def __init__(self, size=64):
+        self.size = size
+        self.highest = {}
+        self.seen = {}  # sensor_id -> masque (bit k = highest - k déjà vu)
+
+    def check(self, sensor_id, sequence):
+        """True si la séquence n'a pas encore été vue (trame fraîche)"""
+        highest = self.highest.get(sensor_id)
+        if highest is None:
+            return True
+        ahead = (sequence - highest) % self.SEQUENCE_MODULO
+        if ahead == 0:
+            return False
+        if ahead < self.SEQUENCE_MODULO // 2:
+            return True
+        behind = self.SEQUENCE_MODULO - ahead
+        if behind >= self.size:
+            return False  # Trop ancienne pour la fenêtre
+        return not (self.seen[sensor_id] >> behind) & 1
+
+    def update(self, sensor_id, sequence):
+        """Marque la séquence comme vue (trame authentifiée)"""
+        highest = self.highest.get(sensor_id)
+        if highest is None:
+            self.highest[sensor_id] = sequence
+            self.seen[sensor_id] = 1
+            return
+        ahead = (sequence - highest) % self.SEQUENCE_MODULO
+        mask = (1 << self.size) - 1
+        if ahead < self.SEQUENCE_MODULO // 2:
+            self.highest[sensor_id] = sequence
+            self.seen[sensor_id] = ((self.seen[sensor_id] << ahead) | 1) & mask
+        elif self.SEQUENCE_MODULO - ahead < self.size:
+            self.seen[sensor_id] |= 1 << (self.SEQUENCE_MODULO - ahead)
+
+    def reset(self, sensor_id=None):
+        """Oublie l'état d'un capteur (ou de tous)"""
+        if sensor_id is None:
+            self.highest.clear()
+            self.seen.clear()
+        else:
+            self.highest.pop(sensor_id, None)
+            self.seen.pop(sensor_id, None)
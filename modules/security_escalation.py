@@ -1,4 +1,7 @@
 import random
+import time
+
+from modules.event_store import EVENT_SECURITY_OTHER, SECURITY_EVENT_CODES, to_log_entry
 
 class SecurityEscalation:
     """Module d'escalade intelligente de sécurité"""
@@ -7,18 +10,36 @@ class SecurityEscalation:
     SEC_MEDIUM = 1
     SEC_HIGH = 2
     
-    def __init__(self):
+    def __init__(self, rate_tracker=None, event_store=None):
         self.sec_level = self.SEC_NORMAL
         self.anomaly_count = 0
         self.max_anomalies_before_escalation = 2  # Réduit à 2 pour les tests
         self.blocked_sensors = set()
         self.challenges = {}
         self.security_log = []
+        # Magasin d'événements optionnel (EventStore): remplace security_log
+        self.event_store = event_store
+        self.stored_events = 0
+        # Mode optionnel: escalade pilotée par taux d'anomalies (AnomalyRateTracker)
+        self.rate_tracker = rate_tracker
+        # Dernier instant vu en mode taux (base de temps de l'appelant)
+        self.last_timestamp = None
+        # Fonctions appelées avec sensor_id à chaque anomalie (ex: réputation du vote)
+        self.anomaly_listeners = []
+        # Fonctions appelées avec (sensor_id, bloqué) à chaque blocage/déblocage
+        self.block_listeners = []
     
-    def process_message(self, sensor_id, is_mac_valid, is_timing_valid):
+    def process_message(self, sensor_id, is_mac_valid, is_timing_valid, timestamp=None,
+                        is_replay=False):
         """
         Traite un message et ajuste le niveau de sécurité
         
+        Args:
+            timestamp: Instant du message en secondes (mode taux uniquement,
+                time.monotonic() par défaut)
+            is_replay: Séquence déjà vue (fenêtre anti-rejeu), anomalie
+                journalisée en REPLAY
+        
         Returns:
             str: Action a entreprendre
         """
@@ -27,14 +48,23 @@ class SecurityEscalation:
             return "BLOCKED"
         
         # CORRECTION: Anomalie détectée si MAC OU timing invalide
-        anomaly_detected = not is_mac_valid or not is_timing_valid
+        anomaly_detected = not is_mac_valid or not is_timing_valid or is_replay
+        
+        if anomaly_detected and self.anomaly_listeners:
+            self._notify_anomaly(sensor_id)
+        
+        if self.rate_tracker is not None:
+            if timestamp is None:
+                timestamp = time.monotonic()
+            self.last_timestamp = timestamp
+            return self._process_rate_based(sensor_id, is_mac_valid, is_timing_valid,
+                                            anomaly_detected, timestamp, is_replay)
         
         # Niveau NORMAL
         if self.sec_level == self.SEC_NORMAL:
             if anomaly_detected:
                 self.anomaly_count += 1
-                issue_type = "MAC_INVALID" if not is_mac_valid else "TIMING_INVALID"
-                self._log_event(sensor_id, issue_type, f"MAC:{is_mac_valid}, Timing:{is_timing_valid}")
+                self._log_anomaly(sensor_id, is_mac_valid, is_timing_valid, is_replay)
                 
                 print(f"   [ESCALATION] Anomalie #{self.anomaly_count} - Seuil: {self.max_anomalies_before_escalation}")
                 
@@ -53,7 +83,7 @@ class SecurityEscalation:
             if anomaly_detected:
                 self.anomaly_count += 1
                 self._log_event(sensor_id, "ANOMALY_DETECTED", 
-                               f"MAC:{is_mac_valid}, Timing:{is_timing_valid}")
+                               f"MAC:{is_mac_valid}, Timing:{is_timing_valid}, Rejeu:{is_replay}")
                 
                 if self.anomaly_count >= self.max_anomalies_before_escalation:
                     self.escalate()
@@ -71,10 +101,64 @@ class SecurityEscalation:
         elif self.sec_level == self.SEC_HIGH:
             if anomaly_detected:
                 self._log_event(sensor_id, "BLOCK_SENSOR", "Anomalie en mode HIGH")
-                self.block_sensor(sensor_id)
+                self.block_sensor(sensor_id, notify=False)  # Anomalie déjà signalée
                 return "BLOCK_SENSOR"
             return "ACCEPT"
     
+    def _process_rate_based(self, sensor_id, is_mac_valid, is_timing_valid,
+                            anomaly_detected, now, is_replay=False):
+        """
+        Variante de process_message pilotée par les taux d'anomalies
+        
+        Les messages valides n'effacent pas l'historique: un attaquant
+        intercalant des trames valides finit par dépasser le seuil, et la
+        désescalade (HIGH compris) attend que le taux global retombe sous
+        le seuil bas.
+        """
+        tracker = self.rate_tracker
+        
+        if self.sec_level == self.SEC_HIGH and anomaly_detected:
+            tracker.record_anomaly(sensor_id, now, self.sec_level)
+            self._log_event(sensor_id, "BLOCK_SENSOR", "Anomalie en mode HIGH")
+            self.block_sensor(sensor_id, notify=False)  # Anomalie déjà signalée
+            return "BLOCK_SENSOR"
+        
+        if anomaly_detected:
+            self.anomaly_count += 1
+            self._log_anomaly(sensor_id, is_mac_valid, is_timing_valid, is_replay)
+            
+            if tracker.record_anomaly(sensor_id, now, self.sec_level):
+                self.escalate()
+                tracker.mark_transition(now)
+                return self.send_challenge(sensor_id)
+            return "REJECT"
+        
+        if tracker.should_deescalate(now, self.sec_level):
+            self.deescalate()
+            tracker.mark_transition(now)
+        return "ACCEPT"
+    
+    def _log_anomaly(self, sensor_id, is_mac_valid, is_timing_valid, is_replay):
+        """Journalise une anomalie au niveau NORMAL sous son type (rejeu, MAC, timing)"""
+        if is_replay:
+            self._log_event(sensor_id, "REPLAY", "Séquence déjà vue")
+        else:
+            issue_type = "MAC_INVALID" if not is_mac_valid else "TIMING_INVALID"
+            self._log_event(sensor_id, issue_type, f"MAC:{is_mac_valid}, Timing:{is_timing_valid}")
+    
+    def add_anomaly_listener(self, callback):
+        """Abonne callback(sensor_id) aux anomalies et blocages de capteurs"""
+        self.anomaly_listeners.append(callback)
+    
+    def add_block_listener(self, callback):
+        """Abonne callback(sensor_id, bloqué) aux blocages et déblocages de capteurs"""
+        self.block_listeners.append(callback)
+    
+    def _notify_anomaly(self, sensor_id):
+        """Prévient les abonnés d'une anomalie sur un capteur"""
+        for callback in self.anomaly_listeners:
+            callback(sensor_id)
+    
     def escalate(self):
         """Monte le niveau de sécurité"""
         if self.sec_level < self.SEC_HIGH:
@@ -94,14 +178,22 @@ class SecurityEscalation:
         """Envoie un challenge au capteur"""
         challenge = random.randint(0, 0xFFFFFFFF)
         self.challenges[sensor_id] = challenge
-        self._log_event(sensor_id, "CHALLENGE_SENT", f"Challenge: 0x{challenge:08X}")
+        self._log_event(sensor_id, "CHALLENGE_SENT", f"Challenge: 0x{challenge:08X}", challenge)
         print(f"   [CHALLENGE] Envoyé à {sensor_id}: 0x{challenge:08X}")
         return f"CHALLENGE:{challenge:08X}"
     
-    def verify_challenge_response(self, sensor_id, response):
+    def verify_challenge_response(self, sensor_id, response, timestamp=None):
         """
         Verifie la reponse a un challenge
         
+        Args:
+            timestamp: Instant de la réponse en secondes (mode taux uniquement,
+                time.monotonic() par défaut)
+        
+        En mode taux, une réponse correcte arrivée avant que l'hystérésis
+        autorise la désescalade laisse le challenge en attente: une
+        nouvelle réponse (ou le trafic valide) pourra désescalader plus tard.
+        
         Returns:
             bool: True si reponse correcte
         """
@@ -112,8 +204,19 @@ class SecurityEscalation:
         expected = self._calculate_expected_response(self.challenges[sensor_id], sensor_id)
         
         if response == expected:
-            del self.challenges[sensor_id]
-            self.deescalate()
+            tracker = self.rate_tracker
+            if tracker is None:
+                del self.challenges[sensor_id]
+                self.deescalate()
+            else:
+                # Mode taux: la désescalade respecte l'hystérésis (seuil bas, durée minimale)
+                if timestamp is None:
+                    timestamp = time.monotonic()
+                self.last_timestamp = timestamp
+                if tracker.should_deescalate(timestamp, self.sec_level):
+                    del self.challenges[sensor_id]
+                    self.deescalate()
+                    tracker.mark_transition(timestamp)
             self._log_event(sensor_id, "CHALLENGE_PASS", "Réponse correcte")
             return True
         else:
@@ -127,9 +230,19 @@ class SecurityEscalation:
         sensor_hash = hash(sensor_id) & 0xFFFFFFFF
         return (challenge ^ sensor_hash) & 0xFFFFFFFF
     
-    def block_sensor(self, sensor_id):
-        """Bloque un capteur compromis"""
+    def block_sensor(self, sensor_id, notify=True):
+        """
+        Bloque un capteur compromis
+        
+        Args:
+            notify: prévenir les abonnés aux anomalies (False si l'anomalie
+                à l'origine du blocage leur a déjà été signalée)
+        """
         self.blocked_sensors.add(sensor_id)
+        if notify and self.anomaly_listeners:
+            self._notify_anomaly(sensor_id)
+        for callback in self.block_listeners:
+            callback(sensor_id, True)
         self._log_event(sensor_id, "SENSOR_BLOCKED", "Capteur isolé du réseau")
         print(f"   [BLOCK] 🚫 Capteur {sensor_id} bloqué")
     
@@ -138,6 +251,8 @@ class SecurityEscalation:
         if sensor_id in self.blocked_sensors:
             self.blocked_sensors.remove(sensor_id)
             self._log_event(sensor_id, "SENSOR_UNBLOCKED", "Capteur débloqué")
+            for callback in self.block_listeners:
+                callback(sensor_id, False)
     
     def get_level_name(self):
         """Retourne le nom du niveau actuel"""
@@ -148,8 +263,13 @@ class SecurityEscalation:
         }
         return names[self.sec_level]
     
-    def _log_event(self, sensor_id, event_type, details):
-        """Journalise les événements de sécurité"""
+    def _log_event(self, sensor_id, event_type, details, value=0):
+        """Journalise les événements de sécurité (value: charge utile du magasin d'événements)"""
+        if self.event_store is not None:
+            self.event_store.log(SECURITY_EVENT_CODES.get(event_type, EVENT_SECURITY_OTHER), sensor_id,
+                                 value, level=self.sec_level, details=details)
+            self.stored_events += 1
+            return
         event = {
             'timestamp': self._get_current_timestamp(),
             'sensor_id': sensor_id,
@@ -165,17 +285,30 @@ class SecurityEscalation:
         return time.strftime("%Y-%m-%d %H:%M:%S")
     
     def get_security_log(self):
-        """Retourne le journal de sécurité"""
+        """Retourne le journal de sécurité (relu du magasin d'événements s'il est attaché)"""
+        if self.event_store is not None:
+            codes = [EVENT_SECURITY_OTHER, *SECURITY_EVENT_CODES.values()]
+            return [to_log_entry(event) for event in self.event_store.events(codes=codes)]
         return self.security_log
     
-    def get_status(self):
-        """Retourne le statut complet du système"""
+    def get_status(self, now=None):
+        """
+        Retourne le statut complet du système
+        
+        Args:
+            now: Instant de lecture du taux d'anomalies (mode taux), par
+                défaut le dernier horodatage reçu par process_message ou
+                verify_challenge_response (base de temps de l'appelant)
+        """
+        if now is None:
+            now = self.last_timestamp
         return {
             'security_level': self.get_level_name(),
             'anomaly_count': self.anomaly_count,
             'blocked_sensors': list(self.blocked_sensors),
             'pending_challenges': list(self.challenges.keys()),
-            'total_events': len(self.security_log)
+            'total_events': len(self.security_log) + self.stored_events,
+            'anomaly_rate': self.rate_tracker.get_rate(now=now) if self.rate_tracker is not None else None
         }
     
     # AJOUT DE LA MÉTHODE MANQUANTE
@@ -1,34 +1,339 @@
-class SensorVoting:
-    """Module de vote collaboratif entre capteurs"""
+import time
+from array import array
+from collections import deque
+from collections.abc import Mapping
+from itertools import islice
+from types import MappingProxyType
+
+from modules.event_store import EVENT_VOTE
+from modules.order_statistics import SortedReadings
+from modules.voting_matrix import HAS_NUMPY, ReadingsMatrix, c_div, evaluate_sorted_groups
+
+class VoteResult(Mapping):
+    """Résultat compact d'un vote, détails matérialisés à la demande
+
+    Conserve l'instantané des lectures triées (ReadingsSnapshot, copié
+    seulement si les lectures changent ensuite) et les bornes [lo, hi)
+    des lectures cohérentes (moins les capteurs exclus pour confiance
+    insuffisante en vote pondéré). Le dictionnaire de détails historique
+    (consistent_sensors, aberrant_sensors, all_readings, ...) n'est construit
+    qu'au premier accès par clé. Sert aussi d'entrée d'historique: les clés
+    'group_name', 'timestamp', 'success' et 'details' restent accessibles.
+    En virgule fixe, les lectures restent en entiers Q (scale = 2**bits) et
+    raw conserve (médiane, moyenne) entières telles que calculées par le nœud.
+    
+    Compatibilité: ce n'est plus un dict mais un Mapping en lecture seule
+    (isinstance(details, dict) devient faux, dict(details) en fait une
+    copie). Ses clés sont celles des détails suivies des quatre clés
+    d'historique, aussi bien en itération que par accès direct.
+    """
+    
+    __slots__ = ('group_name', 'success', 'value', 'median', 'snapshot',
+                 'lo', 'hi', 'excluded', 'count', 'threshold', 'scale', 'raw',
+                 'created', '_details')
+    
+    _RECORD_KEYS = ('group_name', 'timestamp', 'success', 'details')
+    
+    def __init__(self, group_name, success, value, median, order, lo, hi, threshold,
+                 excluded=(), scale=None):
+        self.group_name = group_name
+        self.success = success
+        self.scale = scale
+        if scale is None:
+            self.raw = None
+            self.value = value  # Moyenne des lectures cohérentes (None si aucune)
+            self.median = median
+        else:
+            self.raw = (median, value)
+            self.value = value / scale if value is not None else None
+            self.median = median / scale
+        self.snapshot = order.snapshot()
+        self.lo = lo
+        self.hi = hi
+        self.excluded = excluded
+        self.count = hi - lo - len(excluded)  # Nombre de lectures cohérentes retenues
+        self.threshold = threshold
+        self.created = time.time()
+        self._details = None
+    
+    @property
+    def ids(self):
+        """Capteurs triés par lecture au moment du vote"""
+        return self.snapshot.ids
+    
+    @property
+    def values(self):
+        """Lectures triées au moment du vote"""
+        return self.snapshot.values
+    
+    @property
+    def timestamp(self):
+        """Horodatage formaté (calculé à la lecture)"""
+        return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.created))
+    
+    @property
+    def consistent_sensors(self):
+        if self.excluded:
+            return [sid for sid in self.ids[self.lo:self.hi] if sid not in self.excluded]
+        return list(self.ids[self.lo:self.hi])
+    
+    @property
+    def aberrant_sensors(self):
+        ids = self.ids
+        return list(ids[:self.lo]) + list(ids[self.hi:]) + list(self.excluded)
+    
+    @property
+    def details(self):
+        """Dictionnaire de détails complet (construit une seule fois)"""
+        if self._details is None:
+            count = self.count
+            details = {
+                'consistent_sensors': self.consistent_sensors,
+                'aberrant_sensors': self.aberrant_sensors,
+                'consistent_readings': count,
+            }
+            if self.success:
+                details['total_readings'] = len(self.ids)
+                details['consensus_value'] = self.value
+            else:
+                details['required_threshold'] = self.threshold
+                if count > 0:
+                    details['partial_value'] = self.value
+            details['median_reference'] = self.median
+            if self.scale is None:
+                details['all_readings'] = dict(zip(self.ids, self.values))
+            else:
+                scale = self.scale
+                details['all_readings'] = {sid: v / scale for sid, v in zip(self.ids, self.values)}
+                details['fixed_point'] = {'scale': scale, 'median_q': self.raw[0],
+                                          'value_q': self.raw[1]}
+            if not self.success:
+                details['reason'] = (f"Consensus impossible: {count}/{self.threshold} lectures cohérentes"
+                                     if count > 0 else "Aucune lecture cohérente détectée")
+            self._details = details
+        return self._details
+    
+    def __getitem__(self, key):
+        if key in self._RECORD_KEYS:
+            return getattr(self, key)
+        return self.details[key]
+    
+    def __iter__(self):
+        yield from self.details
+        yield from self._RECORD_KEYS
+    
+    def __len__(self):
+        return len(self.details) + len(self._RECORD_KEYS)
+    
+    def __repr__(self):
+        return (f"VoteResult(group={self.group_name!r}, success={self.success}, "
+                f"value={self.value}, consistent={self.count}/{len(self.ids)})")
+
+class GroupVoting:
+    """Base des modules de vote: groupes, compteurs de votes et statistiques
+
+    Chaque groupe est un dict portant au moins 'sensors' (capteur ->
+    position) et les compteurs de votes; les sous-classes y ajoutent le
+    stockage de leurs lectures et implémentent _clear_readings.
+    """
     
     def __init__(self, threshold=3, tolerance=5):
         self.threshold = threshold  # Nombre minimum de votes concordants
         self.tolerance = tolerance  # Tolerance de variation acceptable
         self.voting_groups = {}
-        self.voting_history = []
     
-    def register_voting_group(self, group_name, sensor_ids):
-        """Enregistre un groupe de capteurs redondants"""
-        self.voting_groups[group_name] = {
-            'sensors': sensor_ids,
-            'readings': {},
+    @staticmethod
+    def _new_group(sensors, **storage):
+        """Groupe aux compteurs à zéro (storage: champs propres à la sous-classe)"""
+        group = {
+            'sensors': sensors,  # capteur -> position dans le groupe (appartenance O(1))
             'consensus_failures': 0,
             'successful_votes': 0,
             'total_votes': 0
         }
+        group.update(storage)
+        return group
+    
+    @staticmethod
+    def _count_outcome(group, consensus):
+        """Compte un vote abouti (réussi ou sans consensus)"""
+        if consensus:
+            group['successful_votes'] += 1
+        else:
+            group['consensus_failures'] += 1
+    
+    def get_group_stats(self, group_name):
+        """Retourne les statistiques d'un groupe"""
+        if group_name not in self.voting_groups:
+            return None
+        
+        group = self.voting_groups[group_name]
+        total = group['total_votes']
+        success = group['successful_votes']
+        
+        stats = {
+            'total_votes': total,
+            'successful_votes': success,
+            'consensus_failures': group['consensus_failures'],
+            'success_rate': (success / total * 100) if total > 0 else 0,
+            'registered_sensors': list(group['sensors'])
+        }
+        stats.update(self._extra_group_stats(group))
+        return stats
+    
+    def _extra_group_stats(self, group):
+        return {}
+    
+    def reset_readings(self, group_name):
+        """Reinitialise les lectures d'un groupe"""
+        if group_name in self.voting_groups:
+            self._clear_readings(group_name, self.voting_groups[group_name])
+    
+    def _clear_readings(self, group_name, group):
+        raise NotImplementedError
+
+class SensorVoting(GroupVoting):
+    """Module de vote collaboratif entre capteurs"""
+    
+    def __init__(self, threshold=3, tolerance=5, history_size=1000,
+                 weighted=False, trust_rate=0.1, min_trust=0.5, fixed_point_bits=None,
+                 cache_votes=False, event_store=None):
+        if weighted and fixed_point_bits is not None:
+            raise ValueError("Le vote pondéré n'existe pas en virgule fixe")
+        super().__init__(threshold, tolerance)
+        self.history_size = history_size  # Taille des tampons d'historique
+        self.sensor_groups = {}  # Index inverse capteur -> groupes
+        # Vote pondéré par la réputation: un score de confiance par capteur
+        self.weighted = weighted
+        self.trust_rate = trust_rate  # Poids d'un vote dans la moyenne glissante
+        self.min_trust = min_trust  # Sous ce score, le capteur ne vote plus
+        self.sensor_slots = {}  # capteur -> indice dans trust
+        self.trust = array('d')
+        # Mode virgule fixe (format Q, arithmétique entière du microcontrôleur)
+        self.fixed_point_bits = fixed_point_bits
+        self.fixed_scale = 1 << fixed_point_bits if fixed_point_bits is not None else None
+        self.voting_history = deque(maxlen=history_size)
+        # Magasin d'événements optionnel (EventStore): chaque vote y est aussi
+        # archivé, les historiques bornés restant disponibles en mémoire
+        self.event_store = event_store
+        self._matrix = None  # ReadingsMatrix créée au premier verify_all()
+        # Cache de vote sur option: un groupe dont aucune lecture n'a changé n'est
+        # pas recalculé, et ce vote n'est ni ajouté aux historiques ni archivé
+        # dans le magasin (désactivé en vote pondéré, où chaque vote fait
+        # évoluer les confiances)
+        self.cache_votes = cache_votes and not weighted
+    
+    def register_voting_group(self, group_name, sensor_ids):
+        """Enregistre un groupe de capteurs redondants"""
+        if group_name in self.voting_groups:
+            for sensor_id in self.voting_groups[group_name]['sensors']:
+                self._unindex_sensor(sensor_id, group_name)
+        order = SortedReadings()
+        self.voting_groups[group_name] = self._new_group(
+            {},
+            order=order,
+            # Vue en lecture seule capteur -> valeur (écritures via submit_reading)
+            readings=MappingProxyType(order.by_sensor),
+            history=deque(maxlen=self.history_size),
+            dirty=True,  # Lectures modifiées depuis le dernier vote
+            cached_vote=None,  # (paramètres, résultat) du dernier vote
+            cache_hits=0,
+            cache_misses=0)
+        for sensor_id in sensor_ids:
+            self.add_sensor_to_group(group_name, sensor_id)
+        if self._matrix is not None:
+            self._matrix.add_group(group_name)
+    
+    def add_sensor_to_group(self, group_name, sensor_id):
+        """
+        Ajoute un capteur à un groupe existant et met à jour l'index inverse
+        
+        Returns:
+            bool: True si le capteur a été ajouté
+        """
+        group = self.voting_groups.get(group_name)
+        if group is None or sensor_id in group['sensors']:
+            return False
+        group['sensors'][sensor_id] = len(group['sensors'])
+        self.sensor_groups.setdefault(sensor_id, []).append(group_name)
+        if sensor_id not in self.sensor_slots:
+            self.sensor_slots[sensor_id] = len(self.trust)
+            self.trust.append(1.0)
+        return True
+    
+    def _unindex_sensor(self, sensor_id, group_name):
+        """Retire group_name de l'index inverse du capteur"""
+        groups = self.sensor_groups.get(sensor_id)
+        if groups and group_name in groups:
+            groups.remove(group_name)
+            if not groups:
+                del self.sensor_groups[sensor_id]
+    
+    def get_sensor_groups(self, sensor_id):
+        """Retourne les groupes auxquels appartient un capteur"""
+        return list(self.sensor_groups.get(sensor_id, ()))
+    
+    def get_trust(self, sensor_id):
+        """Retourne le score de confiance d'un capteur (None si inconnu)"""
+        slot = self.sensor_slots.get(sensor_id)
+        return self.trust[slot] if slot is not None else None
+    
+    def penalize_sensor(self, sensor_id, factor=0.5):
+        """
+        Réduit la confiance d'un capteur (ex: anomalie signalée par SecurityEscalation)
+        
+        Utilisable directement comme écouteur:
+        escalation.add_anomaly_listener(voting.penalize_sensor)
+        """
+        slot = self.sensor_slots.get(sensor_id)
+        if slot is not None:
+            self.trust[slot] *= factor
     
     def submit_reading(self, group_name, sensor_id, value):
         """Soumet une lecture d'un capteur"""
-        if group_name not in self.voting_groups:
+        group = self.voting_groups.get(group_name)
+        if group is None:
             return False
         
-        # Vérifier que le capteur appartient au groupe
-        if sensor_id not in self.voting_groups[group_name]['sensors']:
+        # Vérifier que le capteur appartient au groupe (O(1))
+        if sensor_id not in group['sensors']:
             return False
         
-        self.voting_groups[group_name]['readings'][sensor_id] = value
+        encoded = self.encode_reading(value)
+        if group['order'].update(sensor_id, encoded):
+            group['dirty'] = True
+        if self._matrix is not None:
+            self._matrix.set(group_name, sensor_id, encoded)
         return True
     
+    def encode_reading(self, value):
+        """Représentation stockée d'une lecture (entier Q en virgule fixe)"""
+        if self.fixed_scale is None:
+            return value
+        if isinstance(value, int):
+            return value << self.fixed_point_bits
+        return int(round(value * self.fixed_scale))
+    
+    def submit(self, sensor_id, value):
+        """
+        Soumet une lecture à tous les groupes dont le capteur est membre
+        
+        Returns:
+            int: Nombre de groupes mis à jour
+        """
+        groups = self.sensor_groups.get(sensor_id)
+        if not groups:
+            return 0
+        matrix = self._matrix
+        encoded = self.encode_reading(value)
+        for group_name in groups:
+            group = self.voting_groups[group_name]
+            if group['order'].update(sensor_id, encoded):
+                group['dirty'] = True
+            if matrix is not None:
+                matrix.set(group_name, sensor_id, encoded)
+        return len(groups)
+    
     def verify_voting(self, group_name):
         """
         Verifie le consensus du groupe de capteurs
@@ -40,140 +345,263 @@ class SensorVoting:
             return False, None, "Groupe inexistant"
         
         group = self.voting_groups[group_name]
-        readings_dict = group['readings']
+        if not self.cache_votes:
+            return self.vote_readings(group_name, group['order'])
+        
+        # Lectures inchangées: résultat en cache, seuls les compteurs avancent
+        params = (self.threshold, self.tolerance)
+        cached = group['cached_vote']
+        if not group['dirty'] and cached is not None and cached[0] == params:
+            consensus = cached[1][0]
+            group['cache_hits'] += 1
+            group['total_votes'] += 1
+            if isinstance(cached[1][2], VoteResult):
+                self._count_outcome(group, consensus)
+            return cached[1]
+        
+        group['cache_misses'] += 1
+        result = self.vote_readings(group_name, group['order'])
+        group['cached_vote'] = (params, result)
+        group['dirty'] = False
+        return result
+    
+    def vote_readings(self, group_name, order):
+        """
+        Vote sur un ensemble de lectures triées du groupe (SortedReadings)
+        
+        Utilisé par verify_voting sur les lectures courantes du groupe et
+        par le vote par époques (StreamingVoter) sur les lectures d'une époque.
+        
+        Returns:
+            tuple: (consensus_atteint, valeur_consensuelle, details)
+        """
+        group = self.voting_groups[group_name]
+        readings_dict = order.by_sensor
         
         group['total_votes'] += 1
         
         if len(readings_dict) < self.threshold:
             return False, None, f"Lectures insuffisantes ({len(readings_dict)}/{self.threshold})"
         
-        readings = list(readings_dict.values())
-        sensor_ids = list(readings_dict.keys())
+        if self.weighted:
+            return self._vote_weighted(group_name, group, order)
+        if self.fixed_scale is not None:
+            return self._vote_fixed(group_name, group, order)
+        
+        # Étape 1: Médiane lue en O(1) sur les lectures maintenues triées
+        median = order.median()
+        
+        # Étape 2: Lectures cohérentes = tranche contiguë [lo, hi) autour de la médiane
+        lo, hi = order.partition(median, self.tolerance)
+        consistent_count = hi - lo
+        
+        # Étape 3: Vérifier le consensus
+        consensus = consistent_count >= self.threshold
+        
+        # Moyenne des lectures cohérentes seulement
+        mean = sum(order.values[lo:hi]) / consistent_count if consistent_count else None
+        
+        return self._record_vote(group_name, group, order, consensus, mean, median, lo, hi)
+    
+    def _vote_fixed(self, group_name, group, order):
+        """
+        Vote en virgule fixe, bit à bit identique au calcul du nœud embarqué
         
-        # CORRECTION: Algorithme de consensus amélioré
-        # Étape 1: Calculer la médiane (robuste aux valeurs extrêmes)
-        sorted_readings = sorted(readings)
-        n = len(sorted_readings)
+        Lectures, tolérance, médiane et moyenne sont des entiers Q; les
+        divisions tronquent vers zéro comme en C.
+        """
+        values = order.values
+        n = len(values)
+        
+        # Étape 1: Médiane entière ((a + b) / 2 tronqué si n est pair)
         if n % 2 == 1:
-            median = sorted_readings[n//2]
+            median = values[n // 2]
         else:
-            median = (sorted_readings[n//2-1] + sorted_readings[n//2]) / 2
-        
-        # Étape 2: Identifier les lectures cohérentes avec la médiane
-        consistent_readings = []
-        consistent_sensors = []
-        aberrant_sensors = []
-        aberrant_values = []
-        
-        for sensor_id, reading in readings_dict.items():
-            if abs(reading - median) <= self.tolerance:
-                consistent_readings.append(reading)
-                consistent_sensors.append(sensor_id)
-            else:
-                aberrant_sensors.append(sensor_id)
-                aberrant_values.append(reading)
+            median = c_div(values[n // 2 - 1] + values[n // 2], 2)
         
-        # Étape 3: Vérifier le consensus
-        consensus = len(consistent_readings) >= self.threshold
+        # Étape 2: Comparaison de tolérance en entiers
+        tolerance = int(round(self.tolerance * self.fixed_scale))
+        lo, hi = order.partition(median, tolerance)
+        consistent_count = hi - lo
         
-        if consensus:
-            # Calculer la moyenne des lectures cohérentes seulement
-            consensus_value = sum(consistent_readings) / len(consistent_readings)
-            group['successful_votes'] += 1
-            
-            details = {
-                'consistent_sensors': consistent_sensors,
-                'aberrant_sensors': aberrant_sensors,
-                'consistent_readings': len(consistent_readings),
-                'total_readings': len(readings),
-                'consensus_value': consensus_value,
-                'median_reference': median,
-                'all_readings': readings_dict.copy()
-            }
-            
-            self._log_vote(group_name, True, details)
-            return True, consensus_value, details
+        # Étape 3: Consensus et moyenne entière
+        consensus = consistent_count >= self.threshold
+        mean = c_div(sum(values[lo:hi]), consistent_count) if consistent_count else None
+        
+        consensus, value, result = self._record_vote(group_name, group, order, consensus, mean,
+                                                     median, lo, hi, scale=self.fixed_scale)
+        return consensus, (result.value if consensus else None), result
+    
+    def _record_vote(self, group_name, group, order, consensus, mean, median, lo, hi,
+                     excluded=(), scale=None):
+        """Met à jour les compteurs du groupe et journalise le résultat"""
+        self._count_outcome(group, consensus)
+        
+        # Les détails (listes de capteurs, copie des lectures) ne sont construits qu'à la lecture
+        result = VoteResult(group_name, consensus, mean, median, order, lo, hi, self.threshold,
+                            excluded, scale)
+        self._log_vote(group, result)
+        return consensus, (mean if consensus else None), result
+    
+    def _vote_weighted(self, group_name, group, order):
+        """
+        Vote pondéré par la confiance des capteurs
+        
+        Médiane pondérée des capteurs de confiance suffisante, moyenne
+        pondérée des lectures cohérentes, puis mise à jour O(1) du score
+        de chaque votant (moyenne glissante de son taux de cohérence).
+        """
+        values = order.values
+        ids = order.ids
+        trust = self.trust
+        slots = [self.sensor_slots[sensor_id] for sensor_id in ids]
+        weights = [trust[slot] for slot in slots]
+        min_trust = self.min_trust
+        
+        # Étape 1: Médiane pondérée (premier point où le poids cumulé atteint la moitié)
+        total = sum(w for w in weights if w >= min_trust)
+        if total > 0:
+            half = total / 2
+            cumulative = 0.0
+            for value, w in zip(values, weights):
+                if w >= min_trust:
+                    cumulative += w
+                    if cumulative >= half:
+                        median = value
+                        break
         else:
-            group['consensus_failures'] += 1
-            
-            # CORRECTION: Fournir plus de détails en cas d'échec
-            if len(consistent_readings) > 0:
-                # Il y a des lectures cohérentes mais pas assez pour le consensus
-                partial_value = sum(consistent_readings) / len(consistent_readings)
-                details = {
-                    'consistent_sensors': consistent_sensors,
-                    'aberrant_sensors': aberrant_sensors,
-                    'consistent_readings': len(consistent_readings),
-                    'required_threshold': self.threshold,
-                    'partial_value': partial_value,
-                    'median_reference': median,
-                    'all_readings': readings_dict.copy(),
-                    'reason': f"Consensus impossible: {len(consistent_readings)}/{self.threshold} lectures cohérentes"
-                }
+            median = order.median()
+        
+        # Étape 2: Tranche cohérente, sans les capteurs de confiance insuffisante
+        lo, hi = order.partition(median, self.tolerance)
+        excluded = tuple(ids[i] for i in range(lo, hi) if weights[i] < min_trust)
+        weight_sum = 0.0
+        weighted_total = 0.0
+        for i in range(lo, hi):
+            w = weights[i]
+            if w >= min_trust:
+                weight_sum += w
+                weighted_total += w * values[i]
+        
+        # Étape 3: Consensus et moyenne pondérée
+        consensus = hi - lo - len(excluded) >= self.threshold
+        mean = weighted_total / weight_sum if weight_sum > 0 else None
+        
+        # Étape 4: Réputation - cohérent -> vers 1, aberrant -> vers 0
+        rate = self.trust_rate
+        for i, slot in enumerate(slots):
+            if lo <= i < hi:
+                trust[slot] += rate * (1.0 - trust[slot])
             else:
-                # Aucune lecture cohérente
-                details = {
-                    'consistent_sensors': [],
-                    'aberrant_sensors': aberrant_sensors,
-                    'consistent_readings': 0,
-                    'required_threshold': self.threshold,
-                    'median_reference': median,
-                    'all_readings': readings_dict.copy(),
-                    'reason': "Aucune lecture cohérente détectée"
-                }
-            
-            self._log_vote(group_name, False, details)
-            return False, None, details
-    
-    def _log_vote(self, group_name, success, details):
-        """Journalise les résultats de vote"""
-        vote_record = {
-            'group_name': group_name,
-            'timestamp': self._get_current_timestamp(),
-            'success': success,
-            'details': details
-        }
-        self.voting_history.append(vote_record)
-    
-    def _get_current_timestamp(self):
-        """Retourne le timestamp actuel formaté"""
-        import time
-        return time.strftime("%Y-%m-%d %H:%M:%S")
+                trust[slot] -= rate * trust[slot]
+        
+        return self._record_vote(group_name, group, order, consensus, mean, median, lo, hi,
+                                 excluded)
     
-    def get_group_stats(self, group_name):
-        """Retourne les statistiques d'un groupe"""
-        if group_name not in self.voting_groups:
-            return None
+    def verify_all(self):
+        """
+        Vérifie le consensus de tous les groupes en un seul appel
         
-        group = self.voting_groups[group_name]
-        total = group['total_votes']
-        success = group['successful_votes']
+        Les lectures sont tenues dans une matrice groupes x capteurs
+        (ReadingsMatrix) et évaluées en quelques opérations NumPy; sans
+        NumPy, repli sur les lectures triées de chaque groupe. Les
+        compteurs des groupes sont mis à jour, l'historique ne l'est pas.
+        
+        Le vote pondéré (médiane pondérée, confiance mise à jour à chaque
+        vote) n'est pas vectorisé: verify_all le refuse plutôt que de
+        produire un consensus différent de verify_voting.
+        
+        Returns:
+            BatchVoteResult: Tableaux par groupe (result.group(nom) pour la vue dict)
+        """
+        if self.weighted:
+            raise ValueError("verify_all n'existe pas en vote pondéré: utiliser verify_voting")
+        # Virgule fixe: lectures en entiers Q, tolérance convertie comme dans _vote_fixed
+        scale = self.fixed_scale
+        tolerance = self.tolerance if scale is None else int(round(self.tolerance * scale))
+        if HAS_NUMPY:
+            if self._matrix is None:
+                self._matrix = self._build_matrix()
+            result = self._matrix.evaluate(self.threshold, tolerance, scale)
+        else:
+            result = evaluate_sorted_groups(
+                [(name, group['order']) for name, group in self.voting_groups.items()],
+                self.threshold, tolerance, scale)
         
+        for group_name, consensus in zip(result.group_names, result.consensus):
+            group = self.voting_groups[group_name]
+            group['total_votes'] += 1
+            self._count_outcome(group, consensus)
+        
+        return result
+    
+    def _build_matrix(self):
+        """Construit la matrice de lectures (représentation stockée, entiers Q en virgule fixe)"""
+        widest = max((len(group['sensors']) for group in self.voting_groups.values()), default=1)
+        matrix = ReadingsMatrix(group_capacity=max(len(self.voting_groups), 1),
+                                sensor_capacity=max(widest, 1))
+        for group_name, group in self.voting_groups.items():
+            matrix.add_group(group_name)
+            for sensor_id, value in group['order'].by_sensor.items():
+                matrix.set(group_name, sensor_id, value)
+        return matrix
+    
+    def _log_vote(self, group, result):
+        """Journalise les résultats de vote (tampons circulaires de taille fixe)"""
+        group['history'].append(result)
+        self.voting_history.append(result)
+        if self.event_store is not None:
+            self.event_store.log(EVENT_VOTE, result.group_name,
+                                 result.value if result.value is not None else float('nan'), result.median,
+                                 level=1 if result.success else 0, aux=min(max(result.count, 0), 255))
+    
+    def _clear_readings(self, group_name, group):
+        group['order'].clear()
+        group['dirty'] = True
+        if self._matrix is not None:
+            self._matrix.clear_group(group_name)
+    
+    def get_cache_stats(self, group_name=None):
+        """
+        Statistiques du cache de vote (d'un groupe ou de tous les groupes)
+        
+        Returns:
+            dict: hits, misses et hit_rate (%)
+        """
+        if group_name is not None:
+            if group_name not in self.voting_groups:
+                return None
+            groups = [self.voting_groups[group_name]]
+        else:
+            groups = self.voting_groups.values()
+        hits = sum(group['cache_hits'] for group in groups)
+        misses = sum(group['cache_misses'] for group in groups)
+        total = hits + misses
         return {
-            'total_votes': total,
-            'successful_votes': success,
-            'consensus_failures': group['consensus_failures'],
-            'success_rate': (success / total * 100) if total > 0 else 0,
-            'registered_sensors': group['sensors']
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': (hits / total * 100) if total > 0 else 0
         }
     
-    def reset_readings(self, group_name):
-        """Reinitialise les lectures d'un groupe"""
-        if group_name in self.voting_groups:
-            self.voting_groups[group_name]['readings'] = {}
-    
     def get_voting_history(self, group_name=None, limit=10):
-        """Retourne l'historique des votes"""
+        """Retourne l'historique des votes (O(limit), du plus ancien au plus récent)"""
         if group_name:
-            history = [h for h in self.voting_history if h['group_name'] == group_name]
+            if group_name not in self.voting_groups:
+                return []
+            history = self.voting_groups[group_name]['history']
         else:
             history = self.voting_history
         
-        return history[-limit:] if limit else history
+        if not limit:
+            return list(history)
+        recent = list(islice(reversed(history), limit))
+        recent.reverse()
+        return recent
     
     def set_voting_parameters(self, threshold=None, tolerance=None):
         """Modifie les paramètres de vote"""
         if threshold is not None:
             self.threshold = threshold
         if tolerance is not None:
-            self.tolerance = tolerance
\ No newline at end of file
+            self.tolerance = tolerance
+
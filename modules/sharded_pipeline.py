@@ -0,0 +1,336 @@
+import struct
+import time
+import zlib
+import multiprocessing
+from multiprocessing import shared_memory
+
+from modules.pipeline import TAPPipeline, Verdict
+from modules.sensor_voting import SensorVoting
+
+# Enregistrements échangés via les anneaux (taille fixe, sans pickling)
+FRAME_RECORD = struct.Struct('<I8sd')  # can_id, trame, horodatage_ms
+RESULT_RECORD = struct.Struct('<IHHdBBBI')  # can_id, data, seq, horodatage, raison, action, niveau, challenge
+
+ACTION_CODES = ('ACCEPT', 'REJECT', 'BLOCKED', 'BLOCK_SENSOR', 'CHALLENGE')
+_ACTION_INDEX = {name: i for i, name in enumerate(ACTION_CODES)}
+_CHALLENGE = _ACTION_INDEX['CHALLENGE']
+
+
+class SharedRingBuffer:
+    """File circulaire mono-producteur / mono-consommateur en mémoire partagée
+
+    En-tête: tête (écrite par le producteur), queue (écrite par le
+    consommateur), capacité, drapeau de fermeture. Les indices croissent
+    sans fin; l'emplacement d'un enregistrement est indice % capacité.
+    Le producteur écrit ses enregistrements puis publie la tête une seule
+    fois par lot (publish), ce qui limite les écritures partagées.
+    """
+
+    HEADER = struct.Struct('<QQQQ')
+    _HEAD, _TAIL, _CAPACITY, _CLOSED = 0, 8, 16, 24
+
+    def __init__(self, record, capacity=4096, name=None):
+        self.record = record
+        if name is None:
+            size = self.HEADER.size + record.size * capacity
+            self.shm = shared_memory.SharedMemory(create=True, size=size)
+            self.HEADER.pack_into(self.shm.buf, 0, 0, 0, capacity, 0)
+            self.owner = True
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+            capacity = struct.unpack_from('<Q', self.shm.buf, self._CAPACITY)[0]
+            self.owner = False
+        self.name = self.shm.name
+        self.capacity = capacity
+        self._buf = self.shm.buf
+        self._head = struct.unpack_from('<Q', self._buf, self._HEAD)[0]
+        self._tail = struct.unpack_from('<Q', self._buf, self._TAIL)[0]
+
+    # --- Producteur ---
+
+    def push(self, *fields):
+        """Écrit un enregistrement (non publié); False si l'anneau est plein"""
+        if self._head - self._tail >= self.capacity:
+            self._tail = struct.unpack_from('<Q', self._buf, self._TAIL)[0]
+            if self._head - self._tail >= self.capacity:
+                return False
+        offset = self.HEADER.size + (self._head % self.capacity) * self.record.size
+        self.record.pack_into(self._buf, offset, *fields)
+        self._head += 1
+        return True
+
+    def publish(self):
+        """Rend visibles au consommateur les enregistrements écrits"""
+        struct.pack_into('<Q', self._buf, self._HEAD, self._head)
+
+    def close(self):
+        """Signale la fin du flux (après publication)"""
+        self.publish()
+        struct.pack_into('<Q', self._buf, self._CLOSED, 1)
+
+    # --- Consommateur ---
+
+    def pop_many(self, limit):
+        """Lit jusqu'à limit enregistrements publiés (liste de tuples)"""
+        head = struct.unpack_from('<Q', self._buf, self._HEAD)[0]
+        tail = self._tail
+        end = min(head, tail + limit)
+        if end == tail:
+            return []
+        unpack_from = self.record.unpack_from
+        base = self.HEADER.size
+        size = self.record.size
+        capacity = self.capacity
+        records = [unpack_from(self._buf, base + (i % capacity) * size) for i in range(tail, end)]
+        self._tail = end
+        struct.pack_into('<Q', self._buf, self._TAIL, end)
+        return records
+
+    @property
+    def closed(self):
+        return struct.unpack_from('<Q', self._buf, self._CLOSED)[0] == 1
+
+    def release(self):
+        """Détache la mémoire partagée (et la supprime côté créateur)"""
+        self._buf = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def shard_for(sensor_id, shards):
+    """Shard d'un capteur par hachage stable (indépendant de PYTHONHASHSEED)"""
+    return zlib.crc32(str(sensor_id).encode()) % shards
+
+
+def _wait(ring, idle_s):
+    ring.publish()
+    time.sleep(idle_s)
+
+
+def _shard_worker(frame_ring_name, result_ring_name, sensors, key, timing_tolerance_ms,
+                  batch_size, idle_s):
+    """Boucle d'un processus de shard: état MAC/timing/escalade de ses capteurs"""
+    frames = SharedRingBuffer(FRAME_RECORD, name=frame_ring_name)
+    results = SharedRingBuffer(RESULT_RECORD, name=result_ring_name)
+    # Pas de groupe de vote ici: la fusion des votes est faite par le coordinateur
+    pipeline = TAPPipeline(key=key, timing_tolerance_ms=timing_tolerance_ms)
+    for sensor_id, can_id, base_interval_ms, unique_delay_ms in sensors:
+        pipeline.register_sensor(sensor_id, can_id, base_interval_ms, unique_delay_ms)
+    escalation = pipeline.escalation_module
+
+    try:
+        while True:
+            batch = frames.pop_many(batch_size)
+            if not batch:
+                if frames.closed:
+                    break
+                time.sleep(idle_s)
+                continue
+            for verdict in pipeline.process_batch(batch):
+                action = verdict.action
+                if action.startswith('CHALLENGE:'):
+                    code, challenge = _CHALLENGE, int(action[10:], 16)
+                else:
+                    code, challenge = _ACTION_INDEX[action], 0
+                record = (verdict.can_id, verdict.data or 0, verdict.sequence or 0,
+                          verdict.timestamp, verdict.reason, code, escalation.sec_level,
+                          challenge)
+                while not results.push(*record):
+                    _wait(results, idle_s)
+            results.publish()
+    finally:
+        results.close()
+        frames.release()
+        results.release()
+
+
+class ShardedTAPEngine:
+    """Moteur TAP réparti sur plusieurs processus
+
+    Les capteurs sont affectés aux shards par hachage stable de leur
+    identifiant. Chaque processus de shard possède l'état MicroMAC,
+    TimingVerifier et SecurityEscalation de ses capteurs. Le répartiteur
+    écrit les trames brutes dans un anneau en mémoire partagée par shard
+    (enregistrements de taille fixe, sans pickling) et le coordinateur
+    relit les résultats dans un second anneau par shard, reconstruit les
+    Verdict et alimente le vote: les groupes de vote répartis sur
+    plusieurs shards sont fusionnés dans le SensorVoting du coordinateur.
+
+    Chaque capteur appartient à un seul shard et chaque anneau est FIFO:
+    l'ordre par capteur est préservé. L'ordre global entre capteurs de
+    shards différents ne l'est pas. Le niveau d'escalade est propre à
+    chaque shard (voir get_stats).
+    """
+
+    def __init__(self, workers=None, key=0xABC123, voting_threshold=2, voting_tolerance=5,
+                 timing_tolerance_ms=2, ring_capacity=4096, batch_size=64, idle_s=0.0005,
+                 voting_module=None):
+        self.workers = workers or multiprocessing.cpu_count()
+        self.key = key
+        self.timing_tolerance_ms = timing_tolerance_ms
+        self.ring_capacity = ring_capacity
+        self.batch_size = batch_size
+        self.idle_s = idle_s
+        self.voting_module = voting_module or SensorVoting(threshold=voting_threshold,
+                                                           tolerance=voting_tolerance)
+        self.sensors_by_can_id = {}
+        self.shard_by_can_id = {}
+        self.shard_sensors = [[] for _ in range(self.workers)]
+        self.shard_levels = [0] * self.workers
+        self.reason_counts = [0] * len(Verdict.REASON_NAMES)
+        self.frames_processed = 0
+        self._frame_rings = []
+        self._result_rings = []
+        self._processes = []
+        self._pending = 0
+
+    def register_sensor(self, sensor_id, can_id, base_interval_ms, unique_delay_ms,
+                        voting_group=None):
+        """Associe un CAN ID à un capteur (avant start())"""
+        if self._processes:
+            raise RuntimeError("Capteurs à enregistrer avant le démarrage des shards")
+        shard = shard_for(sensor_id, self.workers)
+        self.sensors_by_can_id[can_id] = sensor_id
+        self.shard_by_can_id[can_id] = shard
+        self.shard_sensors[shard].append((sensor_id, can_id, base_interval_ms, unique_delay_ms))
+        if voting_group:
+            voting = self.voting_module
+            if voting_group not in voting.voting_groups:
+                voting.register_voting_group(voting_group, [])
+            voting.add_sensor_to_group(voting_group, sensor_id)
+
+    def start(self):
+        """Crée les anneaux partagés et lance un processus par shard"""
+        if self._processes:
+            return
+        for shard in range(self.workers):
+            frame_ring = SharedRingBuffer(FRAME_RECORD, self.ring_capacity)
+            result_ring = SharedRingBuffer(RESULT_RECORD, self.ring_capacity)
+            process = multiprocessing.Process(
+                target=_shard_worker,
+                args=(frame_ring.name, result_ring.name, self.shard_sensors[shard], self.key,
+                      self.timing_tolerance_ms, self.batch_size, self.idle_s),
+                daemon=True)
+            process.start()
+            self._frame_rings.append(frame_ring)
+            self._result_rings.append(result_ring)
+            self._processes.append(process)
+
+    def stop(self):
+        """Ferme les anneaux, attend les shards et libère la mémoire partagée"""
+        for ring in self._frame_rings:
+            ring.close()
+        for process in self._processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        for ring in self._frame_rings + self._result_rings:
+            ring.release()
+        self._frame_rings = []
+        self._result_rings = []
+        self._processes = []
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def process_stream(self, frames):
+        """
+        Répartit un flux de (can_id, trame, horodatage_ms) sur les shards
+
+        Yields:
+            Verdict: Un verdict par trame (ordre préservé par capteur)
+        """
+        self.start()
+        frame_rings = self._frame_rings
+        shard_by_can_id = self.shard_by_can_id
+        chunk = self.batch_size
+        written = 0
+
+        for can_id, frame, timestamp_ms in frames:
+            shard = shard_by_can_id.get(can_id)
+            if shard is None or len(frame) != 8:
+                # Rejet sans état: traité directement par le répartiteur
+                reason = Verdict.UNKNOWN_ID if shard is None else Verdict.MALFORMED
+                self.frames_processed += 1
+                self.reason_counts[reason] += 1
+                yield Verdict(can_id, self.sensors_by_can_id.get(can_id), None, None,
+                              timestamp_ms, False, "REJECT", reason)
+                continue
+
+            ring = frame_rings[shard]
+            while not ring.push(can_id, frame, timestamp_ms):
+                # Anneau plein: publier et vider les résultats pour laisser avancer le shard
+                ring.publish()
+                drained = list(self._collect())
+                if drained:
+                    yield from drained
+                else:
+                    self._check_workers()  # Un shard arrêté ne videra jamais son anneau
+                    time.sleep(self.idle_s)
+            self._pending += 1
+            written += 1
+            if written >= chunk:
+                written = 0
+                for ring in frame_rings:
+                    ring.publish()
+                yield from self._collect()
+
+        for ring in frame_rings:
+            ring.publish()
+        while self._pending:
+            drained = list(self._collect())
+            if drained:
+                yield from drained
+            else:
+                self._check_workers()
+                time.sleep(self.idle_s)
+
+    def _collect(self):
+        """Lit les résultats disponibles de tous les shards et alimente le vote"""
+        sensors_by_can_id = self.sensors_by_can_id
+        reason_counts = self.reason_counts
+        submit = self.voting_module.submit
+        limit = self.ring_capacity
+        for shard, ring in enumerate(self._result_rings):
+            records = ring.pop_many(limit)
+            if not records:
+                continue
+            self._pending -= len(records)
+            self.frames_processed += len(records)
+            for can_id, data, sequence, timestamp_ms, reason, code, level, challenge in records:
+                sensor_id = sensors_by_can_id[can_id]
+                action = (f"CHALLENGE:{challenge:08X}" if code == _CHALLENGE
+                          else ACTION_CODES[code])
+                accepted = reason == Verdict.OK
+                if accepted:
+                    submit(sensor_id, data)
+                reason_counts[reason] += 1
+                yield Verdict(can_id, sensor_id, data, sequence, timestamp_ms, accepted,
+                              action, reason)
+            self.shard_levels[shard] = level
+
+    def _check_workers(self):
+        for process in self._processes:
+            if not process.is_alive():
+                raise RuntimeError(f"Shard arrêté (code {process.exitcode})")
+
+    def get_stats(self):
+        """Retourne les compteurs agrégés et le niveau d'escalade par shard"""
+        accepted = self.reason_counts[Verdict.OK]
+        return {
+            'frames_processed': self.frames_processed,
+            'frames_accepted': accepted,
+            'frames_rejected': self.frames_processed - accepted,
+            'rejections_by_reason': {name: count for name, count
+                                     in zip(Verdict.REASON_NAMES, self.reason_counts)
+                                     if name != 'OK'},
+            'workers': self.workers,
+            'sensors_per_shard': [len(sensors) for sensors in self.shard_sensors],
+            'security_levels': list(self.shard_levels),
+            'max_security_level': max(self.shard_levels)
+        }
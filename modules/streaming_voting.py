@@ -0,0 +1,150 @@
+import heapq
+from collections import deque
+
+from modules.order_statistics import SortedReadings
+
+class VotingEpoch:
+    """Fenêtre temporelle de lectures d'un groupe (recyclée via un pool)"""
+
+    __slots__ = ('group_name', 'epoch_id', 'deadline', 'order')
+
+    def __init__(self):
+        self.group_name = None
+        self.epoch_id = None
+        self.deadline = None
+        self.order = SortedReadings()
+
+
+class EpochVoteResult:
+    """Résultat du vote d'une époque"""
+
+    __slots__ = ('group_name', 'epoch_id', 'consensus', 'value', 'details', 'complete')
+
+    def __init__(self, group_name, epoch_id, consensus, value, details, complete):
+        self.group_name = group_name
+        self.epoch_id = epoch_id
+        self.consensus = consensus
+        self.value = value
+        self.details = details
+        self.complete = complete  # True si tous les membres ont répondu avant l'échéance
+
+
+class StreamingVoter:
+    """Vote en flux aligné sur des époques temporelles
+
+    Chaque lecture horodatée est rangée dans l'époque
+    timestamp_ms // epoch_ms de son groupe. Le vote de l'époque est
+    déclenché dès que tous les membres du groupe ont répondu, ou à
+    l'échéance (fin de l'époque + grace_ms). Les lectures arrivant pour
+    une époque déjà votée sont ignorées, de sorte qu'une lecture ancienne
+    n'est jamais mélangée aux nouvelles. Les époques closes retournent
+    dans un pool et sont réutilisées avec leurs tableaux de lectures; seul
+    l'instantané remis au résultat du vote est copié (une fois par vote).
+    """
+
+    def __init__(self, voting, epoch_ms=100, grace_ms=0, callback=None):
+        self.voting = voting
+        self.epoch_ms = epoch_ms
+        self.grace_ms = grace_ms
+        self.callback = callback
+        self.open_epochs = {}  # groupe -> {époque: VotingEpoch}
+        self.closed_epochs = {}  # groupe -> dernière époque votée
+        self._deadlines = []  # tas (échéance, groupe, époque)
+        self._pool = []
+        self._results = deque()
+        self.stats = {
+            'votes_complete': 0,
+            'votes_deadline': 0,
+            'late_readings': 0,
+            'rejected_readings': 0,
+            'epochs_allocated': 0
+        }
+
+    def _acquire_epoch(self, group_name, epoch_id):
+        if self._pool:
+            epoch = self._pool.pop()
+        else:
+            epoch = VotingEpoch()
+            self.stats['epochs_allocated'] += 1
+        epoch.group_name = group_name
+        epoch.epoch_id = epoch_id
+        epoch.deadline = (epoch_id + 1) * self.epoch_ms + self.grace_ms
+        self.open_epochs.setdefault(group_name, {})[epoch_id] = epoch
+        heapq.heappush(self._deadlines, (epoch.deadline, group_name, epoch_id))
+        return epoch
+
+    def _release_epoch(self, epoch):
+        del self.open_epochs[epoch.group_name][epoch.epoch_id]
+        epoch.order.clear()
+        epoch.group_name = None
+        self._pool.append(epoch)
+
+    def submit_reading(self, group_name, sensor_id, value, timestamp_ms):
+        """
+        Soumet une lecture horodatée
+
+        Returns:
+            bool: True si la lecture a été rangée dans une époque ouverte
+        """
+        self.advance(timestamp_ms)
+
+        group = self.voting.voting_groups.get(group_name)
+        if group is None or sensor_id not in group['sensors']:
+            self.stats['rejected_readings'] += 1
+            return False
+
+        epoch_id = int(timestamp_ms // self.epoch_ms)
+        if epoch_id <= self.closed_epochs.get(group_name, -1):
+            self.stats['late_readings'] += 1
+            return False
+
+        epoch = self.open_epochs.get(group_name, {}).get(epoch_id)
+        if epoch is None:
+            epoch = self._acquire_epoch(group_name, epoch_id)
+        epoch.order.update(sensor_id, self.voting.encode_reading(value))
+
+        if len(epoch.order) >= len(group['sensors']):
+            self._close_epoch(epoch, complete=True)
+        return True
+
+    def advance(self, now_ms):
+        """Vote toutes les époques dont l'échéance est dépassée"""
+        deadlines = self._deadlines
+        while deadlines and deadlines[0][0] <= now_ms:
+            _, group_name, epoch_id = heapq.heappop(deadlines)
+            epoch = self.open_epochs.get(group_name, {}).get(epoch_id)
+            if epoch is not None:
+                self._close_epoch(epoch, complete=False)
+
+    def flush(self):
+        """Vote toutes les époques encore ouvertes (fin de flux)"""
+        for group_epochs in list(self.open_epochs.values()):
+            for epoch_id in sorted(group_epochs):
+                if epoch_id in group_epochs:
+                    self._close_epoch(group_epochs[epoch_id], complete=False)
+        self._deadlines.clear()
+
+    def _close_epoch(self, epoch, complete):
+        group_name = epoch.group_name
+        # Les époques plus anciennes encore ouvertes sont votées d'abord (ordre préservé)
+        group_epochs = self.open_epochs[group_name]
+        if len(group_epochs) > 1:
+            for stale_id in sorted(eid for eid in group_epochs if eid < epoch.epoch_id):
+                self._close_epoch(group_epochs[stale_id], complete=False)
+
+        consensus, value, details = self.voting.vote_readings(group_name, epoch.order)
+        result = EpochVoteResult(group_name, epoch.epoch_id, consensus, value, details, complete)
+        self.stats['votes_complete' if complete else 'votes_deadline'] += 1
+        self.closed_epochs[group_name] = epoch.epoch_id
+        self._release_epoch(epoch)
+
+        if self.callback is not None:
+            self.callback(result)
+        else:
+            self._results.append(result)
+
+    def results(self):
+        """Générateur des résultats de vote en attente (sans callback)"""
+        results = self._results
+        while results:
+            yield results.popleft()
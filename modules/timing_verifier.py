@@ -1,11 +1,15 @@
 import time
 
+from modules.event_store import EVENT_TIMING_ANOMALY, to_log_entry
+
 class TimingVerifier:
     """Module de verification des patterns temporels"""
     
-    def __init__(self):
+    def __init__(self, event_store=None):
         self.sensors = {}
         self.anomaly_log = []
+        # Magasin d'événements optionnel (EventStore): remplace anomaly_log
+        self.event_store = event_store
     
     def register_sensor(self, sensor_id, base_interval_ms, unique_delay_ms):
         """
@@ -52,7 +56,10 @@ class TimingVerifier:
         # Detecter anomalie
         is_anomaly = abs(diff) > tolerance_ms
         
-        if is_anomaly:
+        if is_anomaly and self.event_store is not None:
+            self.event_store.log(EVENT_TIMING_ANOMALY, sensor_id, expected_time, current_time_ms,
+                                 aux=min(int(round(tolerance_ms)), 255))
+        elif is_anomaly:
             self.anomaly_log.append({
                 'sensor_id': sensor_id,
                 'expected': expected_time,
@@ -74,7 +81,9 @@ class TimingVerifier:
         return self.sensors[sensor_id]
     
     def get_anomaly_log(self):
-        """Retourne le journal des anomalies"""
+        """Retourne le journal des anomalies (relu du magasin d'événements s'il est attaché)"""
+        if self.event_store is not None:
+            return [to_log_entry(event) for event in self.event_store.events(codes=[EVENT_TIMING_ANOMALY])]
         return self.anomaly_log
     
     def reset_sensor(self, sensor_id):
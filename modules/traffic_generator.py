@@ -0,0 +1,338 @@
+import random
+import sys
+from array import array
+
+from modules.micro_mac import FRAME_STRUCT, MicroMAC
+from modules.voting_matrix import HAS_NUMPY, np
+
+MAC_CACHE_LIMIT = 1 << 16  # Entrées (data, séquence) mémorisées avant remise à zéro
+# Trame MicroMAC en colonnes NumPy: data, séquence, MAC << 8 (gros-boutiste, FRAME_STRUCT)
+FRAME_DTYPE = np.dtype([('data', '>u2'), ('sequence', '>u2'), ('tail', '>u4')]) if HAS_NUMPY else None
+
+# Étiquettes de vérité terrain (une par trame générée)
+LABEL_LEGIT = 0
+LABEL_INJECTION = 1          # Trame forgée sans la clé
+LABEL_REPLAY = 2             # Trame authentique réémise plus tard
+LABEL_TIMING = 3             # Trame authentique décalée dans le temps
+LABEL_FALSIFIED = 4          # Donnée faussée par un ECU compromis (MAC valide)
+LABEL_COMPROMISED_VOTER = 5  # Capteur votant biaisé en permanence (MAC valide)
+
+LABEL_NAMES = ('LEGIT', 'INJECTION', 'REPLAY', 'TIMING', 'FALSIFIED', 'COMPROMISED_VOTER')
+
+ATTACK_LABELS = {
+    'injection': LABEL_INJECTION,
+    'replay': LABEL_REPLAY,
+    'timing': LABEL_TIMING,
+    'falsified': LABEL_FALSIFIED,
+    'compromised_voter': LABEL_COMPROMISED_VOTER
+}
+
+
+class SensorProfile:
+    """Profil d'un capteur simulé (période, gigue, distribution des données)"""
+
+    __slots__ = ('sensor_id', 'can_id', 'base_interval_ms', 'unique_delay_ms', 'jitter_ms',
+                 'jitter_limit_ms', 'value_mean', 'value_std', 'voting_group')
+
+    def __init__(self, sensor_id, can_id, base_interval_ms, unique_delay_ms, jitter_ms=0.3,
+                 jitter_limit_ms=0.9, value_mean=45.0, value_std=1.0, voting_group=None):
+        self.sensor_id = sensor_id
+        self.can_id = can_id
+        self.base_interval_ms = base_interval_ms
+        self.unique_delay_ms = unique_delay_ms
+        self.jitter_ms = jitter_ms
+        self.jitter_limit_ms = jitter_limit_ms  # Gigue bornée: reste sous la tolérance timing
+        self.value_mean = value_mean
+        self.value_std = value_std
+        self.voting_group = voting_group
+
+    @property
+    def period_ms(self):
+        return self.base_interval_ms + self.unique_delay_ms
+
+
+class GeneratedTraffic:
+    """Trafic généré en colonnes (CAN ID, horodatages, trames de 8 octets, étiquettes)"""
+
+    def __init__(self, can_ids, timestamps, payload, labels):
+        self.can_ids = can_ids        # array('I')
+        self.timestamps = timestamps  # array('d'), ms, triés
+        self.payload = payload        # bytearray, 8 octets par trame
+        self.labels = labels          # array('B'), une étiquette par trame
+
+    def __len__(self):
+        return len(self.labels)
+
+    def frames(self):
+        """Itère les trames (can_id, trame, horodatage_ms) dans l'ordre du bus"""
+        payload = self.payload
+        for i, (can_id, timestamp_ms) in enumerate(zip(self.can_ids, self.timestamps)):
+            yield can_id, bytes(payload[i * 8:i * 8 + 8]), timestamp_ms
+
+    def records(self):
+        """Enregistrements (horodatage_ms, can_id, données) pour write_capture"""
+        for can_id, frame, timestamp_ms in self.frames():
+            yield timestamp_ms, can_id, frame
+
+    def label_counts(self):
+        counts = [0] * len(LABEL_NAMES)
+        for label in self.labels:
+            counts[label] += 1
+        return dict(zip(LABEL_NAMES, counts))
+
+
+class TrafficGenerator:
+    """Générateur déterministe de trafic CAN signé et d'attaques étiquetées
+
+    Une graine donnée produit toujours le même trafic dans un
+    environnement donné (les tirages passent par NumPy quand il est
+    disponible, par random.Random sinon). Les horodatages et valeurs sont
+    générés en colonnes, et les trames écrites en colonnes au format de
+    MicroMAC.create_can_frame dans un tampon contigu. Le Micro-MAC (SHA-256
+    de hashlib, scalaire) reste calculé une fois par clé (data, séquence)
+    distincte: c'est le coût dominant de l'encodage.
+    """
+
+    def __init__(self, sensors, seed=0, key=0xABC123, attacker_key=0xDEADBEEF, use_numpy=None):
+        self.sensors = list(sensors)
+        self.seed = seed
+        self.mac = MicroMAC(key=key)
+        self.attacker_mac = MicroMAC(key=attacker_key)
+        self.use_numpy = HAS_NUMPY if use_numpy is None else use_numpy and HAS_NUMPY
+        self.attacks = []
+        self._mac_cache = {}
+
+    def add_attack(self, kind, sensor_id, start_ms, count=10, span_ms=1000, bias=50, offset_ms=10):
+        """
+        Programme une attaque sur un capteur
+
+        Args:
+            kind: 'injection', 'replay', 'timing', 'falsified' ou 'compromised_voter'
+            start_ms: début de l'attaque (depuis le début du trafic)
+            count: nombre de trames concernées (ignoré pour compromised_voter)
+            span_ms: fenêtre des trames injectées ou réémises
+            bias: écart ajouté aux données (falsified, compromised_voter)
+            offset_ms: décalage temporel (timing)
+        """
+        if kind not in ATTACK_LABELS:
+            raise ValueError(f"Attaque inconnue: {kind}")
+        if not any(profile.sensor_id == sensor_id for profile in self.sensors):
+            raise ValueError(f"Capteur inconnu: {sensor_id}")
+        self.attacks.append({'kind': kind, 'sensor_id': sensor_id, 'start_ms': start_ms,
+                             'count': count, 'span_ms': span_ms, 'bias': bias,
+                             'offset_ms': offset_ms})
+        return self
+
+    def register(self, pipeline):
+        """Enregistre la population de capteurs dans un pipeline TAP"""
+        for profile in self.sensors:
+            pipeline.register_sensor(profile.sensor_id, profile.can_id, profile.base_interval_ms,
+                                     profile.unique_delay_ms, profile.voting_group)
+
+    # --- Tirages (NumPy ou pur Python) ---
+
+    def _sensor_columns(self, rng, profile, duration_ms, base_time_ms):
+        """Horodatages et valeurs légitimes d'un capteur"""
+        period = profile.period_ms
+        n = max(int(duration_ms // period), 0)
+        phase = base_time_ms + rng_uniform(rng, 0, period)
+        limit = profile.jitter_limit_ms
+        if self.use_numpy:
+            jitter = np.clip(rng.normal(0.0, profile.jitter_ms, n), -limit, limit)
+            timestamps = (phase + np.arange(n) * period + jitter).tolist()
+            values = np.clip(np.rint(rng.normal(profile.value_mean, profile.value_std, n)),
+                             0, 0xFFFF).astype(int).tolist()
+        else:
+            timestamps = [phase + i * period + max(-limit, min(limit, rng.gauss(0.0, profile.jitter_ms)))
+                          for i in range(n)]
+            values = [max(0, min(0xFFFF, round(rng.gauss(profile.value_mean, profile.value_std))))
+                      for _ in range(n)]
+        return timestamps, values
+
+    def generate(self, duration_ms, base_time_ms=1000.0):
+        """
+        Génère duration_ms de trafic pour toute la population
+
+        Returns:
+            GeneratedTraffic: trames triées par horodatage avec leurs étiquettes
+        """
+        rng = np.random.default_rng(self.seed) if self.use_numpy else random.Random(self.seed)
+        # Colonnes compactes, une entrée par trame (ordre de génération)
+        columns = {
+            'timestamps': array('d'), 'can_ids': array('I'), 'data': array('H'),
+            'sequences': array('H'), 'forged': bytearray(), 'labels': bytearray()
+        }
+        ranges = {}
+        for profile in self.sensors:
+            timestamps, values = self._sensor_columns(rng, profile, duration_ms, base_time_ms)
+            n = len(timestamps)
+            lo = len(columns['labels'])
+            columns['timestamps'].extend(timestamps)
+            columns['can_ids'].extend([profile.can_id] * n)
+            columns['data'].extend(values)
+            columns['sequences'].extend((i + 1) & 0xFFFF for i in range(n))
+            columns['forged'].extend(bytes(n))
+            columns['labels'].extend(bytes(n))
+            ranges[profile.sensor_id] = (profile, lo, lo + n)
+
+        for attack in self.attacks:
+            self._apply_attack(rng, attack, columns, *ranges[attack['sensor_id']], base_time_ms)
+
+        return self._encode(columns)
+
+    @staticmethod
+    def _append(columns, timestamp_ms, can_id, data, sequence, forged, label):
+        columns['timestamps'].append(timestamp_ms)
+        columns['can_ids'].append(can_id)
+        columns['data'].append(data)
+        columns['sequences'].append(sequence)
+        columns['forged'].append(forged)
+        columns['labels'].append(label)
+
+    def _apply_attack(self, rng, attack, columns, profile, lo, hi, base_time_ms):
+        """Modifie les trames légitimes du capteur ou ajoute les trames d'attaque"""
+        kind = attack['kind']
+        label = ATTACK_LABELS[kind]
+        start = base_time_ms + attack['start_ms']
+        count = attack['count']
+        span = attack['span_ms']
+        timestamps = columns['timestamps']
+        labels = columns['labels']
+
+        if kind == 'injection':
+            for _ in range(count):
+                self._append(columns, start + rng_uniform(rng, 0, span), profile.can_id,
+                             rng_integer(rng, 0xFFFF), rng_integer(rng, 0xFFFF), 1, label)
+            return
+        if kind == 'replay':
+            captured = [i for i in range(lo, hi) if timestamps[i] < start and labels[i] == LABEL_LEGIT]
+            for _ in range(count if captured else 0):
+                i = captured[rng_integer(rng, len(captured) - 1)]
+                self._append(columns, start + rng_uniform(rng, 0, span), profile.can_id,
+                             columns['data'][i], columns['sequences'][i], 0, label)
+            return
+
+        targets = [i for i in range(lo, hi) if timestamps[i] >= start and labels[i] == LABEL_LEGIT]
+        if kind != 'compromised_voter':  # Biais permanent à partir de start sinon
+            targets = targets[:count]
+        data = columns['data']
+        for i in targets:
+            if kind == 'timing':
+                timestamps[i] += attack['offset_ms']
+            else:
+                data[i] = min(0xFFFF, data[i] + attack['bias'])
+            labels[i] = label
+
+    def _encode(self, columns):
+        """Trie par horodatage et écrit les trames au format MicroMAC (tampon contigu, en colonnes)"""
+        timestamps = columns['timestamps']
+        codes = self._mac_column(columns)
+        if self.use_numpy:
+            order = np.argsort(np.frombuffer(timestamps, dtype=np.float64), kind='stable')
+            frames = np.empty(len(order), dtype=FRAME_DTYPE)
+            frames['data'] = np.frombuffer(columns['data'], dtype=np.uint16)[order]
+            frames['sequence'] = np.frombuffer(columns['sequences'], dtype=np.uint16)[order]
+            frames['tail'] = codes[order].astype(np.uint32) << 8
+            return GeneratedTraffic(array('I', np.frombuffer(columns['can_ids'], dtype=np.uint32)[order]
+                                          .tobytes()),
+                                    array('d', np.frombuffer(timestamps, dtype=np.float64)[order]
+                                          .tobytes()),
+                                    bytearray(frames.tobytes()),
+                                    array('B', np.frombuffer(columns['labels'], dtype=np.uint8)[order]
+                                          .tobytes()))
+
+        order = sorted(range(len(timestamps)), key=timestamps.__getitem__)
+        data, sequences = columns['data'], columns['sequences']
+        payload = pack_frames(array('H', [data[i] for i in order]),
+                              array('H', [sequences[i] for i in order]),
+                              array('I', [codes[i] << 8 for i in order]))
+        can_ids = columns['can_ids']
+        labels = columns['labels']
+        return GeneratedTraffic(array('I', [can_ids[i] for i in order]),
+                                array('d', [timestamps[i] for i in order]),
+                                payload,
+                                array('B', [labels[i] for i in order]))
+
+    def _mac_column(self, columns):
+        """
+        Micro-MAC de chaque trame (ordre de génération)
+
+        Avec NumPy, un seul calcul par clé (forgée, data, séquence)
+        distincte (np.unique), redistribué aux trames; sinon un calcul par
+        trame, les MAC légitimes passant par le cache borné.
+        """
+        data, sequences, forged = columns['data'], columns['sequences'], columns['forged']
+        mac = self._cached_mac
+        forge = self.attacker_mac.calculate_micro_mac
+        if not self.use_numpy:
+            return [forge(data[i], sequences[i]) if forged[i] else mac(data[i], sequences[i])
+                    for i in range(len(data))]
+        keys = ((np.frombuffer(forged, dtype=np.uint8).astype(np.uint64) << 32)
+                | (np.frombuffer(data, dtype=np.uint16).astype(np.uint64) << 16)
+                | np.frombuffer(sequences, dtype=np.uint16))
+        distinct, inverse = np.unique(keys, return_inverse=True)
+        codes = np.fromiter(((forge if key >> 32 else mac)((key >> 16) & 0xFFFF, key & 0xFFFF)
+                             for key in distinct.tolist()), dtype=np.uint32, count=len(distinct))
+        return codes[inverse.reshape(-1)]
+
+    def _cached_mac(self, data, sequence):
+        key = (data << 16) | sequence
+        cache = self._mac_cache
+        code = cache.get(key)
+        if code is None:
+            if len(cache) >= MAC_CACHE_LIMIT:
+                cache.clear()  # Mémoire bornée: les capteurs d'un même cycle partagent la séquence
+            code = cache[key] = self.mac.calculate_micro_mac(data, sequence)
+        return code
+
+
+def pack_frames(data, sequences, tails):
+    """
+    Tampon de trames MicroMAC depuis trois colonnes (sans boucle par trame)
+
+    Args:
+        data, sequences: array('H'); tails: array('I') (MAC << 8)
+
+    Returns:
+        bytearray: 8 octets gros-boutistes par trame (FRAME_STRUCT)
+    """
+    if sys.byteorder == 'little':
+        for column in (data, sequences, tails):
+            column.byteswap()
+    payload = bytearray(8 * len(data))
+    for offset, column in ((0, data), (2, sequences), (4, tails)):
+        raw = column.tobytes()
+        width = column.itemsize
+        for byte in range(width):
+            payload[offset + byte::8] = raw[byte::width]
+    return payload
+
+
+def rng_uniform(rng, low, high):
+    return float(rng.uniform(low, high))
+
+
+def rng_integer(rng, high):
+    """Entier uniforme dans [0, high] (NumPy ou random.Random)"""
+    if isinstance(rng, random.Random):
+        return rng.randint(0, high)
+    return int(rng.integers(0, high + 1))
+
+
+def evaluate_detection(verdicts, labels):
+    """
+    Taux de rejet par étiquette (détection pour les attaques, faux positifs pour LEGIT)
+
+    Args:
+        verdicts: verdicts dans l'ordre des trames générées
+        labels: étiquettes de GeneratedTraffic
+    """
+    frames = [0] * len(LABEL_NAMES)
+    rejected = [0] * len(LABEL_NAMES)
+    for verdict, label in zip(verdicts, labels):
+        frames[label] += 1
+        if not verdict.accepted:
+            rejected[label] += 1
+    return {name: {'frames': frames[i], 'rejected': rejected[i],
+                   'rejection_rate': rejected[i] / frames[i] if frames[i] else None}
+            for i, name in enumerate(LABEL_NAMES)}
@@ -0,0 +1,172 @@
+import math
+from array import array
+
+from modules.sensor_voting import GroupVoting
+from modules.voting_matrix import HAS_NUMPY, np
+
+class VectorSensorVoting(GroupVoting):
+    """Vote collaboratif sur des lectures vectorielles (IMU, vitesses de roues...)
+
+    Les lectures d'un groupe sont stockées dans un tableau contigu de
+    flottants (une ligne de `dimensions` composantes par capteur). La
+    référence est la médiane composante par composante (ou la médiane
+    géométrique), et la cohérence se juge sur la distance euclidienne à
+    cette référence: une usurpation incohérente entre axes est détectée
+    même si chaque axe pris seul reste dans la tolérance. Groupes,
+    compteurs et statistiques sont ceux de GroupVoting (comme SensorVoting).
+    """
+
+    MEDIAN_COORDINATE = 'coordinate'
+    MEDIAN_GEOMETRIC = 'geometric'
+
+    def __init__(self, threshold=3, tolerance=5, median_mode=MEDIAN_COORDINATE):
+        super().__init__(threshold, tolerance)  # tolerance: distance maximale à la référence
+        self.median_mode = median_mode
+
+    def register_voting_group(self, group_name, sensor_ids, dimensions=3):
+        """Enregistre un groupe de capteurs vectoriels redondants"""
+        self.voting_groups[group_name] = self._new_group(
+            {sensor_id: i for i, sensor_id in enumerate(sensor_ids)},
+            dimensions=dimensions,
+            data=array('d', bytes(8 * dimensions * len(sensor_ids))),
+            present=bytearray(len(sensor_ids)))
+
+    def submit_reading(self, group_name, sensor_id, vector):
+        """Soumet une lecture vectorielle (séquence de `dimensions` composantes)"""
+        group = self.voting_groups.get(group_name)
+        if group is None:
+            return False
+        slot = group['sensors'].get(sensor_id)
+        dimensions = group['dimensions']
+        if slot is None or len(vector) != dimensions:
+            return False
+        start = slot * dimensions
+        group['data'][start:start + dimensions] = array('d', vector)
+        group['present'][slot] = 1
+        return True
+
+    def verify_voting(self, group_name):
+        """
+        Verifie le consensus vectoriel du groupe
+
+        Returns:
+            tuple: (consensus_atteint, vecteur_consensuel, details)
+        """
+        if group_name not in self.voting_groups:
+            return False, None, "Groupe inexistant"
+
+        group = self.voting_groups[group_name]
+        group['total_votes'] += 1
+
+        present = group['present']
+        count = sum(present)
+        if count < self.threshold:
+            return False, None, f"Lectures insuffisantes ({count}/{self.threshold})"
+
+        sensor_ids = [sid for sid, slot in group['sensors'].items() if present[slot]]
+        if HAS_NUMPY:
+            median, distances, mean = self._evaluate_numpy(group)
+        else:
+            median, distances, mean = self._evaluate_python(group)
+
+        consistent_sensors = [sid for sid, d in zip(sensor_ids, distances) if d <= self.tolerance]
+        aberrant_sensors = [sid for sid, d in zip(sensor_ids, distances) if d > self.tolerance]
+        consensus = len(consistent_sensors) >= self.threshold
+        self._count_outcome(group, consensus)
+
+        details = {
+            'consistent_sensors': consistent_sensors,
+            'aberrant_sensors': aberrant_sensors,
+            'consistent_readings': len(consistent_sensors),
+            'total_readings': count,
+            'median_reference': median,
+            'distances': dict(zip(sensor_ids, distances))
+        }
+        if consensus:
+            details['consensus_value'] = mean
+            return True, mean, details
+
+        details['required_threshold'] = self.threshold
+        details['reason'] = (f"Consensus impossible: {len(consistent_sensors)}/{self.threshold} "
+                             f"lectures cohérentes")
+        return False, None, details
+
+    def _evaluate_numpy(self, group):
+        """Médiane, distances et moyenne cohérente en opérations vectorisées"""
+        dimensions = group['dimensions']
+        matrix = np.frombuffer(group['data'], dtype=np.float64).reshape(-1, dimensions)
+        readings = matrix[np.frombuffer(group['present'], dtype=np.uint8).astype(bool)]
+        if self.median_mode == self.MEDIAN_GEOMETRIC:
+            median = _geometric_median_numpy(readings)
+        else:
+            median = np.median(readings, axis=0)
+        distances = np.sqrt(((readings - median) ** 2).sum(axis=1))
+        consistent = distances <= self.tolerance
+        mean = tuple(readings[consistent].mean(axis=0).tolist()) if consistent.any() else None
+        return tuple(median.tolist()), distances.tolist(), mean
+
+    def _evaluate_python(self, group):
+        """Repli pur Python de _evaluate_numpy"""
+        dimensions = group['dimensions']
+        data = group['data']
+        present = group['present']
+        readings = [tuple(data[slot * dimensions:(slot + 1) * dimensions])
+                    for slot in range(len(present)) if present[slot]]
+        if self.median_mode == self.MEDIAN_GEOMETRIC:
+            median = _geometric_median_python(readings)
+        else:
+            median = tuple(_median(axis) for axis in zip(*readings))
+        distances = [math.dist(reading, median) for reading in readings]
+        consistent = [r for r, d in zip(readings, distances) if d <= self.tolerance]
+        mean = tuple(sum(axis) / len(consistent) for axis in zip(*consistent)) if consistent else None
+        return median, distances, mean
+
+    def _clear_readings(self, group_name, group):
+        present = group['present']
+        present[:] = bytes(len(present))
+
+    def _extra_group_stats(self, group):
+        return {'dimensions': group['dimensions']}
+
+
+def _median(values):
+    """Médiane d'une séquence de scalaires"""
+    ordered = sorted(values)
+    n = len(ordered)
+    if n % 2 == 1:
+        return ordered[n // 2]
+    return (ordered[n // 2 - 1] + ordered[n // 2]) / 2
+
+
+def _geometric_median_python(points, iterations=50, epsilon=1e-9):
+    """Médiane géométrique (algorithme de Weiszfeld)"""
+    estimate = tuple(_median(axis) for axis in zip(*points))
+    for _ in range(iterations):
+        weights = []
+        for point in points:
+            distance = math.dist(point, estimate)
+            if distance < epsilon:
+                return estimate
+            weights.append(1.0 / distance)
+        total = sum(weights)
+        updated = tuple(sum(w * p[k] for w, p in zip(weights, points)) / total
+                        for k in range(len(estimate)))
+        if math.dist(updated, estimate) < epsilon:
+            return updated
+        estimate = updated
+    return estimate
+
+
+def _geometric_median_numpy(points, iterations=50, epsilon=1e-9):
+    """Médiane géométrique vectorisée (algorithme de Weiszfeld)"""
+    estimate = np.median(points, axis=0)
+    for _ in range(iterations):
+        distances = np.sqrt(((points - estimate) ** 2).sum(axis=1))
+        if (distances < epsilon).any():
+            return estimate
+        weights = 1.0 / distances
+        updated = (points * weights[:, None]).sum(axis=0) / weights.sum()
+        if np.sqrt(((updated - estimate) ** 2).sum()) < epsilon:
+            return updated
+        estimate = updated
+    return estimate
@@ -0,0 +1,271 @@
+try:
+    import numpy as np
+except ImportError:  # NumPy est optionnel: repli en pur Python
+    np = None
+
+HAS_NUMPY = np is not None
+
+
+def c_div(numerator, denominator):
+    """Division entière tronquée vers zéro (sémantique C)"""
+    quotient = abs(numerator) // abs(denominator)
+    return quotient if (numerator >= 0) == (denominator > 0) else -quotient
+
+
+class ReadingsMatrix:
+    """Matrice de lectures (groupes x capteurs) avec masque de validité
+
+    Chaque groupe occupe une ligne, chaque capteur une colonne de sa ligne.
+    Les cases vides valent NaN et sont exclues par le masque, ce qui permet
+    d'évaluer tous les groupes en quelques opérations NumPy vectorisées.
+    """
+
+    def __init__(self, group_capacity=16, sensor_capacity=8):
+        if np is None:
+            raise ImportError("NumPy est requis pour ReadingsMatrix")
+        self.data = np.full((group_capacity, sensor_capacity), np.nan)
+        self.valid = np.zeros((group_capacity, sensor_capacity), dtype=bool)
+        self.rows = {}
+        self.group_names = []
+        self.columns = []  # Par ligne: capteur -> colonne
+        self.column_ids = []  # Par ligne: colonne -> capteur
+
+    def _grow(self, groups, sensors):
+        """Agrandit la matrice (doublement) pour contenir groups x sensors"""
+        rows, cols = self.data.shape
+        if groups <= rows and sensors <= cols:
+            return
+        new_rows = rows
+        while new_rows < groups:
+            new_rows *= 2
+        new_cols = cols
+        while new_cols < sensors:
+            new_cols *= 2
+        data = np.full((new_rows, new_cols), np.nan)
+        valid = np.zeros((new_rows, new_cols), dtype=bool)
+        data[:rows, :cols] = self.data
+        valid[:rows, :cols] = self.valid
+        self.data = data
+        self.valid = valid
+
+    def add_group(self, group_name):
+        """Réserve une ligne pour un groupe (ou la vide s'il existe déjà)"""
+        row = self.rows.get(group_name)
+        if row is not None:
+            self.clear_group(group_name)
+            self.columns[row].clear()
+            self.column_ids[row].clear()
+            return row
+        row = len(self.group_names)
+        self._grow(row + 1, 1)
+        self.rows[group_name] = row
+        self.group_names.append(group_name)
+        self.columns.append({})
+        self.column_ids.append([])
+        return row
+
+    def set(self, group_name, sensor_id, value):
+        """Écrit la lecture d'un capteur (colonne allouée à la demande)"""
+        row = self.rows[group_name]
+        columns = self.columns[row]
+        col = columns.get(sensor_id)
+        if col is None:
+            col = len(columns)
+            self._grow(row + 1, col + 1)
+            columns[sensor_id] = col
+            self.column_ids[row].append(sensor_id)
+        self.data[row, col] = value
+        self.valid[row, col] = True
+
+    def clear_group(self, group_name):
+        """Invalide toutes les lectures d'un groupe"""
+        row = self.rows[group_name]
+        self.data[row] = np.nan
+        self.valid[row] = False
+
+    def evaluate(self, threshold, tolerance, scale=None):
+        """
+        Évalue le consensus de tous les groupes en une passe vectorisée
+
+        Args:
+            scale: virgule fixe (2**bits): lectures et tolérance en entiers
+                Q, médiane et moyenne tronquées vers zéro comme sur le nœud,
+                puis décodées (divisées par scale) dans le résultat
+
+        Returns:
+            BatchVoteResult: Résultats par groupe sous forme de tableaux
+        """
+        n_groups = len(self.group_names)
+        data = self.data[:n_groups]
+        valid = self.valid[:n_groups]
+
+        counts = valid.sum(axis=1)
+        # np.sort place les NaN en fin de ligne: les lectures valides sont en tête
+        ordered = np.sort(data, axis=1)
+        low = np.maximum(counts - 1, 0) // 2
+        high = np.minimum(counts // 2, ordered.shape[1] - 1)
+        medians = (np.take_along_axis(ordered, low[:, None], axis=1)[:, 0]
+                   + np.take_along_axis(ordered, high[:, None], axis=1)[:, 0]) / 2
+        medians[counts == 0] = np.nan
+        if scale is not None:
+            medians = np.trunc(medians)
+
+        with np.errstate(invalid='ignore'):
+            consistent = valid & (np.abs(data - medians[:, None]) <= tolerance)
+        consistent_counts = consistent.sum(axis=1)
+        sums = np.where(consistent, data, 0.0).sum(axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = np.where(consistent_counts > 0, sums / np.maximum(consistent_counts, 1), np.nan)
+        if scale is not None:
+            medians = medians / scale
+            means = np.trunc(means) / scale
+        consensus = (counts >= threshold) & (consistent_counts >= threshold)
+        consensus_values = np.where(consensus, means, np.nan)
+
+        return BatchVoteResult(list(self.group_names), counts, medians, valid, consistent,
+                               consistent_counts, consensus, consensus_values, means,
+                               [list(ids) for ids in self.column_ids], threshold,
+                               data.copy(), scale)
+
+
+class BatchVoteResult:
+    """Résultats d'un vote groupé (tableaux indexés par groupe)
+
+    Les attributs sont des tableaux NumPy (ou des listes en pur Python);
+    group(nom) en donne une vue dictionnaire aux clés identiques à celles
+    des détails de SensorVoting.verify_voting. readings conserve les
+    lectures du vote (entiers Q en virgule fixe, décodés par group()).
+    """
+
+    def __init__(self, group_names, reading_counts, medians, valid_mask, consistent_mask,
+                 consistent_counts, consensus, consensus_values, consistent_means,
+                 column_ids, threshold, readings, scale=None):
+        self.group_names = group_names
+        self.index = {name: i for i, name in enumerate(group_names)}
+        self.reading_counts = reading_counts
+        self.medians = medians
+        self.valid_mask = valid_mask
+        self.consistent_mask = consistent_mask
+        self.consistent_counts = consistent_counts
+        self.consensus = consensus
+        self.consensus_values = consensus_values
+        self.consistent_means = consistent_means
+        self.column_ids = column_ids
+        self.threshold = threshold
+        self.readings = readings
+        self.scale = scale
+
+    def __len__(self):
+        return len(self.group_names)
+
+    def __getitem__(self, group_name):
+        return self.group(group_name)
+
+    def group(self, group_name):
+        """
+        Vue dictionnaire des résultats d'un groupe
+
+        Le consensus du groupe est consensus[index[nom]], comme le premier
+        élément du tuple de verify_voting. Avec moins de threshold lectures,
+        verify_voting renvoie un simple message: la vue garde ici les clés
+        d'un échec, message compris dans 'reason'.
+
+        Returns:
+            dict: Mêmes clés que les détails de verify_voting
+        """
+        i = self.index[group_name]
+        ids = self.column_ids[i]
+        valid = self.valid_mask[i]
+        consistent = self.consistent_mask[i]
+        count = int(self.reading_counts[i])
+        consensus = bool(self.consensus[i])
+        consistent_count = int(self.consistent_counts[i])
+        consistent_sensors = [sid for col, sid in enumerate(ids) if consistent[col]]
+        aberrant_sensors = [sid for col, sid in enumerate(ids) if valid[col] and not consistent[col]]
+        median = float(self.medians[i]) if count else None
+        mean = float(self.consistent_means[i]) if consistent_count else None
+        details = {
+            'consistent_sensors': consistent_sensors,
+            'aberrant_sensors': aberrant_sensors,
+            'consistent_readings': consistent_count,
+        }
+        if consensus:
+            details['total_readings'] = count
+            details['consensus_value'] = mean
+        else:
+            details['required_threshold'] = self.threshold
+            if consistent_count > 0:
+                details['partial_value'] = mean
+        details['median_reference'] = median
+        readings = self.readings[i]
+        scale = self.scale
+        if scale is None:
+            details['all_readings'] = {sid: float(readings[col])
+                                       for col, sid in enumerate(ids) if valid[col]}
+        else:
+            details['all_readings'] = {sid: readings[col] / scale
+                                       for col, sid in enumerate(ids) if valid[col]}
+            # Médiane et moyenne décodées d'entiers Q (scale = 2**bits): re-multiplication exacte
+            details['fixed_point'] = {'scale': scale,
+                                      'median_q': int(median * scale) if median is not None else None,
+                                      'value_q': int(mean * scale) if mean is not None else None}
+        if not consensus:
+            if count < self.threshold:
+                details['reason'] = f"Lectures insuffisantes ({count}/{self.threshold})"
+            elif consistent_count > 0:
+                details['reason'] = (f"Consensus impossible: {consistent_count}/{self.threshold} "
+                                     f"lectures cohérentes")
+            else:
+                details['reason'] = "Aucune lecture cohérente détectée"
+        return details
+
+
+def evaluate_sorted_groups(groups, threshold, tolerance, scale=None):
+    """
+    Repli pur Python de ReadingsMatrix.evaluate
+
+    Args:
+        groups: liste de (nom, SortedReadings)
+        scale: virgule fixe, comme ReadingsMatrix.evaluate
+
+    Returns:
+        BatchVoteResult: Résultats avec des listes au lieu de tableaux
+    """
+    names, counts, medians, valid_mask, consistent_mask = [], [], [], [], []
+    consistent_counts, consensus, consensus_values, means, column_ids = [], [], [], [], []
+    readings = []
+    nan = float('nan')
+    for group_name, order in groups:
+        n = len(order)
+        values = order.values
+        if not n:
+            median = nan
+        elif scale is None:
+            median = order.median()
+        else:
+            median = values[n // 2] if n % 2 else c_div(values[n // 2 - 1] + values[n // 2], 2)
+        if n:
+            lo, hi = order.partition(median, tolerance)
+        else:
+            lo = hi = 0
+        k = hi - lo
+        if scale is None:
+            mean = sum(values[lo:hi]) / k if k else nan
+        else:
+            mean = c_div(sum(values[lo:hi]), k) / scale if k else nan
+            median = median / scale
+        ok = n >= threshold and k >= threshold
+        names.append(group_name)
+        counts.append(n)
+        medians.append(median)
+        column_ids.append(list(order.ids))
+        readings.append(list(values))
+        valid_mask.append([True] * n)
+        consistent_mask.append([lo <= j < hi for j in range(n)])
+        consistent_counts.append(k)
+        consensus.append(ok)
+        means.append(mean)
+        consensus_values.append(mean if ok else nan)
+    return BatchVoteResult(names, counts, medians, valid_mask, consistent_mask,
+                           consistent_counts, consensus, consensus_values, means,
+                           column_ids, threshold, readings, scale)
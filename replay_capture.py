@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Rejeu d'une capture CAN (candump, Vector ASC ou binaire .tapcap) dans le pipeline TAP
+"""
+
+import sys
+import os
+import json
+import time
+import argparse
+
+# Ajouter le chemin des modules
+sys.path.append(os.path.join(os.path.dirname(__file__)))
+
+from modules.pipeline import TAPPipeline
+from modules.capture_replay import open_capture, replay
+
+def parse_sensor(spec):
+    """NOM:CANID:PERIODE_MS:DELAI_MS[:GROUPE] (CAN ID en hexadécimal)"""
+    parts = spec.split(':')
+    if len(parts) not in (4, 5):
+        raise argparse.ArgumentTypeError(f"Capteur invalide: {spec}")
+    name, can_id, base_interval, delay = parts[:4]
+    return (name, int(can_id, 16), float(base_interval), float(delay),
+            parts[4] if len(parts) == 5 else None)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rejeu d'une capture CAN dans le pipeline TAP")
+    parser.add_argument("capture", help="Fichier candump (-L), Vector ASC ou .tapcap")
+    parser.add_argument("--format", choices=("candump", "asc", "binary"),
+                        help="Format (déduit de l'extension par défaut)")
+    parser.add_argument("--sensor", action="append", type=parse_sensor, default=[],
+                        help="Capteur NOM:CANID:PERIODE_MS:DELAI_MS[:GROUPE] (répétable)")
+    parser.add_argument("--key", type=lambda value: int(value, 0), default=0xABC123,
+                        help="Clé Micro-MAC")
+    parser.add_argument("--speed", type=float,
+                        help="Rejeu cadencé sur les horodatages (1.0 = temps réel)")
+    parser.add_argument("--batch-size", type=int, help="Micro-lots (rejeu rapide)")
+    parser.add_argument("--no-cache", action="store_true", help="Ne pas écrire le cache binaire")
+    args = parser.parse_args(argv)
+
+    pipeline = TAPPipeline(key=args.key)
+    for name, can_id, base_interval, delay, group in args.sensor:
+        pipeline.register_sensor(name, can_id, base_interval, delay, group)
+
+    records = open_capture(args.capture, args.format, cache=not args.no_cache)
+    start = time.perf_counter()
+    frames = 0
+    for _ in replay(pipeline, records, speed=args.speed, batch_size=args.batch_size):
+        frames += 1
+    elapsed = time.perf_counter() - start
+
+    stats = pipeline.get_stats()
+    stats['elapsed_s'] = round(elapsed, 3)
+    stats['frames_per_second'] = round(frames / elapsed) if elapsed > 0 else None
+    print(json.dumps(stats, indent=2, ensure_ascii=False))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -10,8 +10,8 @@ import time
 # Ajouter le chemin des modules
 sys.path.append(os.path.join(os.path.dirname(__file__)))
 
-def run_test_suite():
-    """Exécute toute la suite de tests"""
+def run_test_suite(profiler=None):
+    """Exécute toute la suite de tests (chaque suite dans sa portée si profilée)"""
     
     print("🚀 LANCEMENT DE LA SUITE COMPLÈTE DE TESTS TAP")
     print("=" * 70)
@@ -25,6 +25,14 @@ def run_test_suite():
         ("Timing Verification", "tests.test_timing", "test_timing_verification_complet"),
         ("Security Escalation", "tests.test_escalation", "test_security_escalation_complet"),
         ("Sensor Voting", "tests.test_voting", "test_sensor_voting_complet"),
+        ("Pipeline TAP", "tests.test_pipeline", "test_pipeline_complet"),
+        ("Ingestion Asyncio", "tests.test_ingestion", "test_ingestion_complet"),
+        ("Rejeu de Captures", "tests.test_replay", "test_replay_complet"),
+        ("Générateur de Trafic", "tests.test_traffic_generator", "test_traffic_generator_complet"),
+        ("Métriques Prometheus", "tests.test_metrics", "test_metrics_complet"),
+        ("Rapport Mémoire", "tests.test_memory_report", "test_memory_report_complet"),
+        ("Profilage", "tests.test_profiling", "test_profiling_complet"),
+        ("Magasin d'Événements", "tests.test_event_store", "test_event_store_complet"),
         ("Intégration Complète", "tests.test_integration", "test_integration_complete")
     ]
     
@@ -39,7 +47,11 @@ def run_test_suite():
             test_function = getattr(module, function_name)
             
             # Exécution du test
-            test_success = test_function()
+            if profiler is not None:
+                with profiler.scope(test_name):
+                    test_success = test_function()
+            else:
+                test_success = test_function()
             tests_results[test_name] = test_success
             
             if test_success:
@@ -96,6 +108,14 @@ def test_individual_module(module_name):
         "timing": ("tests.test_timing", "test_timing_verification_complet"),
         "escalation": ("tests.test_escalation", "test_security_escalation_complet"),
         "voting": ("tests.test_voting", "test_sensor_voting_complet"),
+        "pipeline": ("tests.test_pipeline", "test_pipeline_complet"),
+        "ingestion": ("tests.test_ingestion", "test_ingestion_complet"),
+        "replay": ("tests.test_replay", "test_replay_complet"),
+        "traffic": ("tests.test_traffic_generator", "test_traffic_generator_complet"),
+        "metrics": ("tests.test_metrics", "test_metrics_complet"),
+        "memory": ("tests.test_memory_report", "test_memory_report_complet"),
+        "profiling": ("tests.test_profiling", "test_profiling_complet"),
+        "events": ("tests.test_event_store", "test_event_store_complet"),
         "integration": ("tests.test_integration", "test_integration_complete")
     }
     
@@ -106,23 +126,67 @@ def test_individual_module(module_name):
         return test_function()
     else:
         print(f"Module inconnu: {module_name}")
-        print("Modules disponibles: mac, timing, escalation, voting, integration")
+        print("Modules disponibles: mac, timing, escalation, voting, pipeline, ingestion, replay, traffic, metrics, memory, profiling, events, integration")
         return False
 
+def run_benchmarks(quick=False, output=None, baseline=None, threshold=None):
+    """Exécute la suite de benchmarks et la compare à la référence enregistrée"""
+    from benchmarks import bench_suite
+    
+    suite = bench_suite.run_suite(quick=quick)
+    return bench_suite.report(
+        suite,
+        baseline_path=baseline or bench_suite.BASELINE_PATH,
+        threshold=bench_suite.DEFAULT_THRESHOLD if threshold is None else threshold,
+        output=output
+    )
+
+def run_profiled(action, name, mode="both", directory="profiles", top=5):
+    """Exécute action() sous profilage, affiche les fonctions chaudes et écrit les profils"""
+    from modules.profiling import PipelineProfiler
+    
+    profiler = PipelineProfiler(mode=mode)
+    with profiler:
+        success = action(profiler)
+    profiler.print_report(top)
+    for kind, path in profiler.write(directory, name).items():
+        print(f"   📁 {kind}: {path}")
+    return success
+
 if __name__ == "__main__":
     import argparse
     
     parser = argparse.ArgumentParser(description="Lanceur de tests du système TAP")
     parser.add_argument("--module", "-m", help="Tester un module spécifique")
     parser.add_argument("--all", "-a", action="store_true", help="Tester tous les modules")
+    parser.add_argument("--bench", action="store_true",
+                        help="Exécuter la suite de benchmarks (comparée à benchmarks/baseline.json)")
+    parser.add_argument("--quick", action="store_true", help="Benchmarks réduits")
+    parser.add_argument("--bench-output", help="Fichier JSON des résultats de benchmark")
+    parser.add_argument("--baseline", help="Référence de benchmark à comparer")
+    parser.add_argument("--threshold", type=float, help="Régression tolérée (fraction)")
+    parser.add_argument("--profile", nargs="?", const="both", choices=["cprofile", "sampling", "both"],
+                        help="Profiler l'exécution (piles repliées pour flamegraph et fonctions chaudes par module)")
+    parser.add_argument("--profile-dir", default="profiles", help="Répertoire des fichiers de profil")
+    parser.add_argument("--profile-top", type=int, default=5, help="Fonctions affichées par module")
     
     args = parser.parse_args()
     
-    if args.module:
+    if args.bench:
+        # Benchmarks: échec si régression au-delà du seuil
+        name = "bench"
+        action = lambda profiler: run_benchmarks(args.quick, args.bench_output, args.baseline, args.threshold)
+    elif args.module:
         # Test d'un module spécifique
-        success = test_individual_module(args.module)
-        sys.exit(0 if success else 1)
+        name = f"test_{args.module}"
+        action = lambda profiler: test_individual_module(args.module)
     else:
         # Test de tous les modules (par défaut)
-        success = run_test_suite()
-        sys.exit(0 if success else 1)
\ No newline at end of file
+        name = "tests"
+        action = run_test_suite
+    
+    if args.profile:
+        success = run_profiled(action, name, args.profile, args.profile_dir, args.profile_top)
+    else:
+        success = action(None)
+    sys.exit(0 if success else 1)
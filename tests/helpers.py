@@ -0,0 +1,33 @@
+"""
+Fonctions partagées par les tests du pipeline TAP
+"""
+
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from modules.pipeline import TAPPipeline
+
+TEMP_SENSORS = (('temp1', 0x101), ('temp2', 0x102), ('temp3', 0x103))
+
+def build_pipeline(speed_sensor=False, **options):
+    """Pipeline de test: trois capteurs de température votants
+
+    speed_sensor ajoute un capteur de vitesse hors groupe (0x050, 20 ms);
+    les autres arguments nommés sont transmis à TAPPipeline.
+    """
+    pipeline = TAPPipeline(**options)
+    for sensor_id, can_id in TEMP_SENSORS:
+        pipeline.register_sensor(sensor_id, can_id, 100, 5, 'groupe_temp')
+    if speed_sensor:
+        pipeline.register_sensor('vitesse1', 0x050, 20, 3)
+    return pipeline
+
+def legitimate_traffic(mac, cycles, base_time=1000):
+    """Trafic légitime: trames signées, intervalles exacts"""
+    frames = []
+    for cycle in range(cycles):
+        t = base_time + cycle * 105
+        for offset, (can_id, value) in enumerate([(0x101, 45), (0x102, 46), (0x103, 47)]):
+            frames.append((can_id, mac.create_can_frame(value, cycle + 1), t + offset))
+    return frames
@@ -8,6 +8,7 @@ import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 from modules.security_escalation import SecurityEscalation
+from modules.rate_counter import AnomalyRateTracker
 
 def test_security_escalation_complet():
     print("=" * 60)
@@ -135,6 +136,117 @@ def test_security_escalation_complet():
     else:
         print("   ❌ TEST ÉCHOUÉ - Challenge non généré")
     
+    # Test 8: Attaque lente intercalée (mode taux d'anomalies)
+    print("\n🔹 TEST 8: Attaque lente intercalée (mode taux)")
+    tests_totaux += 1
+    
+    sec_rate = SecurityEscalation(rate_tracker=AnomalyRateTracker(
+        window_s=10.0, escalate_rate=0.3, deescalate_rate=0.1, min_dwell_s=5.0))
+    t = 0.0
+    for i in range(40):
+        # Une trame invalide toutes les 4 trames valides (toutes les 2 s)
+        is_valid = (i % 4) != 3
+        sec_rate.process_message('slow1', is_valid, True, timestamp=t)
+        t += 0.5
+    print(f"   Niveau après attaque lente: {sec_rate.get_level_name()}")
+    print(f"   Taux global: {sec_rate.rate_tracker.get_rate(now=t):.2f} anomalies/s")
+    
+    if sec_rate.get_level_name() != "NORMAL":
+        print("   ✅ TEST RÉUSSI - Attaque lente détectée malgré les trames valides")
+        tests_reussis += 1
+    else:
+        print("   ❌ TEST ÉCHOUÉ - Attaque lente non détectée")
+    
+    # Test 9: Hystérésis après une rafale de bruit
+    print("\n🔹 TEST 9: Hystérésis après rafale (pas d'oscillation)")
+    tests_totaux += 1
+    
+    sec_rate = SecurityEscalation(rate_tracker=AnomalyRateTracker(
+        window_s=10.0, escalate_rate=0.3, deescalate_rate=0.1, min_dwell_s=5.0))
+    for k in range(4):
+        sec_rate.process_message('noisy1', False, True, timestamp=k * 0.05)
+    level_after_burst = sec_rate.get_level_name()
+    
+    transitions = 0
+    previous = sec_rate.sec_level
+    t = 0.2
+    while t < 30.0:
+        # Une anomalie isolée au milieu ne doit pas faire monter en HIGH
+        sec_rate.process_message('noisy1', abs(t - 3.0) > 0.05, True, timestamp=t)
+        if sec_rate.sec_level != previous:
+            transitions += 1
+            previous = sec_rate.sec_level
+        t += 0.1
+    print(f"   Niveau après rafale: {level_after_burst}")
+    print(f"   Transitions ensuite: {transitions}, niveau final: {sec_rate.get_level_name()}")
+    
+    if level_after_burst == "MEDIUM" and transitions == 1 and sec_rate.get_level_name() == "NORMAL":
+        print("   ✅ TEST RÉUSSI - Une seule désescalade, sans oscillation")
+        tests_reussis += 1
+    else:
+        print("   ❌ TEST ÉCHOUÉ - Oscillation du niveau de sécurité")
+
+    # Test 10: Lectures sans effet de bord et challenge soumis à l'hystérésis
+    print("\n🔹 TEST 10: Lectures du taux et challenge en mode taux")
+    tests_totaux += 1
+
+    tracker = AnomalyRateTracker(window_s=10.0, escalate_rate=0.3, deescalate_rate=0.1, min_dwell_s=5.0)
+    sec_rate = SecurityEscalation(rate_tracker=tracker)
+    for k in range(4):
+        action = sec_rate.process_message('noisy2', False, True, timestamp=k * 0.05)
+    counter_state = (tracker.global_counter.rate, tracker.global_counter.last_time)
+    sec_rate.get_status()  # Horloge monotone du processus, bien au-delà des horodatages
+    tracker.get_rates()
+    unchanged = (tracker.global_counter.rate, tracker.global_counter.last_time) == counter_state
+
+    challenge = sec_rate.challenges['noisy2']
+    response = sec_rate._calculate_expected_response(challenge, 'noisy2')
+    early = sec_rate.verify_challenge_response('noisy2', response, timestamp=0.3)
+    level_after_early = sec_rate.get_level_name()
+    still_pending = sec_rate.challenges.get('noisy2') == challenge
+    late = sec_rate.verify_challenge_response('noisy2', response, timestamp=40.0)
+    status_rate = sec_rate.get_status()['anomaly_rate']
+    print(f"   État du compteur inchangé par les lectures: {unchanged}")
+    print(f"   Réponse correcte à 0,3 s: {early} -> {level_after_early}, "
+          f"à 40 s: {late} -> {sec_rate.get_level_name()}")
+    print(f"   Challenge conservé après la réponse précoce: {still_pending}, "
+          f"taux du statut: {status_rate:.4f} anomalies/s")
+
+    if (action.startswith("CHALLENGE:") and unchanged and early and level_after_early == "MEDIUM"
+            and still_pending and late and sec_rate.get_level_name() == "NORMAL"
+            and tracker.last_transition == 40.0 and 'noisy2' not in sec_rate.challenges
+            and status_rate == tracker.get_rate(now=40.0) and status_rate > 0):
+        print("   ✅ TEST RÉUSSI - Lectures pures, désescalade par challenge soumise à l'hystérésis")
+        tests_reussis += 1
+    else:
+        print("   ❌ TEST ÉCHOUÉ - Lecture ou challenge contourne l'état du taux")
+
+    # Test 11: Retour de HIGH à NORMAL par le seul trafic valide (mode taux)
+    print("\n🔹 TEST 11: Désescalade HIGH -> MEDIUM -> NORMAL par trafic valide")
+    tests_totaux += 1
+
+    tracker = AnomalyRateTracker(window_s=10.0, escalate_rate=0.3, deescalate_rate=0.1, min_dwell_s=5.0)
+    sec_rate = SecurityEscalation(rate_tracker=tracker)
+    for k in range(7):
+        sec_rate.process_message(f"attaquant{k % 2}", False, True, timestamp=k * 0.05)
+    levels = [sec_rate.get_level_name()]
+    high_rate = sec_rate.get_status()['anomaly_rate']
+    t = 0.3
+    while t < 200.0:
+        # Trafic valide à 10 Hz d'un capteur sain, sans réponse aux challenges
+        sec_rate.process_message('sain1', True, True, timestamp=t)
+        if sec_rate.get_level_name() != levels[-1]:
+            levels.append(sec_rate.get_level_name())
+        t += 0.1
+    print(f"   Niveaux successifs: {' -> '.join(levels)}")
+    print(f"   Taux au passage en HIGH: {high_rate:.2f}, final: {sec_rate.get_status()['anomaly_rate']:.2e} anomalies/s")
+
+    if levels == ["HIGH", "MEDIUM", "NORMAL"] and not sec_rate.blocked_sensors:
+        print("   ✅ TEST RÉUSSI - HIGH quitté par le trafic valide, hystérésis respectée")
+        tests_reussis += 1
+    else:
+        print("   ❌ TEST ÉCHOUÉ - Niveau HIGH bloqué sans anomalie")
+
     # Affichage du journal de sécurité
     print("\n📋 Journal de sécurité:")
     log_entries = sec.get_security_log()
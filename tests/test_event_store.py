@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Test complet du magasin d'événements binaire (segments mmap, rotation, relecture)
+"""
+
+import sys
+import os
+import io
+import shutil
+import time
+import random
+import tempfile
+import contextlib
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from modules.micro_mac import MicroMAC
+from modules.metrics_exporter import MetricsExporter
+from modules.event_store import (EventStore, read_events, list_segments, load_names, to_log_entry,
+                                 DETAILS_FILE, HEADER, HEADER_SIZE,
+                                 RECORD_SIZE, EVENT_TIMING_ANOMALY, EVENT_VOTE, EVENT_NAMES)
+from tests.helpers import build_pipeline, legitimate_traffic
+
+def attack_traffic(mac, cycles=50):
+    """Trafic légitime, injections (mauvaise clé) et dérives temporelles"""
+    attacker = MicroMAC(key=0xDEADBEEF)
+    legitimate = legitimate_traffic(mac, cycles)
+    frames = []
+    for cycle in range(cycles):
+        t = 1000 + cycle * 105
+        frames.extend(legitimate[3 * cycle:3 * cycle + 3])
+        if cycle % 10 == 5:
+            frames.append((0x101, attacker.create_can_frame(99, cycle + 1), t + 50))
+        if cycle % 10 == 7:
+            frames.append((0x102, mac.create_can_frame(46, cycle + 1000), t + 40))
+    return frames
+
+def segment_count_on_disk(path):
+    with open(path, 'rb') as f:
+        return HEADER.unpack(f.read(HEADER.size))[4]
+
+def test_event_store_complet():
+    print("=" * 60)
+    print("TEST COMPLET DU MAGASIN D'ÉVÉNEMENTS")
+    print("=" * 60)
+
+    mac = MicroMAC()
+    tests_reussis = 0
+    tests_totaux = 0
+    directory = tempfile.mkdtemp()
+
+    try:
+        # Test 1: Écriture par lots et relecture filtrée
+        print("\n🔹 TEST 1: Écriture par lots et relecture filtrée")
+        tests_totaux += 1
+        path = os.path.join(directory, 'lots')
+        store = EventStore(path, batch_records=64, background=False)  # Copie dans l'append
+        for i in range(63):
+            store.log(EVENT_TIMING_ANOMALY if i % 3 else EVENT_VOTE, f"S{i % 4}", a=i, b=i + 0.5,
+                      aux=2, timestamp_ns=1_000_000 + i)
+        segment = store.segments()[0][1]
+        before = segment_count_on_disk(segment)
+        store.log(EVENT_VOTE, 'S0', timestamp_ns=1_000_063)  # Tampon plein: copie dans le segment
+        after = segment_count_on_disk(segment)
+        events = list(store.events())
+        filtered = list(store.events(codes=[EVENT_TIMING_ANOMALY], sensors=['S1']))
+        window = list(store.events(start_ns=1_000_010, end_ns=1_000_019))
+        tail = list(store.events(start=60))
+        print(f"   Sur disque avant/après le 64e événement: {before}/{after}, relus: {len(events)}")
+        print(f"   Filtre S1/anomalies: {len(filtered)}, fenêtre temporelle: {len(window)}, depuis #60: {len(tail)}")
+
+        if (before == 0 and after == 64 and len(store) == 64 and len(events) == 64
+                and [e.sequence for e in events] == list(range(64))
+                and events[1].name == 'TIMING_ANOMALY' and events[1].sensor == 'S1'
+                and (events[1].a, events[1].b, events[1].aux) == (1.0, 1.5, 2)
+                and all(e.sensor == 'S1' and e.code == EVENT_TIMING_ANOMALY for e in filtered)
+                and len(filtered) == 11 and [e.sequence for e in window] == list(range(10, 20))
+                and [e.sequence for e in tail] == [60, 61, 62, 63]):
+            print("   ✅ TEST RÉUSSI - Enregistrements fixes relus à l'identique")
+            tests_reussis += 1
+        else:
+            print("   ❌ TEST ÉCHOUÉ - Écriture ou relecture incorrecte")
+        store.close()
+
+        # Test 2: Rotation, rétention, réouverture et récupération
+        print("\n🔹 TEST 2: Rotation, rétention et réouverture")
+        tests_totaux += 1
+        path = os.path.join(directory, 'rotation')
+        with EventStore(path, segment_records=100, batch_records=16, max_segments=3) as store:
+            for i in range(1050):
+                store.log(EVENT_VOTE, f"G{i % 5}", a=i)
+        rotations = store.rotations  # Après close(): lots de l'écrivain tous écrits
+        segments = [base for base, _ in list_segments(path)]
+        reopened = EventStore(path, segment_records=100, batch_records=16)
+        reopened.log(EVENT_VOTE, 'G9', a=1050)
+        reopened.sync()
+        # Arrêt brutal simulé: en-tête non mis à jour après la copie du tampon
+        last = reopened.segments()[-1][1]
+        reopened.close()
+        with open(last, 'r+b') as f:
+            header = bytearray(f.read(HEADER.size))
+            HEADER.pack_into(header, 0, *HEADER.unpack(bytes(header))[:4], 0)
+            f.seek(0)
+            f.write(header)
+        recovered = EventStore(path, segment_records=100)
+        survivors = list(read_events(path))
+        print(f"   Rotations: {rotations}, segments conservés: {segments}, "
+              f"séquence après récupération: {len(recovered)}")
+        print(f"   Relus: {len(survivors)} (#{survivors[0].sequence} à #{survivors[-1].sequence}), "
+              f"dernier: {survivors[-1].sensor}={survivors[-1].a:.0f}")
+
+        if (rotations == 10 and segments == [800, 900, 1000] and len(recovered) == 1051
+                and len(survivors) == 251 and survivors[0].sequence == 800
+                and survivors[-1].sensor == 'G9' and survivors[-1].a == 1050
+                and os.path.getsize(last) == HEADER_SIZE + 100 * RECORD_SIZE):
+            print("   ✅ TEST RÉUSSI - Segments tournants et reprise après arrêt")
+            tests_reussis += 1
+        else:
+            print("   ❌ TEST ÉCHOUÉ - Rotation ou récupération incorrecte")
+        recovered.close()
+
+        # Test 3: Journaux du pipeline dans le magasin
+        print("\n🔹 TEST 3: Anomalies, sécurité et votes du pipeline")
+        tests_totaux += 1
+        frames = attack_traffic(mac)
+        reference = build_pipeline()
+        store = EventStore(os.path.join(directory, 'pipeline'))
+        stored = build_pipeline(event_store=store)
+        with contextlib.redirect_stdout(io.StringIO()):
+            random.seed(3)  # Mêmes challenges tirés par les deux pipelines
+            expected = list(reference.process_stream(frames, batch_size=16))
+            exporter = MetricsExporter(stored, port=0)
+            random.seed(3)
+            verdicts = list(exporter.watch(stored.process_stream(frames, batch_size=16)))
+        for pipeline in (reference, stored):
+            pipeline.voting_module.verify_voting('groupe_temp')
+        events = list(store.events())
+        anomalies = [to_log_entry(e) for e in events if e.code == EVENT_TIMING_ANOMALY]
+        security = [e.name for e in events if e.name not in ('TIMING_ANOMALY', 'VOTE')]
+        votes = [e for e in events if e.code == EVENT_VOTE]
+        reference_anomalies = [{key: entry[key] for key in ('sensor_id', 'expected', 'actual', 'diff', 'tolerance')}
+                               for entry in reference.timing_module.anomaly_log]
+        reference_security = [entry['event_type'] for entry in reference.escalation_module.security_log]
+        exported = [line for line in exporter.render().splitlines()
+                    if line.startswith('tap_timing_anomalies_total ')]
+        print(f"   Anomalies: {len(anomalies)}, sécurité: {len(security)}, votes: {len(votes)}, "
+              f"journaux en mémoire: {len(stored.timing_module.anomaly_log)}/{len(stored.escalation_module.security_log)}")
+        print(f"   Export Prometheus: {exported}")
+        stored_anomaly_log = stored.timing_module.get_anomaly_log()
+        stored_security_log = stored.escalation_module.get_security_log()
+        print(f"   Journaux relus du magasin: {len(stored_anomaly_log)} anomalies, "
+              f"{len(stored_security_log)} événements de sécurité")
+        print(f"   Dernier détail relu: {stored_security_log[-1]['details']!r}")
+
+        if ([(v.accepted, v.reason) for v in verdicts] == [(v.accepted, v.reason) for v in expected]
+                and anomalies == reference_anomalies and len(anomalies) > 0
+                and security == reference_security and len(security) > 0
+                and len(votes) == len(reference.voting_module.voting_history)
+                and votes[-1].level == int(reference.voting_module.voting_history[-1]['success'])
+                and not stored.timing_module.anomaly_log and not stored.escalation_module.security_log
+                and stored.escalation_module.get_status()['total_events'] == len(security)
+                and exported == [f"tap_timing_anomalies_total {len(anomalies)}"]
+                and stored_anomaly_log == anomalies
+                and [entry['event_type'] for entry in stored_security_log] == reference_security
+                and [(entry['security_level'], entry['details']) for entry in stored_security_log]
+                == [(entry['security_level'], entry['details'])
+                    for entry in reference.escalation_module.security_log]
+                and len(load_names(store.directory, DETAILS_FILE)) - 1 < len(stored_security_log)):
+            print("   ✅ TEST RÉUSSI - Mêmes événements, hors de la mémoire du processus")
+            tests_reussis += 1
+        else:
+            print("   ❌ TEST ÉCHOUÉ - Événements divergents")
+        store.close()
+
+        # Test 4: Relecture en flux de nombreux événements
+        print("\n🔹 TEST 4: Relecture en flux de 200000 événements")
+        tests_totaux += 1
+        path = os.path.join(directory, 'volume')
+        with EventStore(path, segment_records=50_000) as store:
+            slot = store.slot('S1')
+            for i in range(200_000):
+                store.append(EVENT_VOTE if i % 2 else EVENT_TIMING_ANOMALY, slot, a=i, timestamp_ns=i)
+        stream = read_events(path, codes=[EVENT_VOTE])
+        first = next(stream)
+        total, last = 1, first
+        for last in stream:
+            total += 1
+        print(f"   Segments: {len(list_segments(path))}, votes relus: {total}, "
+              f"premier #{first.sequence}, dernier #{last.sequence}, codes connus: {len(EVENT_NAMES)}")
+
+        if total == 100_000 and first.sequence == 1 and last.sequence == 199_999 and last.a == 199_999:
+            print("   ✅ TEST RÉUSSI - Itérateur sur segments multiples")
+            tests_reussis += 1
+        else:
+            print("   ❌ TEST ÉCHOUÉ - Relecture incomplète")
+
+        # Test 5: Fenêtre temporelle avec une horloge qui recule
+        print("\n🔹 TEST 5: Fenêtre temporelle, horloge murale non monotone")
+        tests_totaux += 1
+        path = os.path.join(directory, 'horloge')
+        with EventStore(path, segment_records=4, batch_records=2) as store:
+            # Horloge remise en arrière entre les deux segments
+            for timestamp_ns in (10, 20, 30, 40, 5, 15, 25, 35):
+                store.log(EVENT_VOTE, 'G1', timestamp_ns=timestamp_ns)
+        early = [e.sequence for e in read_events(path, end_ns=12)]
+        middle = [e.sequence for e in read_events(path, start_ns=14, end_ns=26)]
+        print(f"   Avant 12 ns: {early}, entre 14 et 26 ns: {middle}")
+
+        if early == [0, 4] and middle == [1, 5, 6]:
+            print("   ✅ TEST RÉUSSI - Bornes filtrées sans supposer l'ordre des horodatages")
+            tests_reussis += 1
+        else:
+            print("   ❌ TEST ÉCHOUÉ - Événements perdus après un recul de l'horloge")
+
+        # Test 6: Écrivain d'arrière-plan (copie et rotation hors de append)
+        print("\n🔹 TEST 6: Écrivain d'arrière-plan")
+        tests_totaux += 1
+        path = os.path.join(directory, 'arriere_plan')
+        store = EventStore(path, segment_records=100, batch_records=16, max_segments=3, background=True)
+        write_records = store._write_records
+
+        def slow_write(data, total):
+            time.sleep(0.2)  # Copie ou rotation lente (disque chargé)
+            write_records(data, total)
+
+        store._write_records = slow_write
+        for i in range(15):
+            store.log(EVENT_VOTE, f"G{i % 5}", a=i)
+        start = time.perf_counter()
+        store.log(EVENT_VOTE, 'G0', a=15)  # Tampon plein: transmis à l'écrivain
+        stall = time.perf_counter() - start
+        del store._write_records
+        for i in range(16, 1050):
+            store.log(EVENT_VOTE, f"G{i % 5}", a=i)
+        visible = [e.a for e in store.events(start=1040)]
+        store.close()
+        background = list(read_events(path))
+        reference_events = list(read_events(os.path.join(directory, 'rotation')))[:-1]
+
+        failing = EventStore(os.path.join(directory, 'echec'), batch_records=4, background=True)
+
+        def broken_write(data, total):
+            raise OSError("disque plein")
+
+        failing._write_records = broken_write
+        for i in range(4):
+            failing.log(EVENT_VOTE, 'G0', a=i)
+        try:
+            failing.sync()
+            error = None
+        except RuntimeError as exc:
+            error = exc
+        del failing._write_records
+        failing.close()
+        print(f"   Pause de l'append qui remplit le tampon: {stall * 1000:.1f} ms (écriture: 200 ms)")
+        print(f"   Rotations: {store.rotations}, relus: {len(background)}, "
+              f"erreur de l'écrivain: {type(error.__cause__).__name__ if error else None}")
+
+        if (stall < 0.1 and visible == list(range(1040, 1050)) and store.rotations == 10
+                and [(e.sequence, e.sensor, e.a) for e in background]
+                == [(e.sequence, e.sensor, e.a) for e in reference_events]
+                and isinstance(error, RuntimeError) and isinstance(error.__cause__, OSError)):
+            print("   ✅ TEST RÉUSSI - Copie et rotation hors du chemin critique")
+            tests_reussis += 1
+        else:
+            print("   ❌ TEST ÉCHOUÉ - Écrivain d'arrière-plan incorrect")
+    finally:
+        shutil.rmtree(directory)
+
+    # Rapport final
+    print("\n" + "=" * 60)
+    print("📊 RAPPORT FINAL MAGASIN D'ÉVÉNEMENTS")
+    print("=" * 60)
+    print(f"Tests réussis: {tests_reussis}/{tests_totaux}")
+    print(f"Taux de réussite: {(tests_reussis/tests_totaux)*100:.1f}%")
+
+    if tests_reussis == tests_totaux:
+        print("🎉 TOUS LES TESTS SONT RÉUSSIS!")
+    else:
+        print("⚠️  Certains tests ont échoué")
+
+    return tests_reussis == tests_totaux
+
+if __name__ == "__main__":
+    success = test_event_store_complet()
+    sys.exit(0 if success else 1)
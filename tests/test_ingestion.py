@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Test complet de l'ingestion asyncio (bus virtuel, files bornées, surcharge)
+"""
+
+import sys
+import os
+import asyncio
+import tempfile
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from modules.micro_mac import MicroMAC
+from modules.ingestion import (FrameQueue, FrameTransport, VirtualBusTransport,
+                               VirtualBusSender, CANIngestionService)
+from tests.helpers import build_pipeline, legitimate_traffic
+
+async def run_bus(address, frames, policy=FrameQueue.BLOCK, queue_size=4096):
+    """Démarre le service, envoie frames sur le bus virtuel et attend leur traitement"""
+    verdicts = []
+    service = CANIngestionService(build_pipeline(), VirtualBusTransport(address),
+                                  queue_size=queue_size, policy=policy,
+                                  on_verdict=verdicts.append)
+    task = asyncio.ensure_future(service.run())
+    await asyncio.wait_for(service.ready.wait(), 5)
+    sender = VirtualBusSender(service.transport.address)
+    sender.send(frames)
+    sender.close()
+    for _ in range(500):
+        if len(verdicts) >= len(frames) - service.queue.dropped:
+            break
+        await asyncio.sleep(0.01)
+    service.stop()
+    await asyncio.wait_for(task, 5)
+    return service, verdicts
+
+def test_ingestion_complet():
+    print("=" * 60)
+    print("TEST COMPLET DE L'INGESTION ASYNCIO")
+    print("=" * 60)
+
+    mac = MicroMAC()
+    tests_reussis = 0
+    tests_totaux = 0
+
+    # Test 1: Politique drop_oldest
+    print("\n🔹 TEST 1: File bornée - éviction de la plus ancienne")
+    tests_totaux += 1
+    queue = FrameQueue(capacity=4, policy=FrameQueue.DROP_OLDEST)
+    for i in range(6):
+        queue.put_nowait((0x100 + i, b'\x00' * 8, i))
+    kept = [frame[2] for frame in queue.get_batch_nowait(10)]
+    print(f"   Trames conservées: {kept}, perdues: {queue.dropped}")
+
+    if kept == [2, 3, 4, 5] and queue.dropped == 2 and queue.max_depth == 4:
+        print("   ✅ TEST RÉUSSI - Mémoire bornée, trames récentes conservées")
+        tests_reussis += 1
+    else:
+        print("   ❌ TEST ÉCHOUÉ - Éviction incorrecte")
+
+    # Test 2: Politique drop_lowest_priority
+    print("\n🔹 TEST 2: File bornée - éviction de la plus faible priorité CAN")
+    tests_totaux += 1
+    queue = FrameQueue(capacity=3, policy=FrameQueue.DROP_LOWEST_PRIORITY)
+    for i, can_id in enumerate([0x300, 0x050, 0x200, 0x100, 0x400, 0x010]):
+        queue.put_nowait((can_id, b'\x00' * 8, i))
+    kept = [frame[0] for frame in queue.get_batch_nowait(10)]
+    print(f"   CAN ID conservés (ordre d'arrivée): {[hex(c) for c in kept]}")
+
+    if kept == [0x050, 0x100, 0x010] and queue.dropped == 3:
+        print("   ✅ TEST RÉUSSI - Trames prioritaires conservées dans l'ordre")
+        tests_reussis += 1
+    else:
+        print("   ❌ TEST ÉCHOUÉ - Priorités non respectées")
+
+    # Test 3: Contre-pression (politique block)
+    print("\n🔹 TEST 3: Contre-pression du producteur")
+    tests_totaux += 1
+
+    async def backpressure():
+        queue = FrameQueue(capacity=2, policy=FrameQueue.BLOCK)
+        producer = asyncio.ensure_future(queue.put_many([(0x100, b'', i) for i in range(5)]))
+        await asyncio.sleep(0.01)
+        blocked = not producer.done() and len(queue) == 2
+        received = []
+        while len(received) < 5:
+            received.extend(frame[2] for frame in await queue.get_batch(10))
+        await producer
+        return blocked, received, queue.dropped
+
+    blocked, received, dropped = asyncio.run(backpressure())
+    print(f"   Producteur suspendu: {blocked}, reçues: {received}, perdues: {dropped}")
+
+    if blocked and received == [0, 1, 2, 3, 4] and dropped == 0:
+        print("   ✅ TEST RÉUSSI - Producteur suspendu sans perte")
+        tests_reussis += 1
+    else:
+        print("   ❌ TEST ÉCHOUÉ - Contre-pression absente")
+
+    # Test 4: Bus virtuel UDP de bout en bout
+    print("\n🔹 TEST 4: Bus virtuel UDP -> pipeline TAP")
+    tests_totaux += 1
+    frames = legitimate_traffic(mac, 40)
+    service, verdicts = asyncio.run(run_bus(('127.0.0.1', 0), frames))
+    stats = service.get_stats()
+    accepted = sum(1 for v in verdicts if v.accepted)
+    print(f"   Acceptées: {accepted}/{len(frames)}, lots: {stats['batches']}, "
+          f"lot moyen: {stats['average_batch']:.1f}")
+
+    if accepted == len(frames) and stats['batches'] < len(frames):
+        print("   ✅ TEST RÉUSSI - Trames lues par lots à chaque réveil")
+        tests_reussis += 1
+    else:
+        print("   ❌ TEST ÉCHOUÉ - Ingestion UDP incomplète")
+
+    # Test 5: Rafale sur socket Unix avec file bornée
+    print("\n🔹 TEST 5: Rafale sur socket Unix (file de 32, drop_oldest)")
+    tests_totaux += 1
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'vcan0.sock')
+        frames = legitimate_traffic(mac, 100)
+        service, verdicts = asyncio.run(run_bus(path, frames, FrameQueue.DROP_OLDEST, 32))
+    stats = service.get_stats()
+    print(f"   Traitées: {stats['frames_processed']}, perdues: {stats['frames_dropped']}, "
+          f"profondeur max: {stats['max_queue_depth']}")
+
+    if (stats['max_queue_depth'] <= 32
+            and stats['frames_processed'] + stats['frames_dropped'] == len(frames)):
+        print("   ✅ TEST RÉUSSI - Rafale absorbée à mémoire bornée")
+        tests_reussis += 1
+    else:
+        print("   ❌ TEST ÉCHOUÉ - File non bornée ou trames perdues silencieusement")
+
+    # Test 6: Interface de transport abstraite
+    print("\n🔹 TEST 6: Adaptateur incomplet refusé à l'instanciation")
+    tests_totaux += 1
+
+    class SilentTransport(FrameTransport):
+        pass
+
+    refused = []
+    for transport_class in (FrameTransport, SilentTransport):
+        try:
+            transport_class()
+        except TypeError:
+            refused.append(transport_class.__name__)
+    print(f"   Classes refusées: {refused}")
+
+    if refused == ['FrameTransport', 'SilentTransport']:
+        print("   ✅ TEST RÉUSSI - read_batch() doit être implémentée")
+        tests_reussis += 1
+    else:
+        print("   ❌ TEST ÉCHOUÉ - Adaptateur sans read_batch() accepté")
+
+    # Rapport final
+    print("\n" + "=" * 60)
+    print("📊 RAPPORT FINAL INGESTION")
+    print("=" * 60)
+    print(f"Tests réussis: {tests_reussis}/{tests_totaux}")
+    print(f"Taux de réussite: {(tests_reussis/tests_totaux)*100:.1f}%")
+
+    if tests_reussis == tests_totaux:
+        print("🎉 TOUS LES TESTS SONT RÉUSSIS!")
+    else:
+        print("⚠️  Certains tests ont échoué")
+
+    return tests_reussis == tests_totaux
+
+if __name__ == "__main__":
+    success = test_ingestion_complet()
+    sys.exit(0 if success else 1)
@@ -5,6 +5,7 @@ Test d'intégration complet du système TAP - VERSION FINALE CORRIGÉE
 
 import sys
 import os
+from collections.abc import Mapping
 import time
 import random
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
@@ -39,8 +40,7 @@ class TAPSystem:
         if voting_group:
             if voting_group not in self.voting_module.voting_groups:
                 self.voting_module.register_voting_group(voting_group, [])
-            if sensor_id not in self.voting_module.voting_groups[voting_group]['sensors']:
-                self.voting_module.voting_groups[voting_group]['sensors'].append(sensor_id)
+            self.voting_module.add_sensor_to_group(voting_group, sensor_id)
     
     def process_sensor_message(self, sensor_id, data, sequence, timestamp_ms, voting_group=None):
         """
@@ -294,7 +294,7 @@ def test_integration_complete():
     consensus, valeur, details = tap.voting_module.verify_voting('groupe_temp')
     print(f"   Consensus: {'✅ ATTEINT' if consensus else '❌ ÉCHOUÉ'}")
     
-    if isinstance(details, dict):
+    if isinstance(details, Mapping):
         aberrant_sensors = details.get('aberrant_sensors', [])
         print(f"   Capteurs aberrants: {aberrant_sensors}")
         
@@ -360,7 +360,7 @@ def test_integration_complete():
     print(f"   Consensus: {'✅ ATTEINT' if consensus else '❌ ÉCHOUÉ'}")
     
     # Critère de succès adapté
-    if isinstance(details, dict):
+    if isinstance(details, Mapping):
         aberrant_count = len(details.get('aberrant_sensors', []))
         print(f"   Capteurs aberrants détectés: {aberrant_count}/7")
         
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Test complet du rapport mémoire (estimation et tracemalloc)
+"""
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from modules.pipeline import REPLAY_STAGE_ORDER
+from modules.memory_report import memory_report, sensor_footprint, group_footprint, trace_allocations
+from benchmarks.bench_memory_scale import build_fleet
+
+def build_replay_fleet(sensor_count, frames_per_sensor=1):
+    """Flotte du benchmark mémoire, fenêtre anti-rejeu comprise"""
+    return build_fleet(sensor_count, frames_per_sensor=frames_per_sensor, stage_order=REPLAY_STAGE_ORDER)
+
+def test_memory_report_complet():
+    print("=" * 60)
+    print("TEST COMPLET DU RAPPORT MÉMOIRE")
+    print("=" * 60)
+
+    tests_reussis = 0
+    tests_totaux = 0
+
+    # Test 1: Répartition par module (estimation)
+    print("\n🔹 TEST 1: Répartition par module et journaux")
+    tests_totaux += 1
+    pipeline = build_replay_fleet(200)
+    report = memory_report(pipeline)
+    modules = report['modules']
+    log_bytes = sum(entry['bytes'] for entry in report['logs'].values())
+    print(f"   Capteurs: {report['sensors']}, groupes: {report['groups']}, "
+          f"total: {report['total_bytes']} o, par capteur: {report['bytes_per_sensor']:.0f} o")
+    print(f"   Modules: {modules}")
+
+    expected = {'mac', 'timing', 'escalation', 'voting', 'replay_window', 'pipeline'}
+    if (report['sensors'] == 200 and report['groups'] == 50 and set(modules) == expected
+            and report['total_bytes'] == sum(modules.values()) + log_bytes
+            and modules['voting'] > modules['mac'] and modules['timing'] > modules['escalation']):
+        print("   ✅ TEST RÉUSSI - Octets répartis par module")
+        tests_reussis += 1
+    else:
+        print("   ❌ TEST ÉCHOUÉ - Répartition incohérente")
+
+    # Test 2: Empreinte par capteur et par groupe
+    print("\n🔹 TEST 2: Empreinte par capteur et par groupe")
+    tests_totaux += 1
+    footprints = [sensor_footprint(pipeline, f"S{i}")['total'] for i in range(200)]
+    groups = [group_footprint(pipeline, f"G{i}") for i in range(50)]
+    accounted = sum(footprints) + sum(groups)
+    sensor_share = report['total_bytes'] - log_bytes
+    detailed = memory_report(pipeline, per_sensor=True, per_group=True, top=3)
+    # État par capteur borné: le trafic ne fait croître que les journaux
+    seasoned = build_replay_fleet(8, frames_per_sensor=50)
+    fresh = build_replay_fleet(8, frames_per_sensor=1)
+    bounded = (sensor_footprint(seasoned, 'S0') == sensor_footprint(fresh, 'S0')
+               and group_footprint(seasoned, 'G0') == group_footprint(fresh, 'G0'))
+    print(f"   Somme capteurs + groupes: {accounted} o / {sensor_share} o hors journaux "
+          f"({accounted / sensor_share * 100:.0f}%)")
+    print(f"   Top capteurs: {detailed['per_sensor']}, état borné par capteur: {bounded}")
+
+    if (0.7 * sensor_share <= accounted <= 1.1 * sensor_share
+            and len(detailed['per_sensor']) == 3 and len(detailed['per_group']) == 3
+            and group_footprint(pipeline, 'inconnu') is None and bounded):
+        print("   ✅ TEST RÉUSSI - Empreintes cohérentes avec le total")
+        tests_reussis += 1
+    else:
+        print("   ❌ TEST ÉCHOUÉ - Empreintes incohérentes")
+
+    # Test 3: Mode tracemalloc
+    print("\n🔹 TEST 3: Mode tracemalloc et estimation")
+    tests_totaux += 1
+    pipeline, retained, traced = trace_allocations(lambda: build_replay_fleet(1000))
+    estimate = memory_report(pipeline)
+    try:
+        memory_report(pipeline, mode='tracemalloc')  # tracemalloc arrêté
+        refused = False
+    except RuntimeError:
+        refused = True
+    ratio = traced['bytes_per_sensor'] / estimate['bytes_per_sensor']
+    print(f"   Retenu: {retained / 1000:.0f} o/capteur, tracemalloc: {traced['bytes_per_sensor']:.0f}, "
+          f"estimation: {estimate['bytes_per_sensor']:.0f} (ratio {ratio:.2f})")
+    print(f"   Fichiers: {sorted(traced['modules'])}, hors trace refusé: {refused}")
+
+    if (traced['mode'] == 'tracemalloc' and {'pipeline', 'sensor_voting', 'timing_verifier'} <= set(traced['modules'])
+            and 0.7 <= ratio <= 1.4 and traced['total_bytes'] <= retained and refused):
+        print("   ✅ TEST RÉUSSI - Mesure tracemalloc proche de l'estimation")
+        tests_reussis += 1
+    else:
+        print("   ❌ TEST ÉCHOUÉ - Mesures divergentes")
+
+    # Test 4: Croissance linéaire avec le nombre de capteurs
+    print("\n🔹 TEST 4: Octets par capteur stables avec l'échelle")
+    tests_totaux += 1
+    per_sensor = {count: memory_report(build_replay_fleet(count))['bytes_per_sensor'] for count in (100, 1000, 5000)}
+    spread = max(per_sensor.values()) / min(per_sensor.values())
+    print(f"   Octets par capteur: { {k: round(v) for k, v in per_sensor.items()} }, écart x{spread:.2f}")
+
+    if spread < 1.3:
+        print("   ✅ TEST RÉUSSI - Empreinte linéaire en nombre de capteurs")
+        tests_reussis += 1
+    else:
+        print("   ❌ TEST ÉCHOUÉ - Coût par capteur non constant")
+
+    # Rapport final
+    print("\n" + "=" * 60)
+    print("📊 RAPPORT FINAL MÉMOIRE")
+    print("=" * 60)
+    print(f"Tests réussis: {tests_reussis}/{tests_totaux}")
+    print(f"Taux de réussite: {(tests_reussis/tests_totaux)*100:.1f}%")
+
+    if tests_reussis == tests_totaux:
+        print("🎉 TOUS LES TESTS SONT RÉUSSIS!")
+    else:
+        print("⚠️  Certains tests ont échoué")
+
+    return tests_reussis == tests_totaux
+
+if __name__ == "__main__":
+    success = test_memory_report_complet()
+    sys.exit(0 if success else 1)
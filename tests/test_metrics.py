@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Test complet de l'exportateur de métriques Prometheus
+"""
+
+import sys
+import os
+import re
+import urllib.request
+import urllib.error
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from modules.micro_mac import MicroMAC
+from modules.instrumentation import PipelineInstrumentation
+from modules.metrics_exporter import MetricsExporter
+from tests.helpers import build_pipeline, legitimate_traffic
+
+SAMPLE_LINE = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(\{[^}]*\})? (\S+)$')
+
+def traffic(mac, cycles, base_time=1000):
+    """Trafic légitime puis une injection et une dérive temporelle sur temp1"""
+    attacker = MicroMAC(key=0xDEADBEEF)
+    frames = legitimate_traffic(mac, cycles, base_time)
+    t = base_time + cycles * 105
+    frames.append((0x101, attacker.create_can_frame(99, cycles + 1), t))
+    frames.append((0x102, mac.create_can_frame(46, cycles + 1), t + 40))
+    return frames
+
+def parse(text):
+    """Échantillons {(nom, étiquettes): valeur} et types déclarés"""
+    samples, types = {}, {}
+    for line in text.splitlines():
+        if line.startswith('# TYPE '):
+            _, _, name, kind = line.split(' ', 3)
+            types[name] = kind
+        elif line and not line.startswith('#'):
+            match = SAMPLE_LINE.match(line)
+            if match is None:
+                raise ValueError(f"Ligne invalide: {line!r}")
+            samples[(match.group(1), match.group(2) or '')] = float(match.group(3))
+    return samples, types
+
+def scrape(url, timeout=2.0):
+    with urllib.request.urlopen(url, timeout=timeout) as response:
+        return response.status, response.headers.get('Content-Type'), response.read().decode('utf-8')
+
+def test_metrics_complet():
+    print("=" * 60)
+    print("TEST COMPLET DE L'EXPORTATEUR DE MÉTRIQUES")
+    print("=" * 60)
+
+    mac = MicroMAC()
+    tests_reussis = 0
+    tests_totaux = 0
+
+    # Test 1: Format texte Prometheus et valeurs
+    print("\n🔹 TEST 1: Format d'exposition et valeurs du pipeline")
+    tests_totaux += 1
+    pipeline = build_pipeline(instrumentation=PipelineInstrumentation(sample_rate=0.5))
+    exporter = MetricsExporter(pipeline, port=0)
+    verdicts = list(exporter.watch(pipeline.process_stream(traffic(mac, 100), batch_size=32)))
+    try:
+        samples, types = parse(exporter.render())
+        valid_format = True
+    except ValueError as error:
+        print(f"   {error}")
+        samples, types, valid_format = {}, {}, False
+    stats = pipeline.get_stats()
+    group = pipeline.voting_module.get_group_stats('groupe_temp')
+    checks = {
+        'trames': samples.get(('tap_frames_processed_total', '')) == len(verdicts) == 302,
+        'verdicts': samples.get(('tap_frames_total', '{reason="OK"}')) == stats['frames_accepted'],
+        'niveau': samples.get(('tap_security_level', '')) == pipeline.escalation_module.sec_level,
+        'bloqués': samples.get(('tap_blocked_sensors', '')) == stats['blocked_sensors'],
+        'challenges': samples.get(('tap_pending_challenges', '')) == len(pipeline.escalation_module.challenges),
+        'votes': samples.get(('tap_votes_total', '{group="groupe_temp"}')) == group['total_votes'],
+        'timing': samples.get(('tap_timing_anomalies_total', '')) == len(pipeline.timing_module.anomaly_log) > 0,
+        'histogramme': (types.get('tap_stage_latency_seconds') == 'histogram'
+                        and samples.get(('tap_stage_latency_seconds_count', '{stage="total"}')) == 151
+                        and samples.get(('tap_stage_latency_seconds_bucket', '{stage="total",le="+Inf"}')) == 151)
+    }
+    print(f"   Format valide: {valid_format}, familles: {len(types)}, contrôles: {checks}")
+
+    if valid_format and all(checks.values()):
+        print("   ✅ TEST RÉUSSI - Métriques conformes au pipeline")
+        tests_reussis += 1
+    else:
+        print("   ❌ TEST ÉCHOUÉ - Métriques incorrectes")
+
+    # Test 2: Serveur HTTP en arrière-plan
+    print("\n🔹 TEST 2: Serveur HTTP /metrics")
+    tests_totaux += 1
+    with exporter:
+        status, content_type, body = scrape(exporter.url)
+        try:
+            scrape(exporter.url.replace('/metrics', '/autre'))
+            missing = None
+        except urllib.error.HTTPError as error:
+            missing = error.code
+    stopped = exporter.address is None
+    print(f"   Statut: {status}, type: {content_type}, autre chemin: {missing}, arrêté: {stopped}")
+
+    if (status == 200 and content_type.startswith('text/plain; version=0.0.4')
+            and body == exporter.render() and missing == 404 and stopped):
+        print("   ✅ TEST RÉUSSI - Exposition HTTP locale")
+        tests_reussis += 1
+    else:
+        print("   ❌ TEST ÉCHOUÉ - Serveur HTTP incorrect")
+
+    # Test 3: Lecture sans blocage du traitement
+    print("\n🔹 TEST 3: Scrape pendant que le traitement détient ses verrous")
+    tests_totaux += 1
+    pipeline = build_pipeline(instrumentation=PipelineInstrumentation(sample_rate=0.5))
+    exporter = MetricsExporter(pipeline, port=0, publish_interval_s=0.0)
+    with exporter:
+        for _ in exporter.watch(pipeline.process_stream(traffic(mac, 300), batch_size=64)):
+            pass
+        # Le thread de traitement détient le verrou de l'instrumentation:
+        # le scrape ne doit pas en dépendre
+        with pipeline.instrumentation._lock:
+            try:
+                status, _, body = scrape(exporter.url, timeout=2.0)
+            except OSError:
+                status, body = None, ''
+    samples, _ = parse(body) if body else ({}, {})
+    published = samples.get(('tap_frames_processed_total', ''))
+    throughput = samples.get(('tap_throughput_frames_per_second', ''), 0)
+    print(f"   Statut: {status}, trames publiées: {published}, débit publié: {throughput:.0f} trames/s, "
+          f"scrapes: {exporter.scrapes}")
+
+    if status == 200 and published == 902 and throughput > 0 and exporter.scrapes == 1:
+        print("   ✅ TEST RÉUSSI - Instantanés publiés sans verrou partagé")
+        tests_reussis += 1
+    else:
+        print("   ❌ TEST ÉCHOUÉ - Le scrape dépend de l'état du traitement")
+
+    # Rapport final
+    print("\n" + "=" * 60)
+    print("📊 RAPPORT FINAL MÉTRIQUES")
+    print("=" * 60)
+    print(f"Tests réussis: {tests_reussis}/{tests_totaux}")
+    print(f"Taux de réussite: {(tests_reussis/tests_totaux)*100:.1f}%")
+
+    if tests_reussis == tests_totaux:
+        print("🎉 TOUS LES TESTS SONT RÉUSSIS!")
+    else:
+        print("⚠️  Certains tests ont échoué")
+
+    return tests_reussis == tests_totaux
+
+if __name__ == "__main__":
+    success = test_metrics_complet()
+    sys.exit(0 if success else 1)
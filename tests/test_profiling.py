@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Test complet du profilage intégré (cProfile, échantillonnage, piles repliées)
+"""
+
+import sys
+import os
+import re
+import time
+import shutil
+import tempfile
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from modules.micro_mac import MicroMAC
+from modules.sensor_voting import SensorVoting
+from modules.profiling import PipelineProfiler
+from modules.pipeline import STAGE_BLOCKED, STAGE_UNKNOWN_ID, STAGE_MAC, STAGE_TIMING
+from tests.helpers import build_pipeline, legitimate_traffic
+
+COLLAPSED_LINE = re.compile(r'^[^;\s]+(;[^;]+)* \d+$')
+
+def mac_workload(mac, frames):
+    for sequence in range(frames):
+        mac.verify_can_frame(mac.create_can_frame(45, sequence))
+
+def busy(function, duration_s):
+    """Répète function pendant duration_s (assez d'échantillons pour l'échantillonneur)"""
+    deadline = time.perf_counter() + duration_s
+    while time.perf_counter() < deadline:
+        function()
+
+def test_profiling_complet():
+    print("=" * 60)
+    print("TEST COMPLET DU PROFILAGE")
+    print("=" * 60)
+
+    mac = MicroMAC()
+    tests_reussis = 0
+    tests_totaux = 0
+
+    # Test 1: Fonctions chaudes par module (cProfile)
+    print("\n🔹 TEST 1: Fonctions chaudes par module TAP (cProfile)")
+    tests_totaux += 1
+    voting = SensorVoting()
+    voting.register_voting_group('groupe', ['a', 'b', 'c'])
+    with PipelineProfiler(mode='cprofile') as profiler:
+        mac_workload(mac, 500)
+        for i in range(200):
+            for sensor_id in ('a', 'b', 'c'):
+                voting.submit_reading('groupe', sensor_id, 45 + i % 3)
+            voting.verify_voting('groupe')
+    hot = profiler.hot_functions(top=3)
+    calls = {entry['label']: entry['calls'] for entries in hot.values() for entry in entries}
+    all_calls = {entry['label']: entry['calls'] for entry in profiler.function_stats()}
+    print(f"   Modules: {list(hot)}")
+    print(f"   calculate_micro_mac: {all_calls.get('micro_mac.calculate_micro_mac')} appels, "
+          f"verify_voting: {all_calls.get('sensor_voting.verify_voting')} appels")
+
+    if ('micro_mac' in hot and 'sensor_voting' in hot and 'profiling' not in hot
+            and all(module is not None for module in hot)
+            and all_calls.get('micro_mac.calculate_micro_mac') == 1000
+            and all_calls.get('sensor_voting.verify_voting') == 200
+            and 'micro_mac.calculate_micro_mac' in calls
+            and list(profiler.module_times()) == list(hot)):
+        print("   ✅ TEST RÉUSSI - Coût attribué aux fonctions de chaque module")
+        tests_reussis += 1
+    else:
+        print("   ❌ TEST ÉCHOUÉ - Attribution incorrecte")
+
+    # Test 2: Piles échantillonnées et portées
+    print("\n🔹 TEST 2: Piles repliées par portée (échantillonnage)")
+    tests_totaux += 1
+    switch_interval = sys.getswitchinterval()
+    directory = tempfile.mkdtemp()
+    try:
+        with PipelineProfiler(mode='both', sample_interval_s=0.001) as profiler:
+            with profiler.scope('mac'):
+                busy(lambda: mac.calculate_micro_mac(45, 1), 0.15)
+            with profiler.scope('vote'):
+                busy(lambda: voting.verify_voting('groupe'), 0.15)
+        lines = profiler.collapsed_stacks()
+        paths = profiler.write(directory, 'essai')
+        with open(paths['collapsed'], encoding='utf-8') as f:
+            written = f.read().splitlines()
+        pstats_written = os.path.getsize(paths['pstats']) > 0
+    finally:
+        shutil.rmtree(directory)
+    valid = all(COLLAPSED_LINE.match(line) for line in lines)
+    mac_stacks = sum(int(line.rsplit(' ', 1)[1]) for line in lines
+                     if line.startswith('[mac];') and 'micro_mac.calculate_micro_mac' in line)
+    vote_stacks = sum(int(line.rsplit(' ', 1)[1]) for line in lines
+                      if line.startswith('[vote];') and 'sensor_voting.verify_voting' in line)
+    print(f"   Échantillons: {profiler.sample_count}, piles distinctes: {len(lines)}, format valide: {valid}")
+    print(f"   [mac] calculate_micro_mac: {mac_stacks}, [vote] verify_voting: {vote_stacks}, "
+          f"portées: { {k: round(v, 2) for k, v in profiler.scope_times.items()} }")
+
+    if (valid and written == lines and pstats_written and mac_stacks > 0 and vote_stacks > 0
+            and not any(re.search(r'(^|;)profiling\.', line) for line in lines)
+            and sys.getswitchinterval() == switch_interval):
+        print("   ✅ TEST RÉUSSI - Piles repliées prêtes pour un flamegraph")
+        tests_reussis += 1
+    else:
+        print("   ❌ TEST ÉCHOUÉ - Piles repliées incorrectes")
+
+    # Test 3: Arrêt sur exception et erreurs d'usage
+    print("\n🔹 TEST 3: Arrêt garanti et erreurs d'usage")
+    tests_totaux += 1
+    profiler = PipelineProfiler(mode='sampling')
+    try:
+        with profiler:
+            sampler = profiler._sampler
+            raise KeyError('échec simulé')
+    except KeyError:
+        pass
+    stopped = not sampler.is_alive() and profiler._sampler is None
+    errors = []
+    try:
+        PipelineProfiler(mode='inconnu')
+    except ValueError:
+        errors.append('mode')
+    with PipelineProfiler(mode='cprofile') as running:
+        try:
+            running.start()
+        except RuntimeError:
+            errors.append('double démarrage')
+    try:
+        running.collapsed_stacks()
+    except ValueError:
+        errors.append('piles sans échantillonnage')
+    print(f"   Échantillonneur arrêté: {stopped}, erreurs signalées: {errors}")
+
+    if stopped and len(errors) == 3:
+        print("   ✅ TEST RÉUSSI - Profileur toujours arrêté, usages invalides refusés")
+        tests_reussis += 1
+    else:
+        print("   ❌ TEST ÉCHOUÉ - Cycle de vie incorrect")
+
+    # Test 4: Statistiques cProfile par portée, portées des phases du pipeline
+    print("\n🔹 TEST 4: cProfile par portée (pipeline en micro-lots)")
+    tests_totaux += 1
+    with PipelineProfiler(mode='cprofile') as profiler:
+        with profiler.scope('hachage'):
+            mac_workload(mac, 100)
+        with profiler.scope('vote'):
+            for _ in range(50):
+                voting.verify_voting('groupe')
+        # Ordre par défaut: hachage à l'étape 'mac' de chaque trame (portée verify);
+        # MAC avant le timing: colonne hachée d'un bloc (portée mac)
+        pipeline = build_pipeline(profiler=profiler)
+        list(pipeline.process_stream(legitimate_traffic(mac, 20), batch_size=16))
+        mac_first = build_pipeline(profiler=profiler,
+                                   stage_order=(STAGE_BLOCKED, STAGE_UNKNOWN_ID, STAGE_MAC, STAGE_TIMING))
+        list(mac_first.process_stream(legitimate_traffic(mac, 20), batch_size=16))
+    label = 'micro_mac.calculate_micro_mac'
+    calls = {scope: {entry['label']: entry['calls'] for entry in profiler.function_stats(scope)}
+             for scope in (None, 'hachage', 'vote', 'mac', 'verify')}
+    print(f"   Portées: {profiler.scopes}")
+    print(f"   calculate_micro_mac: [hachage]={calls['hachage'].get(label)}, "
+          f"[mac]={calls['mac'].get(label)} (MAC d'abord: {mac_first.mac_computations}), "
+          f"[verify]={calls['verify'].get(label)} (ordre par défaut: {pipeline.mac_computations}), "
+          f"total={calls[None].get(label)}")
+
+    if (profiler.scopes == ['hachage', 'vote', 'decode', 'mac', 'verify', 'voting']
+            and calls['hachage'].get(label) == 200
+            and 'sensor_voting.verify_voting' not in calls['hachage']
+            and calls['vote'].get('sensor_voting.verify_voting') == 50 and label not in calls['vote']
+            and calls['mac'].get(label) == mac_first.mac_computations == 60
+            and calls['verify'].get(label) == pipeline.mac_computations == 60
+            and calls[None].get(label) == 200 + 2 * (60 + 60)
+            and profiler.function_stats('inconnue') == []):
+        print("   ✅ TEST RÉUSSI - Coûts séparés par portée, fusionnés sans portée")
+        tests_reussis += 1
+    else:
+        print("   ❌ TEST ÉCHOUÉ - Statistiques par portée incorrectes")
+
+    # Rapport final
+    print("\n" + "=" * 60)
+    print("📊 RAPPORT FINAL PROFILAGE")
+    print("=" * 60)
+    print(f"Tests réussis: {tests_reussis}/{tests_totaux}")
+    print(f"Taux de réussite: {(tests_reussis/tests_totaux)*100:.1f}%")
+
+    if tests_reussis == tests_totaux:
+        print("🎉 TOUS LES TESTS SONT RÉUSSIS!")
+    else:
+        print("⚠️  Certains tests ont échoué")
+
+    return tests_reussis == tests_totaux
+
+if __name__ == "__main__":
+    success = test_profiling_complet()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Test complet du rejeu de captures CAN (candump, ASC, cache binaire)
+"""
+
+import sys
+import os
+import time
+import tempfile
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from modules.micro_mac import MicroMAC
+from modules.capture_replay import (parse_candump, parse_asc, open_capture, read_capture,
+                                    write_capture, replay, CACHE_SUFFIX)
+from tests.helpers import build_pipeline
+
+ASC_SAMPLE = """date Mon Oct 19 10:00:00.000 am 2026
+base hex  timestamps absolute
+internal events logged
+Begin Triggerblock Mon Oct 19 10:00:00.000 am 2026
+   0.000000 Start of measurement
+   1.000000 1  101             Rx   d 8 00 2D 00 01 11 22 33 00  Length = 0 BitCount = 0
+   1.050000 1  18FEF100x       Rx   d 3 01 02 03
+   1.060000 1  102             Rx   r
+   1.070000 1  ErrorFrame
+   1.105000 1  101             Tx   d 8 00 2D 00 02 44 55 66 00
+End TriggerBlock
+"""
+
+def write_candump(path, mac, cycles, base_s=1700000000.0):
+    """Capture candump -L de trafic légitime (3 capteurs, période 105 ms)"""
+    with open(path, 'w') as handle:
+        for cycle in range(cycles):
+            t = base_s + cycle * 0.105
+            for offset, (can_id, value) in enumerate([(0x101, 45), (0x102, 46), (0x103, 47)]):
+                frame = mac.create_can_frame(value, cycle + 1)
+                handle.write(f"({t + offset * 0.001:.6f}) vcan0 {can_id:03X}#{frame.hex().upper()}\n")
+
+def test_replay_complet():
+    print("=" * 60)
+    print("TEST COMPLET DU REJEU DE CAPTURES")
+    print("=" * 60)
+
+    mac = MicroMAC()
+    tests_reussis = 0
+    tests_totaux = 0
+
+    # Test 1: Formats candump
+    print("\n🔹 TEST 1: Analyse candump (-L et texte horodaté)")
+    tests_totaux += 1
+    lines = [
+        "(1436509052.249713) vcan0 044#2A366C2BBA\n",
+        "(1436509052.449847) vcan0 123#R\n",
+        "(1436509052.650000)  can1  7FF   [3]  01 02 03\n",
+        "ligne invalide\n",
+    ]
+    records = list(parse_candump(iter(lines)))
+    print(f"   Trames: {[(hex(c), d.hex()) for _, c, d in records]}")
+
+    if (len(records) == 2 and records[0][1] == 0x044 and records[0][2] == bytes.fromhex('2A366C2BBA')
+            and records[1][2] == b'\x01\x02\x03' and abs(records[0][0] - 1436509052249.713) < 1e-3):
+        print("   ✅ TEST RÉUSSI - Trames de données extraites, RTR et bruit ignorés")
+        tests_reussis += 1
+    else:
+        print("   ❌ TEST ÉCHOUÉ - Analyse candump incorrecte")
+
+    # Test 2: Format Vector ASC
+    print("\n🔹 TEST 2: Analyse Vector ASC")
+    tests_totaux += 1
+    records = list(parse_asc(iter(ASC_SAMPLE.splitlines())))
+    print(f"   Trames: {[(t, hex(c), len(d)) for t, c, d in records]}")
+
+    if ([(c, len(d)) for _, c, d in records] == [(0x101, 8), (0x18FEF100, 3), (0x101, 8)]
+            and records[2][0] == 1105.0):
+        print("   ✅ TEST RÉUSSI - Données, ID étendus, trames distantes et erreurs gérés")
+        tests_reussis += 1
+    else:
+        print("   ❌ TEST ÉCHOUÉ - Analyse ASC incorrecte")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'trafic.log')
+        write_candump(path, mac, 50)
+
+        # Test 3: Cache binaire au premier passage
+        print("\n🔹 TEST 3: Cache binaire écrit au premier passage")
+        tests_totaux += 1
+        first_pass = list(open_capture(path))
+        cache_path = path + CACHE_SUFFIX
+        cached = list(read_capture(cache_path)) if os.path.exists(cache_path) else []
+        reused = open_capture(path).gi_code.co_name == 'read_capture'
+        size_ratio = os.path.getsize(cache_path) / os.path.getsize(path) if cached else 0
+        print(f"   Trames: {len(first_pass)}, cache identique: {cached == first_pass}, "
+              f"taille relative: {size_ratio:.2f}, cache relu: {reused}")
+
+        if len(first_pass) == 150 and cached == first_pass and size_ratio < 1 and reused:
+            print("   ✅ TEST RÉUSSI - Cache binaire compact et fidèle")
+            tests_reussis += 1
+        else:
+            print("   ❌ TEST ÉCHOUÉ - Cache binaire incorrect")
+
+        # Test 4: Rejeu rapide dans le pipeline
+        print("\n🔹 TEST 4: Rejeu rapide (micro-lots) dans le pipeline")
+        tests_totaux += 1
+        pipeline = build_pipeline()
+        verdicts = list(replay(pipeline, open_capture(path), batch_size=32))
+        accepted = sum(1 for v in verdicts if v.accepted)
+        consensus, value, _ = pipeline.voting_module.verify_voting('groupe_temp')
+        print(f"   Acceptées: {accepted}/{len(verdicts)}, consensus: {consensus} ({value})")
+
+        if accepted == len(verdicts) == 150 and consensus and value == 46:
+            print("   ✅ TEST RÉUSSI - Trafic enregistré authentifié et voté")
+            tests_reussis += 1
+        else:
+            print("   ❌ TEST ÉCHOUÉ - Rejeu incorrect")
+
+        # Test 5: Rejeu cadencé sur les horodatages d'origine
+        print("\n🔹 TEST 5: Rejeu cadencé (x20)")
+        tests_totaux += 1
+        pipeline = build_pipeline()
+        records = list(open_capture(path))[:30]  # 10 cycles = ~947 ms de capture
+        start = time.monotonic()
+        verdicts = list(replay(pipeline, records, speed=20.0))
+        elapsed = time.monotonic() - start
+        expected = (records[-1][0] - records[0][0]) / 1000.0 / 20.0
+        print(f"   Durée: {elapsed * 1000:.1f} ms (attendue ≥ {expected * 1000:.1f} ms)")
+
+        if len(verdicts) == 30 and all(v.accepted for v in verdicts) and elapsed >= expected * 0.95:
+            print("   ✅ TEST RÉUSSI - Rejeu cadencé sur la capture")
+            tests_reussis += 1
+        else:
+            print("   ❌ TEST ÉCHOUÉ - Cadence non respectée")
+
+    # Test 6: Trames CAN FD ignorées (format limité au CAN classique)
+    print("\n🔹 TEST 6: Trames CAN FD et charges de plus de 8 octets")
+    tests_totaux += 1
+    fd_lines = [
+        "(1700000000.000000) can0 101#002D0001112233AA\n",
+        "(1700000000.010000) can0 101##1002D0001112233AA\n",
+        "(1700000000.020000) can0 102#00112233445566778899AABB\n",
+        "(1700000000.030000)  can0  103  [12]  00 11 22 33 44 55 66 77 88 99 AA BB\n",
+        "(1700000000.040000)  can0  103   [2]  00 2E\n",
+    ]
+    fd_asc = ["   1.000000 1  104             Rx   d F 00 11 22 33 44 55 66 77 88 99 AA BB\n",
+              "   1.010000 1  104             Rx   d 2 00 2F\n"]
+    kept = [(can_id, data) for _, can_id, data in parse_candump(fd_lines)]
+    kept_asc = [(can_id, data) for _, can_id, data in parse_asc(fd_asc)]
+    with tempfile.TemporaryDirectory() as directory:
+        try:
+            write_capture([(0.0, 0x101, bytes(12))], os.path.join(directory, 'fd.bin'))
+            oversized_rejected = False
+        except ValueError:
+            oversized_rejected = True
+    print(f"   candump conservées: {kept}")
+    print(f"   ASC conservées: {kept_asc}, écriture binaire > 8 octets refusée: {oversized_rejected}")
+
+    if (kept == [(0x101, bytes.fromhex('002D0001112233AA')), (0x103, b'\x00\x2e')]
+            and kept_asc == [(0x104, b'\x00\x2f')] and oversized_rejected):
+        print("   ✅ TEST RÉUSSI - Trames CAN FD ignorées, aucune charge tronquée")
+        tests_reussis += 1
+    else:
+        print("   ❌ TEST ÉCHOUÉ - Trame CAN FD mal analysée")
+
+    # Test 7: Échec d'ouverture du cache temporaire remonté tel quel
+    print("\n🔹 TEST 7: Cache temporaire impossible à ouvrir")
+    tests_totaux += 1
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'trafic.log')
+        write_candump(path, mac, 2)
+        os.mkdir(path + CACHE_SUFFIX + '.tmp')  # Un répertoire occupe le chemin temporaire
+        try:
+            list(open_capture(path))
+            error = None
+        except OSError as exc:
+            error = exc
+        uncached = len(list(open_capture(path, cache=False)))
+    print(f"   Erreur: {type(error).__name__}, masquée par une autre: "
+          f"{error is not None and error.__context__ is not None}, lecture sans cache: {uncached}")
+
+    if isinstance(error, IsADirectoryError) and error.__context__ is None and uncached == 6:
+        print("   ✅ TEST RÉUSSI - Erreur d'origine propagée, aucune suppression hasardeuse")
+        tests_reussis += 1
+    else:
+        print("   ❌ TEST ÉCHOUÉ - Erreur d'ouverture masquée")
+
+    # Rapport final
+    print("\n" + "=" * 60)
+    print("📊 RAPPORT FINAL REJEU")
+    print("=" * 60)
+    print(f"Tests réussis: {tests_reussis}/{tests_totaux}")
+    print(f"Taux de réussite: {(tests_reussis/tests_totaux)*100:.1f}%")
+
+    if tests_reussis == tests_totaux:
+        print("🎉 TOUS LES TESTS SONT RÉUSSIS!")
+    else:
+        print("⚠️  Certains tests ont échoué")
+
+    return tests_reussis == tests_totaux
+
+if __name__ == "__main__":
+    success = test_replay_complet()
+    sys.exit(0 if success else 1)
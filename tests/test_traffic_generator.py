@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Test complet du générateur de trafic synthétique et d'attaques étiquetées
+"""
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from array import array
+
+from modules.micro_mac import MicroMAC
+from modules.pipeline import TAPPipeline
+from modules import traffic_generator as traffic_generator_module
+from modules.traffic_generator import (SensorProfile, TrafficGenerator, evaluate_detection,
+                                       HAS_NUMPY)
+
+def build_population(count=12, group_size=4):
+    """Population de capteurs redondants (période 100 ms + délai unique)"""
+    return [SensorProfile(f"S{i}", 0x100 + i, 100, 2 + i % 7, value_mean=40 + i // group_size,
+                          voting_group=f"G{i // group_size}")
+            for i in range(count)]
+
+def run_pipeline(generator, traffic):
+    pipeline = TAPPipeline()
+    generator.register(pipeline)
+    return pipeline, list(pipeline.process_stream(traffic.frames(), batch_size=128))
+
+def test_traffic_generator_complet():
+    print("=" * 60)
+    print("TEST COMPLET DU GÉNÉRATEUR DE TRAFIC")
+    print("=" * 60)
+
+    tests_reussis = 0
+    tests_totaux = 0
+    sensors = build_population()
+
+    # Test 1: Déterminisme par graine
+    print("\n🔹 TEST 1: Trafic reproductible par graine")
+    tests_totaux += 1
+    first = TrafficGenerator(sensors, seed=7).add_attack('injection', 'S1', 1000).generate(5000)
+    second = TrafficGenerator(sensors, seed=7).add_attack('injection', 'S1', 1000).generate(5000)
+    other = TrafficGenerator(sensors, seed=8).add_attack('injection', 'S1', 1000).generate(5000)
+    same = (first.payload == second.payload and first.timestamps == second.timestamps
+            and first.labels == second.labels)
+    print(f"   Trames: {len(first)}, même graine identique: {same}, "
+          f"autre graine différente: {first.payload != other.payload}")
+
+    if same and first.payload != other.payload and len(first) > 500:
+        print("   ✅ TEST RÉUSSI - Génération déterministe")
+        tests_reussis += 1
+    else:
+        print("   ❌ TEST ÉCHOUÉ - Génération non reproductible")
+
+    # Test 2: Format des trames et ordre du bus
+    print("\n🔹 TEST 2: Trames au format MicroMAC triées par horodatage")
+    tests_totaux += 1
+    mac = MicroMAC()
+    checked = [mac.verify_can_frame(frame) for _, frame, _ in first.frames()]
+    labels = list(first.labels)
+    genuine_ok = all(valid for (valid, _, _), label in zip(checked, labels) if label == 0)
+    forged_rejected = all(not valid for (valid, _, _), label in zip(checked, labels) if label == 1)
+    ordered = all(a <= b for a, b in zip(first.timestamps, first.timestamps[1:]))
+    print(f"   Légitimes valides: {genuine_ok}, injectées invalides: {forged_rejected}, "
+          f"triées: {ordered}")
+
+    if genuine_ok and forged_rejected and ordered and len(first.payload) == 8 * len(first):
+        print("   ✅ TEST RÉUSSI - Tampon contigu de trames signées")
+        tests_reussis += 1
+    else:
+        print("   ❌ TEST ÉCHOUÉ - Format de trame incorrect")
+
+    # Test 3: Trafic légitime entièrement accepté
+    print("\n🔹 TEST 3: Aucun faux positif sur trafic légitime")
+    tests_totaux += 1
+    generator = TrafficGenerator(sensors, seed=3)
+    traffic = generator.generate(10000)
+    _, verdicts = run_pipeline(generator, traffic)
+    report = evaluate_detection(verdicts, traffic.labels)
+    print(f"   {report['LEGIT']}")
+
+    if report['LEGIT']['frames'] == len(traffic) and report['LEGIT']['rejected'] == 0:
+        print("   ✅ TEST RÉUSSI - Gigue bornée sous la tolérance timing")
+        tests_reussis += 1
+    else:
+        print("   ❌ TEST ÉCHOUÉ - Faux positifs sur trafic légitime")
+
+    # Test 4: Attaques étiquetées et détection
+    print("\n🔹 TEST 4: Injection, rejeu et timing détectés")
+    tests_totaux += 1
+    generator = TrafficGenerator(sensors, seed=3)
+    generator.add_attack('injection', 'S1', 3000, count=15)
+    generator.add_attack('replay', 'S5', 4000, count=15)
+    generator.add_attack('timing', 'S9', 5000, count=3, offset_ms=20)
+    generator.add_attack('falsified', 'S2', 6000, count=5)
+    generator.add_attack('compromised_voter', 'S6', 7000, bias=30)
+    traffic = generator.generate(10000)
+    _, verdicts = run_pipeline(generator, traffic)
+    report = evaluate_detection(verdicts, traffic.labels)
+    counts = traffic.label_counts()
+    for name in ('INJECTION', 'REPLAY', 'TIMING'):
+        print(f"   {name}: {report[name]['rejected']}/{report[name]['frames']}")
+    print(f"   Étiquettes: {counts}")
+
+    if (all(report[name]['rejection_rate'] == 1.0 for name in ('INJECTION', 'REPLAY'))
+            and report['TIMING']['rejected'] >= 1 and counts['FALSIFIED'] == 5
+            and counts['COMPROMISED_VOTER'] > 20 and len(verdicts) == len(traffic)):
+        print("   ✅ TEST RÉUSSI - Vérité terrain alignée sur les verdicts")
+        tests_reussis += 1
+    else:
+        print("   ❌ TEST ÉCHOUÉ - Détection ou étiquetage incorrect")
+
+    # Test 5: Repli pur Python
+    print("\n🔹 TEST 5: Génération sans NumPy")
+    tests_totaux += 1
+    generator = TrafficGenerator(sensors, seed=3, use_numpy=False)
+    generator.add_attack('injection', 'S1', 3000, count=15)
+    traffic = generator.generate(10000)
+    _, verdicts = run_pipeline(generator, traffic)
+    report = evaluate_detection(verdicts, traffic.labels)
+    print(f"   NumPy disponible: {HAS_NUMPY}, trames: {len(traffic)}, "
+          f"injection: {report['INJECTION']['rejected']}/{report['INJECTION']['frames']}")
+
+    if (not generator.use_numpy and report['INJECTION']['rejection_rate'] == 1.0
+            and report['LEGIT']['frames'] > 1000):
+        print("   ✅ TEST RÉUSSI - Repli pur Python fonctionnel")
+        tests_reussis += 1
+    else:
+        print("   ❌ TEST ÉCHOUÉ - Repli pur Python incorrect")
+
+    # Test 6: Cache des Micro-MAC borné
+    print("\n🔹 TEST 6: Mémoire du cache Micro-MAC bornée")
+    tests_totaux += 1
+    unbounded = TrafficGenerator(sensors, seed=5)
+    reference = unbounded.generate(20000)
+    limit = traffic_generator_module.MAC_CACHE_LIMIT
+    traffic_generator_module.MAC_CACHE_LIMIT = 64
+    try:
+        bounded = TrafficGenerator(sensors, seed=5)
+        traffic = bounded.generate(20000)
+    finally:
+        traffic_generator_module.MAC_CACHE_LIMIT = limit
+    print(f"   Entrées en cache: {len(unbounded._mac_cache)} sans borne, "
+          f"{len(bounded._mac_cache)} avec une borne de 64")
+
+    if (len(unbounded._mac_cache) > 64 and len(bounded._mac_cache) <= 64
+            and traffic.payload == reference.payload):
+        print("   ✅ TEST RÉUSSI - Cache borné, trames identiques")
+        tests_reussis += 1
+    else:
+        print("   ❌ TEST ÉCHOUÉ - Cache non borné ou trames modifiées")
+
+    # Test 7: Encodage en colonnes (NumPy et pur Python) conforme à create_can_frame
+    print("\n🔹 TEST 7: Encodage en colonnes conforme à MicroMAC.create_can_frame")
+    tests_totaux += 1
+    rows = [(5.0, 0x101, 45, 1, 0), (1.0, 0x102, 0xFFFF, 0xFFFF, 1), (5.0, 0x103, 45, 1, 0),
+            (3.0, 0x101, 45, 1, 1), (2.0, 0x104, 0, 0, 0)]  # Horodatages égaux: ordre stable
+    encoded = {}
+    for use_numpy in sorted({False, HAS_NUMPY}):
+        generator = TrafficGenerator(sensors, seed=1, use_numpy=use_numpy)
+        columns = {'timestamps': array('d', [r[0] for r in rows]),
+                   'can_ids': array('I', [r[1] for r in rows]),
+                   'data': array('H', [r[2] for r in rows]),
+                   'sequences': array('H', [r[3] for r in rows]),
+                   'forged': bytearray(r[4] for r in rows), 'labels': bytearray(r[4] for r in rows)}
+        encoded[use_numpy] = generator._encode(columns)
+    owner, attacker = generator.mac, generator.attacker_mac
+    expected = b''.join((attacker if forged else owner).create_can_frame(data, sequence)
+                        for _, _, data, sequence, forged in sorted(rows, key=lambda r: r[0]))
+    print(f"   Chemins comparés: {['NumPy' if k else 'pur Python' for k in encoded]}, "
+          f"ordre CAN: {[hex(c) for c in encoded[HAS_NUMPY].can_ids]}")
+
+    if all(bytes(t.payload) == expected and list(t.can_ids) == [0x102, 0x104, 0x101, 0x101, 0x103]
+           and list(t.labels) == [1, 0, 1, 0, 0] for t in encoded.values()):
+        print("   ✅ TEST RÉUSSI - Trames identiques, tri stable")
+        tests_reussis += 1
+    else:
+        print("   ❌ TEST ÉCHOUÉ - Encodage en colonnes divergent")
+
+    # Rapport final
+    print("\n" + "=" * 60)
+    print("📊 RAPPORT FINAL GÉNÉRATEUR DE TRAFIC")
+    print("=" * 60)
+    print(f"Tests réussis: {tests_reussis}/{tests_totaux}")
+    print(f"Taux de réussite: {(tests_reussis/tests_totaux)*100:.1f}%")
+
+    if tests_reussis == tests_totaux:
+        print("🎉 TOUS LES TESTS SONT RÉUSSIS!")
+    else:
+        print("⚠️  Certains tests ont échoué")
+
+    return tests_reussis == tests_totaux
+
+if __name__ == "__main__":
+    success = test_traffic_generator_complet()
+    sys.exit(0 if success else 1)
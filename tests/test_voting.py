@@ -5,9 +5,16 @@ Test complet du module Sensor Voting - VERSION CORRIGÉE
 
 import sys
 import os
+from collections.abc import Mapping
+import random
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
+from modules import sensor_voting as sensor_voting_module
 from modules.sensor_voting import SensorVoting
+from modules.voting_matrix import HAS_NUMPY
+from modules.streaming_voting import StreamingVoter
+from modules.security_escalation import SecurityEscalation
+from modules.vector_voting import VectorSensorVoting
 
 def test_sensor_voting_complet():
     print("=" * 60)
@@ -39,7 +46,7 @@ def test_sensor_voting_complet():
     print(f"   Valeur: {value:.2f}°C" if value else "   Valeur: N/A")
     
     # CORRECTION: Gestion correcte des clés du dictionnaire
-    if isinstance(details, dict):
+    if isinstance(details, Mapping):
         consistent_count = details.get('consistent_readings', 0)
         print(f"   Capteurs cohérents: {consistent_count}/5")
     
@@ -64,7 +71,7 @@ def test_sensor_voting_complet():
     print(f"   Valeur: {value:.2f}°C" if value else "   Valeur: N/A")
     
     # CORRECTION: Vérification améliorée
-    if isinstance(details, dict):
+    if isinstance(details, Mapping):
         aberrant_sensors = details.get('aberrant_sensors', [])
         consistent_count = details.get('consistent_readings', 0)
         print(f"   Capteurs cohérents: {consistent_count}/5")
@@ -93,7 +100,7 @@ def test_sensor_voting_complet():
     print(f"   Consensus: {'✅ ATTEINT' if consensus else '❌ ÉCHOUÉ'}")
     
     # CORRECTION: Critère de succès adapté pour l'attaque massive
-    if isinstance(details, dict):
+    if isinstance(details, Mapping):
         aberrant_sensors = details.get('aberrant_sensors', [])
         consistent_count = details.get('consistent_readings', 0)
         print(f"   Capteurs cohérents: {consistent_count}/5")
@@ -143,7 +150,7 @@ def test_sensor_voting_complet():
     print(f"   Consensus: {'✅ ATTEINT' if consensus else '❌ ÉCHOUÉ'}")
     
     # CORRECTION: Vérification correcte de la tolérance
-    if isinstance(details, dict):
+    if isinstance(details, Mapping):
         consistent_count = details.get('consistent_readings', 0)
         print(f"   Capteurs cohérents: {consistent_count}/5")
         
@@ -173,6 +180,369 @@ def test_sensor_voting_complet():
     else:
         print("   ❌ TEST ÉCHOUÉ - Groupe inconnu accepté")
     
+    # Test 7: Grand groupe - médiane incrémentale vs recalcul complet
+    print("\n🔹 TEST 7: Grand groupe (40 capteurs) - médiane incrémentale")
+    tests_totaux += 1
+    big_ids = [f"S{i}" for i in range(40)]
+    voting.register_voting_group('big_group', big_ids)
+    rng = random.Random(42)
+    mismatches = 0
+    for _ in range(200):
+        # Une seule lecture change entre deux votes
+        voting.submit_reading('big_group', rng.choice(big_ids), rng.randint(40, 60))
+        consensus, value, details = voting.verify_voting('big_group')
+        if not isinstance(details, Mapping):
+            continue
+        readings = voting.voting_groups['big_group']['readings']
+        sorted_values = sorted(readings.values())
+        n = len(sorted_values)
+        median = sorted_values[n // 2] if n % 2 else (sorted_values[n // 2 - 1] + sorted_values[n // 2]) / 2
+        expected_aberrant = {sid for sid, v in readings.items() if abs(v - median) > voting.tolerance}
+        if details['median_reference'] != median or set(details['aberrant_sensors']) != expected_aberrant:
+            mismatches += 1
+    # Vue en lecture seule: aucune écriture ne peut désynchroniser les tableaux triés
+    try:
+        voting.voting_groups['big_group']['readings']['S0'] = 1000
+        read_only = False
+    except TypeError:
+        read_only = True
+    order = voting.voting_groups['big_group']['order']
+    in_sync = order.values == sorted(order.by_sensor.values())
+    print(f"   Votes comparés au recalcul complet: 200, divergences: {mismatches}")
+    print(f"   Vue des lectures en lecture seule: {read_only}, tableaux synchronisés: {in_sync}")
+    
+    if mismatches == 0 and read_only and in_sync:
+        print("   ✅ TEST RÉUSSI - Médiane et partition identiques")
+        tests_reussis += 1
+    else:
+        print("   ❌ TEST ÉCHOUÉ - Divergence avec le recalcul complet")
+    
+    # Test 8: Vote groupé de tous les groupes (verify_all)
+    print("\n🔹 TEST 8: Vote groupé verify_all (120 groupes)")
+    tests_totaux += 1
+    batch_voting = SensorVoting(threshold=3, tolerance=5)
+    for g in range(120):
+        size = rng.randint(2, 12)
+        sensor_ids = [f"G{g}_S{i}" for i in range(size)]
+        batch_voting.register_voting_group(f"group_{g}", sensor_ids)
+        for sensor_id in sensor_ids:
+            # Quelques capteurs aberrants dans chaque groupe
+            value = rng.randint(95, 105) if rng.random() > 0.25 else rng.randint(150, 200)
+            batch_voting.submit_reading(f"group_{g}", sensor_id, value)
+    batch = batch_voting.verify_all()
+    batch_mismatches = 0
+    for g in range(120):
+        name = f"group_{g}"
+        consensus, value, details = batch_voting.verify_voting(name)
+        view = batch.group(name)
+        if bool(batch.consensus[batch.index[name]]) != consensus:
+            batch_mismatches += 1
+        elif not isinstance(details, str) and set(view) != set(details.details):
+            batch_mismatches += 1  # Mêmes clés de détails que verify_voting
+        elif consensus and (abs(view['consensus_value'] - value) > 1e-9
+                            or set(view['aberrant_sensors']) != set(details['aberrant_sensors'])):
+            batch_mismatches += 1
+    print(f"   Groupes évalués: {len(batch)}, consensus: {sum(bool(c) for c in batch.consensus)}")
+    print(f"   Divergences avec verify_voting: {batch_mismatches}")
+    
+    if len(batch) == 120 and batch_mismatches == 0:
+        print("   ✅ TEST RÉUSSI - Vote groupé identique au vote par groupe")
+        tests_reussis += 1
+    else:
+        print("   ❌ TEST ÉCHOUÉ - Divergence du vote groupé")
+    
+    # Test 9: Vote en flux par époques
+    print("\n🔹 TEST 9: Vote en flux aligné sur des époques (100 ms)")
+    tests_totaux += 1
+    stream_voting = SensorVoting(threshold=2, tolerance=5)
+    stream_voting.register_voting_group('wheel_group', ['W1', 'W2', 'W3'])
+    stream_results = []
+    stream = StreamingVoter(stream_voting, epoch_ms=100, grace_ms=20, callback=stream_results.append)
+    reading_buffers = set()  # Tableaux de lectures des époques (recyclés)
+    
+    for cycle in range(50):
+        t = cycle * 100
+        stream.submit_reading('wheel_group', 'W1', 50 + cycle, t + 5)
+        stream.submit_reading('wheel_group', 'W2', 51 + cycle, t + 10)
+        if cycle % 5 != 4:
+            # W3 manque un cycle sur cinq: le vote part à l'échéance
+            stream.submit_reading('wheel_group', 'W3', 49 + cycle, t + 15)
+        for epoch in [*stream._pool, *stream.open_epochs['wheel_group'].values()]:
+            reading_buffers.add(id(epoch.order.values))
+    # Lecture en retard pour une époque déjà votée
+    late_accepted = stream.submit_reading('wheel_group', 'W3', 0, 10)
+    stream.flush()
+    
+    values_ok = all(r.consensus and abs(r.value - (50 + r.epoch_id)) <= 1 for r in stream_results)
+    # Instantanés des votes intacts malgré le recyclage des tableaux
+    snapshots_ok = all(tuple(r.details.snapshot.values) == tuple(sorted(
+        v + r.epoch_id for v in ((50, 51, 49) if r.epoch_id % 5 != 4 else (50, 51))))
+        for r in stream_results)
+    print(f"   Votes émis: {len(stream_results)} "
+          f"(complets: {stream.stats['votes_complete']}, échéance: {stream.stats['votes_deadline']})")
+    print(f"   Lecture en retard ignorée: {not late_accepted}, époques allouées: {stream.stats['epochs_allocated']}")
+    print(f"   Tableaux de lectures distincts: {len(reading_buffers)}, instantanés intacts: {snapshots_ok}")
+    
+    if (len(stream_results) == 50 and stream.stats['votes_complete'] == 40 and values_ok
+            and not late_accepted and stream.stats['epochs_allocated'] <= 2
+            and len(reading_buffers) == stream.stats['epochs_allocated'] and snapshots_ok):
+        print("   ✅ TEST RÉUSSI - Un vote par époque, sans mélange de cycles")
+        tests_reussis += 1
+    else:
+        print("   ❌ TEST ÉCHOUÉ - Vote en flux incorrect")
+    
+    # Test 10: Historique borné et détails paresseux
+    print("\n🔹 TEST 10: Historique borné (tampon circulaire) et détails paresseux")
+    tests_totaux += 1
+    small_voting = SensorVoting(threshold=2, tolerance=5, history_size=5)
+    small_voting.register_voting_group('ring_a', ['A1', 'A2', 'A3'])
+    small_voting.register_voting_group('ring_b', ['B1', 'B2'])
+    for cycle in range(20):
+        for sensor_id in ['A1', 'A2', 'A3']:
+            small_voting.submit_reading('ring_a', sensor_id, 20 + cycle)
+        small_voting.verify_voting('ring_a')
+    small_voting.submit_reading('ring_b', 'B1', 1)
+    small_voting.submit_reading('ring_b', 'B2', 2)
+    small_voting.verify_voting('ring_b')
+    
+    history_a = small_voting.get_voting_history('ring_a', limit=3)
+    history_b = small_voting.get_voting_history('ring_b', limit=3)
+    lazy_before = all(vote._details is None for vote in history_a)
+    last_value = history_a[-1]['details']['consensus_value']
+    # Contrat Mapping: mêmes clés en itération, en longueur et par accès direct
+    vote = history_a[-1]
+    keys = list(vote)
+    contract = (len(keys) == len(vote) == len(set(keys)) and all(key in vote for key in keys)
+                and dict(vote)['success'] is True and set(vote['details']) < set(keys))
+    # Instantané partagé entre votes identiques, figé à la modification suivante
+    _, _, first = small_voting.vote_readings('ring_a', small_voting.voting_groups['ring_a']['order'])
+    _, _, second = small_voting.vote_readings('ring_a', small_voting.voting_groups['ring_a']['order'])
+    shared = first.snapshot is second.snapshot
+    small_voting.submit_reading('ring_a', 'A1', 100)
+    frozen = first.values == (39, 39, 39) and first['all_readings'] == {'A1': 39, 'A2': 39, 'A3': 39}
+    print(f"   Historique global: {len(small_voting.voting_history)} entrées (max 5)")
+    print(f"   Derniers votes ring_a: {len(history_a)}, ring_b: {len(history_b)}")
+    print(f"   Détails non construits avant accès: {lazy_before}, dernière valeur: {last_value}")
+    print(f"   Clés cohérentes ({len(keys)}): {contract}, instantané partagé: {shared}, figé: {frozen}")
+    
+    if (len(small_voting.voting_history) == 5 and len(history_a) == 3 and len(history_b) == 1
+            and lazy_before and last_value == 39 and contract and shared and frozen):
+        print("   ✅ TEST RÉUSSI - Historique borné et indexé par groupe")
+        tests_reussis += 1
+    else:
+        print("   ❌ TEST ÉCHOUÉ - Historique incorrect")
+    
+    # Test 11: Index inverse capteur -> groupes et soumission unique
+    print("\n🔹 TEST 11: Capteur partagé entre groupes (submit)")
+    tests_totaux += 1
+    fleet_voting = SensorVoting(threshold=2, tolerance=5)
+    fleet_voting.register_voting_group('front_axle', ['WS_FL', 'WS_FR', 'IMU'])
+    fleet_voting.register_voting_group('rear_axle', ['WS_RL', 'WS_RR'])
+    fleet_voting.add_sensor_to_group('rear_axle', 'IMU')
+    fanout = fleet_voting.submit('IMU', 80)
+    unknown = fleet_voting.submit('GHOST', 80)
+    for sensor_id in ['WS_FL', 'WS_FR', 'WS_RL', 'WS_RR']:
+        fleet_voting.submit(sensor_id, 81)
+    front_ok, _, _ = fleet_voting.verify_voting('front_axle')
+    rear_ok, _, rear_details = fleet_voting.verify_voting('rear_axle')
+    print(f"   Groupes de IMU: {fleet_voting.get_sensor_groups('IMU')}")
+    print(f"   Groupes mis à jour par submit('IMU'): {fanout}, capteur inconnu: {unknown}")
+    
+    if (fanout == 2 and unknown == 0 and front_ok and rear_ok
+            and rear_details['consistent_readings'] == 3):
+        print("   ✅ TEST RÉUSSI - Lecture diffusée à tous les groupes du capteur")
+        tests_reussis += 1
+    else:
+        print("   ❌ TEST ÉCHOUÉ - Diffusion incorrecte")
+    
+    # Test 12: Vote pondéré par la réputation
+    print("\n🔹 TEST 12: Vote pondéré par la confiance des capteurs")
+    tests_totaux += 1
+    trust_voting = SensorVoting(threshold=2, tolerance=5, weighted=True)
+    trust_voting.register_voting_group('rep_group', ['R1', 'R2', 'R3', 'R4', 'R5'])
+    for cycle in range(30):
+        for sensor_id in ['R1', 'R2', 'R3', 'R4']:
+            trust_voting.submit_reading('rep_group', sensor_id, 50 + rng.randint(-1, 1))
+        # R5 dérive trois cycles sur quatre
+        trust_voting.submit_reading('rep_group', 'R5', 90 if cycle % 4 else 50)
+        trust_voting.verify_voting('rep_group')
+    
+    # Les anomalies de l'escalade alimentent la réputation
+    sec_feed = SecurityEscalation()
+    sec_feed.add_anomaly_listener(trust_voting.penalize_sensor)
+    trust_r4_before = trust_voting.get_trust('R4')
+    sec_feed.process_message('R4', False, True)
+    
+    # R5 revient dans la tolérance de la médiane simple mais ne vote plus
+    for sensor_id, value in [('R1', 50), ('R2', 51), ('R3', 52), ('R4', 50), ('R5', 55)]:
+        trust_voting.submit_reading('rep_group', sensor_id, value)
+    consensus, value, details = trust_voting.verify_voting('rep_group')
+    
+    # Blocage en HIGH: l'anomalie qui le provoque ne pénalise qu'une fois
+    sec_feed.sec_level = SecurityEscalation.SEC_HIGH
+    trust_r3_before = trust_voting.get_trust('R3')
+    sec_feed.process_message('R3', False, True)
+    penalized_once = trust_voting.get_trust('R3') == trust_r3_before * 0.5
+    try:
+        trust_voting.verify_all()
+        batch_refused = False
+    except ValueError:
+        batch_refused = True
+    print(f"   Confiance R1: {trust_voting.get_trust('R1'):.2f}, R5: {trust_voting.get_trust('R5'):.2f}")
+    print(f"   Confiance R4 avant/après anomalie: {trust_r4_before:.2f}/{trust_voting.get_trust('R4'):.2f}")
+    print(f"   Consensus: {consensus}, valeur: {value:.2f}, aberrants: {details['aberrant_sensors']}")
+    print(f"   Blocage en HIGH pénalisé une seule fois: {penalized_once}, verify_all refusé: {batch_refused}")
+    
+    if (trust_voting.get_trust('R5') < trust_voting.min_trust
+            and trust_voting.get_trust('R4') < trust_r4_before
+            and consensus and 'R5' in details['aberrant_sensors'] and 50 <= value <= 52
+            and penalized_once and batch_refused):
+        print("   ✅ TEST RÉUSSI - Capteur peu fiable écarté du consensus")
+        tests_reussis += 1
+    else:
+        print("   ❌ TEST ÉCHOUÉ - Pondération incorrecte")
+    
+    # Test 13: Lectures vectorielles (IMU 3 axes)
+    print("\n🔹 TEST 13: Vote vectoriel sur des IMU 3 axes")
+    tests_totaux += 1
+    imu_voting = VectorSensorVoting(threshold=3, tolerance=5)
+    geo_voting = VectorSensorVoting(threshold=3, tolerance=5, median_mode='geometric')
+    imu_readings = [('IMU1', (10.0, 0.0, 9.8)), ('IMU2', (10.5, 0.2, 9.7)), ('IMU3', (9.8, -0.1, 9.9)),
+                    # Usurpation: chaque axe reste dans ±5 mais le vecteur s'écarte de ~7
+                    ('IMU4', (14.0, 4.0, 13.8))]
+    for engine in (imu_voting, geo_voting):
+        engine.register_voting_group('imu_group', [sensor_id for sensor_id, _ in imu_readings], dimensions=3)
+        for sensor_id, vector in imu_readings:
+            engine.submit_reading('imu_group', sensor_id, vector)
+    bad_length = imu_voting.submit_reading('imu_group', 'IMU4', (1.0, 2.0))
+    consensus, vector, details = imu_voting.verify_voting('imu_group')
+    geo_consensus, _, geo_details = geo_voting.verify_voting('imu_group')
+    # Statistiques et remise à zéro communes avec SensorVoting (GroupVoting)
+    vector_stats = imu_voting.get_group_stats('imu_group')
+    imu_voting.reset_readings('imu_group')
+    after_reset, _, _ = imu_voting.verify_voting('imu_group')
+    print(f"   Statistiques: {vector_stats['successful_votes']}/{vector_stats['total_votes']} votes, "
+          f"{vector_stats['dimensions']} dimensions, consensus après remise à zéro: {after_reset}")
+    print(f"   Consensus: {consensus}, vecteur: {tuple(round(c, 2) for c in vector) if vector else None}")
+    print(f"   Aberrants (coordonnées / géométrique): {details['aberrant_sensors']} / "
+          f"{geo_details['aberrant_sensors']}")
+    
+    if (consensus and geo_consensus and not bad_length
+            and details['aberrant_sensors'] == ['IMU4'] and geo_details['aberrant_sensors'] == ['IMU4']
+            and abs(vector[0] - 10.1) < 0.01
+            and vector_stats['total_votes'] == vector_stats['successful_votes'] == 1
+            and vector_stats['dimensions'] == 3 and not after_reset
+            and imu_voting.get_group_stats('imu_group')['total_votes'] == 2
+            and set(vector_stats) - {'dimensions'} == set(voting.get_group_stats('temp_group'))):
+        print("   ✅ TEST RÉUSSI - Usurpation incohérente entre axes détectée")
+        tests_reussis += 1
+    else:
+        print("   ❌ TEST ÉCHOUÉ - Vote vectoriel incorrect")
+    
+    # Test 14: Virgule fixe - test différentiel contre le calcul flottant
+    print("\n🔹 TEST 14: Mode virgule fixe Q8 vs flottant (différentiel)")
+    tests_totaux += 1
+    float_voting = SensorVoting(threshold=3, tolerance=40)
+    fixed_voting = SensorVoting(threshold=3, tolerance=40, fixed_point_bits=8)
+    fixed_ids = [f"F{i}" for i in range(9)]
+    float_voting.register_voting_group('can_group', fixed_ids)
+    fixed_voting.register_voting_group('can_group', fixed_ids)
+    fixed_mismatches = 0
+    for _ in range(300):
+        base = rng.randint(100, 65000)
+        for sensor_id in fixed_ids:
+            # Données CAN 16 bits, quelques capteurs hors tolérance
+            value = base + rng.randint(-30, 30) if rng.random() > 0.2 else rng.randint(0, 0xFFFF)
+            value = max(0, min(0xFFFF, value))
+            float_voting.submit_reading('can_group', sensor_id, value)
+            fixed_voting.submit_reading('can_group', sensor_id, value)
+        ok_float, value_float, details_float = float_voting.verify_voting('can_group')
+        ok_fixed, value_fixed, details_fixed = fixed_voting.verify_voting('can_group')
+        if (ok_float != ok_fixed
+                or set(details_float['aberrant_sensors']) != set(details_fixed['aberrant_sensors'])
+                or (ok_float and abs(value_float - value_fixed) > 1 / 256)):
+            fixed_mismatches += 1
+    raw = details_fixed['fixed_point']
+    
+    # verify_all en virgule fixe (NumPy et repli pur Python) contre verify_voting,
+    # groupes de taille paire compris (médiane tronquée)
+    q_voting = SensorVoting(threshold=2, tolerance=1.5, fixed_point_bits=8)
+    q_groups = {f"q_{g}": [f"Q{g}_{i}" for i in range(2 + g % 7)] for g in range(60)}
+    for group_name, sensor_ids in q_groups.items():
+        q_voting.register_voting_group(group_name, sensor_ids)
+    batch_mismatches = 0
+    even_groups = 0
+    for round_index in range(3):
+        # Lectures soumises après la construction de la matrice (tour > 0) comprises
+        for group_name, sensor_ids in q_groups.items():
+            for sensor_id in sensor_ids:
+                value = rng.uniform(10, 13) if rng.random() > 0.2 else rng.uniform(20, 30)
+                q_voting.submit_reading(group_name, sensor_id, value)
+        for use_numpy in (True, False):
+            sensor_voting_module.HAS_NUMPY = use_numpy and HAS_NUMPY
+            try:
+                batch = q_voting.verify_all()
+            finally:
+                sensor_voting_module.HAS_NUMPY = HAS_NUMPY
+            for group_name, sensor_ids in q_groups.items():
+                ok, value, details = q_voting.verify_voting(group_name)
+                view = batch.group(group_name)
+                even_groups += len(sensor_ids) % 2 == 0
+                if (bool(batch.consensus[batch.index[group_name]]) != ok
+                        or set(view) != set(details.details)
+                        or view['all_readings'] != details['all_readings']
+                        or view['fixed_point'] != details['fixed_point']
+                        or view['median_reference'] != details['median_reference']
+                        or set(view['aberrant_sensors']) != set(details['aberrant_sensors'])
+                        or (ok and view['consensus_value'] != value)):
+                    batch_mismatches += 1
+    print(f"   Votes comparés: 300, divergences: {fixed_mismatches}")
+    print(f"   Dernier vote en Q8: médiane={raw['median_q']}, valeur={raw['value_q']}")
+    print(f"   verify_all Q8 vs verify_voting: {6 * len(q_groups)} groupes comparés "
+          f"({even_groups} pairs), divergences: {batch_mismatches}")
+    
+    if fixed_mismatches == 0 and isinstance(raw['median_q'], int) and batch_mismatches == 0:
+        print("   ✅ TEST RÉUSSI - Virgule fixe conforme au calcul flottant")
+        tests_reussis += 1
+    else:
+        print("   ❌ TEST ÉCHOUÉ - Divergence virgule fixe")
+    
+    # Test 15: Cache de vote (lectures inchangées)
+    print("\n🔹 TEST 15: Cache de vote sur lectures inchangées")
+    tests_totaux += 1
+    cache_voting = SensorVoting(threshold=2, tolerance=5, cache_votes=True)
+    audited_voting = SensorVoting(threshold=2, tolerance=5)  # Sans cache par défaut
+    cached_results = []
+    for engine in (cache_voting, audited_voting):
+        engine.register_voting_group('steady_group', ['C1', 'C2', 'C3'])
+        for cycle in range(10):
+            # Mêmes valeurs renvoyées à chaque cycle, sauf au cycle 5
+            for sensor_id, value in [('C1', 70), ('C2', 71), ('C3', 72 if cycle < 5 else 75)]:
+                engine.submit_reading('steady_group', sensor_id, value)
+            result = engine.verify_voting('steady_group')
+            if engine is cache_voting:
+                cached_results.append(result)
+    audited_history = audited_voting.get_voting_history('steady_group', limit=None)
+    cache_stats = cache_voting.get_cache_stats('steady_group')
+    group_stats = cache_voting.get_group_stats('steady_group')
+    print(f"   Cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses "
+          f"({cache_stats['hit_rate']:.0f}%)")
+    print(f"   Valeurs: {cached_results[0][1]:.2f} puis {cached_results[-1][1]:.2f}, "
+          f"votes comptés: {group_stats['total_votes']}")
+    print(f"   Sans cache (défaut): {len(audited_history)} votes historisés, "
+          f"avec cache: {len(cache_voting.get_voting_history('steady_group', limit=None))}")
+    
+    if (cache_stats['hits'] == 8 and cache_stats['misses'] == 2
+            and cached_results[1][2] is cached_results[0][2]
+            and abs(cached_results[-1][1] - 72) < 1e-9
+            and group_stats['total_votes'] == 10 and group_stats['successful_votes'] == 10
+            and not audited_voting.cache_votes and len(audited_history) == 10
+            and audited_voting.get_cache_stats('steady_group')['hits'] == 0):
+        print("   ✅ TEST RÉUSSI - Recalcul uniquement sur changement de lecture")
+        tests_reussis += 1
+    else:
+        print("   ❌ TEST ÉCHOUÉ - Cache de vote incorrect")
+    
     # Statistiques du groupe
     stats = voting.get_group_stats('temp_group')
     print(f"\n📊 Statistiques du groupe 'temp_group':")